@@ -3,6 +3,16 @@ Moduł AI odpowiedzialny za implementację logiki przeciwnika komputerowego w gr
 """
 
 import random
+import time
+from functools import lru_cache
+
+from board import GameBoard, neighbourhood_masks
+from evaluation import ThreatEvaluator
+from mcts import MonteCarloTreeSearch
+from opening_book import default_book
+from parallel import ParallelSearch
+from symmetry import SymmetryHasher
+from transposition import EXACT, LOWER, UPPER, DEFAULT_MAX_BYTES, TranspositionTable
 
 
 def ai_move(board, symbol):
@@ -22,7 +32,7 @@ def ai_move(board, symbol):
     return None
 
 
-def minimax(board, depth, is_maximizing, ai_symbol, player_symbol):
+def minimax(board, depth, is_maximizing, ai_symbol, player_symbol, max_depth=None, evaluator=None, radius=None):
     """
     Implementacja algorytmu Minimax dla ruchów AI, aby zoptymalizować ruchy.
 
@@ -32,57 +42,657 @@ def minimax(board, depth, is_maximizing, ai_symbol, player_symbol):
         is_maximizing (bool): Flaga wskazująca, czy obecna symulacja maksymalizuje wynik AI.
         ai_symbol (str): Symbol AI (np. 'O').
         player_symbol (str): Symbol gracza (np. 'X').
+        max_depth (int): Głębokość, na której symulacja jest przerywana (None - do końca rundy).
+        evaluator (ThreatEvaluator): Ocena pozycji przerwanych na ``max_depth``, sprowadzana do
+            przedziału (-1, 1), by nie przeważyła wygranej (None - takie pozycje mają wynik 0).
+        radius (int): Rozważane są tylko pola w tej odległości od zajętych pól (``candidate_cells``);
+            None - wszystkie wolne pola.
 
     Returns:
         int: Wynik symulowanego ruchu (wartość punktowa).
     """
-    # Sprawdzamy, czy AI wygrało
-    if board.check_for_win(ai_symbol):
-        return 10 - depth
-    # Sprawdzamy, czy gracz wygrał
-    elif board.check_for_win(player_symbol):
-        return depth - 10
+    # Nowy kształt może powstać tylko z udziałem pola postawionego w ostatnim ruchu
+    if board.last_move_points():
+        # Sprawdzamy, czy wygrało AI, czy gracz
+        return 10 - depth if board.last_symbol == ai_symbol else depth - 10
     # Sprawdzamy, czy jest remis
-    elif not any(' ' in row for row in board.board):
+    elif board.is_full():
         return 0
+    # Osiągnięto limit głębokości
+    elif max_depth is not None and depth >= max_depth:
+        if evaluator is None:
+            return 0
+        score = evaluator.score(ai_symbol)
+        return score / (abs(score) + EVALUATION_SCALE)
 
+    cells = board.iter_free_cells() if radius is None else board.candidate_cells(radius)
     if is_maximizing:
         best_score = -float('inf')
-        for row, col in board.get_available_positions():
-            board.place_symbol(ai_symbol, row, col)
-            score = minimax(board, depth + 1, False, ai_symbol, player_symbol)
-            board.place_symbol(' ', row, col)  # Cofamy ruch
+        for cell in cells:
+            row, col = divmod(cell, board.size)
+            board.make_move(ai_symbol, row, col)
+            score = minimax(board, depth + 1, False, ai_symbol, player_symbol, max_depth, evaluator, radius)
+            board.unmake_move()
             best_score = max(score, best_score)
         return best_score
     else:
         best_score = float('inf')
-        for row, col in board.get_available_positions():
-            board.place_symbol(player_symbol, row, col)
-            score = minimax(board, depth + 1, True, ai_symbol, player_symbol)
-            board.place_symbol(' ', row, col)  # Cofamy ruch
+        for cell in cells:
+            row, col = divmod(cell, board.size)
+            board.make_move(player_symbol, row, col)
+            score = minimax(board, depth + 1, True, ai_symbol, player_symbol, max_depth, evaluator, radius)
+            board.unmake_move()
             best_score = min(score, best_score)
         return best_score
 
 
-def get_best_move(board, ai_symbol, player_symbol):
+def get_best_move(board, ai_symbol, player_symbol, max_depth=None, radius=None):
     """
     Znajduje najlepszy ruch dla AI przy użyciu algorytmu Minimax.
 
     Args:
-        board (GameBoard): Obiekt planszy do gry.
+        board (GameBoard): Obiekt planszy do gry (lub ``sparse_board.SparseBoard``).
         ai_symbol (str): Symbol AI (np. 'O').
         player_symbol (str): Symbol gracza (np. 'X').
+        max_depth (int): Limit głębokości przekazywany do ``minimax`` (None - bez limitu). Pozycje
+            na granicy głębokości są oceniane przez ``ThreatEvaluator``.
+        radius (int): Rozważane są tylko ruchy w tej odległości od zajętych pól (None - wszystkie
+            wolne pola). Wymagany dla ``SparseBoard``, na której wyliczenie wszystkich pól kosztuje O(size²).
 
     Returns:
         tuple: Współrzędne (wiersz, kolumna) najlepszego ruchu AI.
     """
+    # Księga, symetrie i ocena zagrożeń korzystają z tablic rozmiaru size * size
+    dense = isinstance(board, GameBoard)
+
+    # Pozycje z początku rundy są już przeanalizowane w księdze otwarć
+    book = default_book() if dense else None
+    if book is not None:
+        move = book.lookup(board, ai_symbol, player_symbol)
+        if move is not None:
+            return move
+
+    cells = board.iter_free_cells() if radius is None else board.candidate_cells(radius)
+    moves = [divmod(cell, board.size) for cell in cells]
+    if dense:
+        # Ruchy równoważne ze względu na symetrię pozycji mają ten sam wynik
+        symmetry = SymmetryHasher(board)
+        moves = symmetry.unique_moves(moves)
+        symmetry.detach()
+
+    evaluator = ThreatEvaluator(board) if max_depth is not None and dense else None
     best_score = -float('inf')
     best_move = None
-    for row, col in board.get_available_positions():
-        board.place_symbol(ai_symbol, row, col)
-        score = minimax(board, 0, False, ai_symbol, player_symbol)
-        board.place_symbol(' ', row, col)  # Cofamy ruch
-        if score > best_score:
-            best_score = score
-            best_move = (row, col)
+    try:
+        for row, col in moves:
+            board.make_move(ai_symbol, row, col)
+            score = minimax(board, 0, False, ai_symbol, player_symbol, max_depth, evaluator, radius)
+            board.unmake_move()
+            if score > best_score:
+                best_score = score
+                best_move = (row, col)
+    finally:
+        if evaluator is not None:
+            evaluator.detach()
     return best_move
+
+
+# Wartość wygranej w przeszukiwaniu alfa-beta (pomniejszana o liczbę półruchów do wygranej).
+WIN_SCORE = 1000000
+DEFAULT_MAX_DEPTH = 4
+DEFAULT_TIME_BUDGET_MS = 500
+# Co ile węzłów sprawdzany jest zegar.
+TIME_CHECK_INTERVAL = 256
+# Wyniki powyżej tego progu oznaczają wygraną/przegraną i w tablicy transpozycji są zapisywane
+# względem bieżącego węzła, a nie korzenia.
+WIN_THRESHOLD = WIN_SCORE // 2
+# Ocena heurystyczna jest ograniczana, by nigdy nie wyglądała jak wygrana.
+MAX_EVALUATION = WIN_THRESHOLD - 1
+# Ocena heurystyczna, przy której ``minimax`` zwraca 0.5 (ocena jest sprowadzana do przedziału (-1, 1)).
+EVALUATION_SCALE = 1000
+# Mnożnik ocen wyuczonej sieci (z przedziału (-1, 1)) w przeszukiwaniu alfa-beta.
+LEARNED_SCALE = 10000
+
+
+def _is_number(value, integer=False):
+    """
+    Sprawdza, czy opcja strategii jest liczbą (wartości logiczne nie są liczbami).
+
+    Args:
+        value (object): Sprawdzana wartość.
+        integer (bool): Czy wymagana jest liczba całkowita.
+
+    Returns:
+        bool: True, jeśli wartość jest liczbą odpowiedniego rodzaju.
+    """
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) if integer else isinstance(value, (int, float))
+
+
+class SearchTimeout(Exception):
+    """
+    Wyjątek przerywający przeszukiwanie po przekroczeniu limitu czasu.
+    """
+
+
+class AlphaBetaSearch:
+    """
+    Przeszukiwanie alfa-beta (negamax) z iteracyjnym pogłębianiem i limitem czasu na ruch.
+
+    Attributes:
+        max_depth (int): Maksymalna głębokość przeszukiwania (w półruchach).
+        time_budget_ms (int): Limit czasu na jeden ruch w milisekundach (None - bez limitu).
+        nodes (int): Liczba węzłów odwiedzonych w ostatnim przeszukiwaniu.
+        depth_reached (int): Największa głębokość w pełni przeszukana w ostatnim przeszukiwaniu.
+        tt (TranspositionTable): Tablica transpozycji współdzielona między kolejnymi ruchami (None - wyłączona).
+        cancelled (bool): Ustawiane przez ``cancel`` - przerywa bieżące przeszukiwanie.
+        evaluate (bool): Czy liście na granicy głębokości są oceniane przez ``ThreatEvaluator``
+            (False - mają wynik 0).
+        use_book (bool): Czy ``select_move`` najpierw szuka ruchu w domyślnej księdze otwarć.
+        symmetry (bool): Czy pozycje symetryczne mają wspólne wpisy w tablicy transpozycji, a ruchy
+            równoważne ze względu na symetrię pozycji są badane tylko raz.
+        learned (LearnedEvaluator): Wyuczona ocena pozycji zastępująca ``ThreatEvaluator`` (None - wyłączona).
+            Węzły jeden półruch przed granicą głębokości oceniają wtedy wszystkie ruchy jednym
+            wywołaniem sieci, zamiast schodzić rekurencyjnie do każdego liścia.
+    """
+
+    def __init__(self, max_depth=DEFAULT_MAX_DEPTH, time_budget_ms=DEFAULT_TIME_BUDGET_MS,
+                 tt_bytes=DEFAULT_MAX_BYTES, evaluate=True, use_book=True, symmetry=True, weights=None):
+        """
+        Inicjalizuje silnik przeszukiwania.
+
+        Args:
+            max_depth (int): Maksymalna głębokość przeszukiwania (w półruchach).
+            time_budget_ms (int): Limit czasu na jeden ruch w milisekundach (None - bez limitu).
+            tt_bytes (int): Limit pamięci tablicy transpozycji w bajtach (0 lub None - bez tablicy).
+            evaluate (bool): Czy oceniać liście heurystyką zagrożeń.
+            use_book (bool): Czy korzystać z księgi otwarć (``opening_book.default_book``).
+            symmetry (bool): Czy sprowadzać pozycje do postaci kanonicznej (``symmetry.SymmetryHasher``).
+            weights (str): Plik wag wyuczonej oceny pozycji (``learned_eval``); None - ocena heurystyczna.
+
+        Raises:
+            ValueError: Jeśli głębokość, limit czasu lub rozmiar tablicy transpozycji mają złą wartość.
+        """
+        if not _is_number(max_depth, integer=True) or max_depth < 1:
+            raise ValueError(f"max_depth must be a positive integer, not {max_depth!r}")
+        if time_budget_ms is not None and (not _is_number(time_budget_ms) or time_budget_ms <= 0):
+            raise ValueError(f"time_budget_ms must be a positive number or None, not {time_budget_ms!r}")
+        if tt_bytes is not None and (not _is_number(tt_bytes, integer=True) or tt_bytes < 0):
+            raise ValueError(f"tt_bytes must be a non-negative integer or None, not {tt_bytes!r}")
+        self.max_depth = max_depth
+        self.evaluate = evaluate
+        self.use_book = use_book
+        self.symmetry = symmetry
+        self.time_budget_ms = time_budget_ms
+        self.tt = TranspositionTable(tt_bytes) if tt_bytes else None
+        self.learned = None
+        if weights is not None:
+            # Importowane dopiero tutaj - NumPy wydłuża start silnika
+            from learned_eval import LearnedEvaluator
+
+            self.learned = LearnedEvaluator(weights)
+        self.nodes = 0
+        self.depth_reached = 0
+        self._deadline = None
+        self._partial_move = None
+        self._evaluator = None
+        self._symmetry = None
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Przerywa trwające przeszukiwanie (np. z innego wątku) - ``select_move`` zwróci
+        najlepszy ruch znaleziony do tej pory.
+        """
+        self.cancelled = True
+
+    def close(self):
+        """
+        Zamyka plik wag wyuczonej oceny pozycji (jeśli jest włączona).
+        """
+        if self.learned is not None:
+            self.learned.close()
+            self.learned = None
+
+    def select_move(self, board, symbol, opponent_symbol):
+        """
+        Wybiera ruch przy użyciu iteracyjnego pogłębiania w ramach limitu czasu.
+
+        Pozycje z księgi otwarć nie są przeszukiwane. Po przekroczeniu limitu zwracany jest
+        najlepszy ruch znaleziony do tej pory.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            symbol (str): Symbol gracza wykonującego ruch (np. 'O').
+            opponent_symbol (str): Symbol przeciwnika (np. 'X').
+
+        Returns:
+            tuple: Współrzędne (wiersz, kolumna) wybranego ruchu lub None, jeśli plansza jest pełna.
+
+        Raises:
+            ValueError: Jeśli wagi wyuczonej oceny pozycji są dla innego rozmiaru planszy.
+        """
+        self._check_board(board)
+        moves = self._ordered_moves(board, None)
+        if len(moves) <= 1:
+            return moves[0] if moves else None
+
+        book = default_book() if self.use_book else None
+        if book is not None:
+            move = book.lookup(board, symbol, opponent_symbol)
+            if move is not None:
+                return move
+
+        self.nodes = 0
+        self.depth_reached = 0
+        self.cancelled = False
+        self._deadline = None
+        if self.time_budget_ms is not None:
+            self._deadline = time.perf_counter() + self.time_budget_ms / 1000
+
+        best_move = moves[0]
+        self._attach_observers(board)
+        try:
+            for depth in range(1, self.max_depth + 1):
+                self._partial_move = None
+                try:
+                    move, score = self._search_root(board, depth, symbol, opponent_symbol, best_move)
+                except SearchTimeout:
+                    # Pierwszy badany ruch to najlepszy ruch z poprzedniej iteracji, więc najlepszy ruch
+                    # z przerwanej iteracji jest co najmniej tak dobry
+                    if self._partial_move is not None:
+                        best_move = self._partial_move
+                    break
+                best_move = move
+                self.depth_reached = depth
+                # Wygrana lub przegrana jest już przesądzona - głębsze przeszukiwanie nic nie zmieni
+                if abs(score) >= WIN_SCORE - depth:
+                    break
+        finally:
+            self._detach_observers()
+        return best_move
+
+    def search_depth(self, board, symbol, opponent_symbol, depth):
+        """
+        Przeszukuje pozycję do stałej głębokości, bez limitu czasu.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            symbol (str): Symbol gracza wykonującego ruch.
+            opponent_symbol (str): Symbol przeciwnika.
+            depth (int): Głębokość przeszukiwania (w półruchach).
+
+        Returns:
+            tuple: Para (ruch, wynik) - najlepszy ruch i jego ocena z punktu widzenia gracza.
+        """
+        self.nodes = 0
+        self.cancelled = False
+        self._deadline = None
+        self._attach_observers(board)
+        try:
+            return self._search_root(board, depth, symbol, opponent_symbol, None)
+        finally:
+            self._detach_observers()
+
+    def root_moves(self, board):
+        """
+        Zwraca ruchy z korzenia w kolejności, w jakiej bada je ``search_depth``.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+
+        Returns:
+            list: Lista ruchów (wiersz, kolumna); ruchy równoważne ze względu na symetrię występują raz.
+        """
+        self._attach_observers(board)
+        try:
+            return self._candidate_moves(board, None)
+        finally:
+            self._detach_observers()
+
+    def score_root_move(self, board, symbol, opponent_symbol, move, depth, alpha=-float('inf')):
+        """
+        Przeszukuje jeden ruch z korzenia oknem (alfa, +nieskończoność), bez limitu czasu.
+
+        Wynik większy od ``alpha`` jest dokładny, a pozostałe są tylko górnym ograniczeniem - tak jak
+        dla ruchów badanych przez ``search_depth`` po najlepszym dotąd ruchu. ``self.nodes`` zawiera
+        potem liczbę węzłów odwiedzonych przy tym ruchu.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            symbol (str): Symbol gracza wykonującego ruch.
+            opponent_symbol (str): Symbol przeciwnika.
+            move (tuple): Ruch (wiersz, kolumna) z ``root_moves``.
+            depth (int): Głębokość przeszukiwania liczona od korzenia.
+            alpha (float): Wynik najlepszego dotąd ruchu w korzeniu.
+
+        Returns:
+            int: Ocena ruchu z punktu widzenia gracza.
+        """
+        self.nodes = 0
+        self.cancelled = False
+        self._deadline = None
+        row, col = move
+        self._attach_observers(board)
+        board.make_move(symbol, row, col)
+        try:
+            return -self._alphabeta(board, depth - 1, 1, -float('inf'), -alpha, opponent_symbol, symbol)
+        finally:
+            board.unmake_move()
+            self._detach_observers()
+
+    def _check_board(self, board):
+        """
+        Sprawdza, czy wyuczona ocena pozycji (jeśli jest włączona) pasuje do rozmiaru planszy.
+
+        Raises:
+            ValueError: Jeśli wagi wyuczono dla planszy innego rozmiaru.
+        """
+        if self.learned is not None and self.learned.size != board.size:
+            raise ValueError(f"{self.learned.path} was trained for a {self.learned.size}x{self.learned.size} "
+                             f"board, not {board.size}x{board.size}")
+
+    def _attach_observers(self, board):
+        """
+        Tworzy ocenę zagrożeń i hashe symetrii dla przeszukiwanej planszy (jeśli są włączone).
+
+        Raises:
+            ValueError: Jeśli wagi wyuczonej oceny pozycji są dla innego rozmiaru planszy.
+        """
+        self._check_board(board)
+        self._evaluator = ThreatEvaluator(board) if self.evaluate and self.learned is None else None
+        self._symmetry = SymmetryHasher(board) if self.symmetry else None
+
+    def _detach_observers(self):
+        """
+        Odłącza ocenę zagrożeń i hashe symetrii od planszy po zakończeniu przeszukiwania.
+        """
+        if self._evaluator is not None:
+            self._evaluator.detach()
+            self._evaluator = None
+        if self._symmetry is not None:
+            self._symmetry.detach()
+            self._symmetry = None
+
+    def _search_root(self, board, depth, symbol, opponent_symbol, first_move):
+        """
+        Przeszukuje wszystkie ruchy w korzeniu drzewa do zadanej głębokości.
+
+        Najlepszy dotąd ruch jest na bieżąco zapisywany w ``self._partial_move``, aby po przerwaniu
+        iteracji można było wykorzystać wynik częściowy.
+
+        Returns:
+            tuple: Para (najlepszy ruch, jego ocena).
+        """
+        best_move = None
+        best_score = -float('inf')
+        alpha = -float('inf')
+        for row, col in self._candidate_moves(board, first_move):
+            board.make_move(symbol, row, col)
+            try:
+                score = -self._alphabeta(board, depth - 1, 1, -float('inf'), -alpha, opponent_symbol, symbol)
+            finally:
+                board.unmake_move()
+            if score > best_score:
+                best_score = score
+                best_move = (row, col)
+                self._partial_move = best_move
+            alpha = max(alpha, score)
+        return best_move, best_score
+
+    def _alphabeta(self, board, depth, ply, alpha, beta, symbol, opponent_symbol):
+        """
+        Rekurencyjne przeszukiwanie alfa-beta w wariancie negamax.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            depth (int): Pozostała głębokość przeszukiwania.
+            ply (int): Liczba półruchów od korzenia.
+            alpha (float): Dolne ograniczenie wyniku.
+            beta (float): Górne ograniczenie wyniku.
+            symbol (str): Symbol gracza, który jest na ruchu w tym węźle.
+            opponent_symbol (str): Symbol przeciwnika.
+
+        Returns:
+            int: Ocena pozycji z punktu widzenia gracza na ruchu.
+        """
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0:
+            if self.cancelled or (self._deadline is not None and time.perf_counter() > self._deadline):
+                raise SearchTimeout()
+
+        # Ostatni ruch (przeciwnika) ułożył kształt - pozycja przegrana
+        if board.last_move_points():
+            return ply - WIN_SCORE
+        if self.learned is not None and depth <= 1:
+            return self._learned_score(board, depth, ply, symbol, opponent_symbol)
+        if depth == 0:
+            if self._evaluator is None:
+                return 0
+            return max(-MAX_EVALUATION, min(MAX_EVALUATION, self._evaluator.score(symbol)))
+
+        tt = self.tt
+        tt_move = None
+        alpha_orig = alpha
+        if tt is not None:
+            # Pozycje symetryczne mają wspólny wpis; ruch jest zapisywany w układzie pozycji kanonicznej
+            transform = 0
+            if self._symmetry is not None:
+                position_hash, transform = self._symmetry.canonical()
+            else:
+                position_hash = board.hash
+            key = position_hash ^ side_to_move_key(symbol)
+            entry = tt.probe(key)
+            if entry is not None:
+                entry_depth, flag, score, cell = entry
+                if cell >= 0:
+                    if transform:
+                        cell = self._symmetry.inverses[transform][cell]
+                    tt_move = divmod(cell, board.size)
+                if entry_depth >= depth:
+                    score = _score_from_tt(score, ply)
+                    if flag == EXACT:
+                        return score
+                    elif flag == LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score
+
+        moves = self._candidate_moves(board, tt_move)
+        if not moves:
+            return 0  # Remis - plansza pełna
+
+        best_score = -float('inf')
+        best_move = None
+        for row, col in moves:
+            board.make_move(symbol, row, col)
+            try:
+                score = -self._alphabeta(board, depth - 1, ply + 1, -beta, -alpha, opponent_symbol, symbol)
+            finally:
+                board.unmake_move()
+            if score > best_score:
+                best_score = score
+                best_move = (row, col)
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if tt is not None:
+            if best_score <= alpha_orig:
+                flag = UPPER
+            elif best_score >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            cell = best_move[0] * board.size + best_move[1]
+            if transform:
+                cell = self._symmetry.permutations[transform][cell]
+            tt.store(key, depth, flag, _score_to_tt(best_score, ply), cell)
+        return best_score
+
+    def _learned_score(self, board, depth, ply, symbol, opponent_symbol):
+        """
+        Ocenia węzeł wyuczoną siecią: liść bezpośrednio, a węzeł przed granicą głębokości jako
+        najlepszy z ruchów ocenionych razem (``LearnedEvaluator.evaluate_moves``).
+
+        Returns:
+            int: Ocena pozycji z punktu widzenia gracza na ruchu.
+        """
+        if depth == 0:
+            # Sieć ocenia pozycję z punktu widzenia gracza, który wykonał ostatni ruch
+            return -round(self.learned.evaluate(board, opponent_symbol, symbol) * LEARNED_SCALE)
+        cells = list(board.iter_free_cells())
+        if not cells:
+            return 0  # Remis - plansza pełna
+        scores, wins = self.learned.evaluate_moves(board, symbol, opponent_symbol, cells)
+        if wins.any():
+            return WIN_SCORE - (ply + 1)
+        return round(float(scores.max()) * LEARNED_SCALE)
+
+    def _candidate_moves(self, board, first_move):
+        """
+        Zwraca uporządkowane ruchy (patrz ``_ordered_moves``) bez ruchów równoważnych ze względu na
+        symetrię pozycji.
+        """
+        moves = self._ordered_moves(board, first_move)
+        if self._symmetry is not None:
+            moves = self._symmetry.unique_moves(moves)
+        return moves
+
+    @staticmethod
+    def _ordered_moves(board, first_move):
+        """
+        Zwraca wolne pola uporządkowane tak, by najpierw badać ruchy przy już zajętych polach.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            first_move (tuple): Ruch, który ma zostać zbadany jako pierwszy (np. najlepszy z poprzedniej iteracji).
+
+        Returns:
+            list: Lista współrzędnych (wiersz, kolumna).
+        """
+        moves = board.get_available_positions()
+        neighbourhoods = neighbourhood_masks(board.size)
+        occupied = board.occupied
+        size = board.size
+        moves.sort(key=lambda move: -(neighbourhoods[move[0] * size + move[1]] & occupied).bit_count())
+        if first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+        return moves
+
+
+class RandomStrategy:
+    """
+    Strategia losowa - wybiera losowe wolne pole, tak jak ``ai_move``.
+
+    Attributes:
+        rng (random.Random): Generator liczb losowych strategii.
+    """
+
+    def __init__(self, seed=None):
+        """
+        Inicjalizuje strategię losową.
+
+        Args:
+            seed (int): Ziarno generatora liczb losowych (None - losowe).
+        """
+        self.rng = random.Random(seed)
+
+    def cancel(self):
+        """
+        Strategia losowa odpowiada natychmiast, więc nie ma czego przerywać.
+        """
+
+    def close(self):
+        """
+        Strategia losowa nie trzyma zasobów.
+        """
+
+    def select_move(self, board, symbol, opponent_symbol):
+        """
+        Wybiera losowe wolne pole.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            symbol (str): Symbol gracza wykonującego ruch.
+            opponent_symbol (str): Symbol przeciwnika.
+
+        Returns:
+            tuple: Współrzędne (wiersz, kolumna) ruchu lub None, jeśli plansza jest pełna.
+        """
+        available_positions = board.get_available_positions()
+        if available_positions:
+            return self.rng.choice(available_positions)
+        return None
+
+
+# Strategie AI dostępne po nazwie (np. w rozgrywkach bez interfejsu).
+STRATEGIES = {
+    'random': RandomStrategy,
+    'alphabeta': AlphaBetaSearch,
+    'mcts': MonteCarloTreeSearch,
+    'parallel': ParallelSearch,
+}
+
+
+def create_strategy(name, **options):
+    """
+    Tworzy strategię AI o podanej nazwie.
+
+    Args:
+        name (str): Nazwa strategii z ``STRATEGIES``.
+        **options: Parametry przekazywane do konstruktora strategii.
+
+    Returns:
+        object: Obiekt strategii z metodami ``select_move(board, symbol, opponent_symbol)``, ``cancel()``
+        i ``close()`` (zwalnia zasoby silnika, np. pulę procesów ``ParallelSearch``).
+
+    Raises:
+        ValueError: Jeśli strategia o podanej nazwie nie istnieje.
+    """
+    try:
+        strategy_class = STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown AI strategy: {name!r}") from None
+    return strategy_class(**options)
+
+
+def _score_to_tt(score, ply):
+    """
+    Przelicza wynik wygranej/przegranej z odległości od korzenia na odległość od bieżącego węzła.
+    """
+    if score >= WIN_THRESHOLD:
+        return score + ply
+    if score <= -WIN_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score, ply):
+    """
+    Odwraca przeliczenie wykonane przez ``_score_to_tt`` dla węzła na głębokości ``ply``.
+    """
+    if score >= WIN_THRESHOLD:
+        return score - ply
+    if score <= -WIN_THRESHOLD:
+        return score + ply
+    return score
+
+
+@lru_cache(maxsize=None)
+def side_to_move_key(symbol):
+    """
+    Zwraca 64-bitowy klucz Zobrista oznaczający, który symbol jest na ruchu.
+
+    Args:
+        symbol (str): Symbol gracza na ruchu.
+
+    Returns:
+        int: Klucz łączony operacją XOR z hashem planszy.
+    """
+    return random.Random(f"zobrist:side:{symbol}").getrandbits(64)
@@ -0,0 +1,148 @@
+"""
+Moduł wektorowego (NumPy) wykrywania kształtów na wielu planszach jednocześnie.
+
+Plansze są zapisane w tablicy ``(N, size, size)`` typu int8: 0 oznacza wolne pole, a kolejne
+liczby kolejne symbole (domyślnie 1 - 'X', 2 - 'O'). Każdy wariant kształtu z rejestru ``shapes``
+jest sprawdzany przesuwanym oknem: iloczyn logiczny przesuniętych wycinków planszy wskazuje
+wszystkie ułożenia wzorca naraz.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from shapes import registered_shapes
+
+EMPTY = 0
+DEFAULT_SYMBOLS = ('X', 'O')
+
+
+def encode_boards(boards, symbols=DEFAULT_SYMBOLS):
+    """
+    Zamienia listę obiektów ``GameBoard`` na tablicę NumPy.
+
+    Args:
+        boards (list): Plansze tego samego rozmiaru.
+        symbols (tuple): Symbole kodowane kolejno jako 1, 2, ...
+
+    Returns:
+        numpy.ndarray: Tablica ``(N, size, size)`` typu int8.
+    """
+    codes = {' ': EMPTY}
+    codes.update({symbol: code for code, symbol in enumerate(symbols, start=1)})
+    return np.array([[[codes[cell] for cell in row] for row in board.board] for board in boards], dtype=np.int8)
+
+
+def _pattern_windows(cells, pattern):
+    """
+    Zwraca maskę ``(N, rows, cols)`` ułożeń wzorca - True tam, gdzie wzorzec zaczynający się
+    w danym polu jest w całości zajęty.
+    """
+    size = cells.shape[1]
+    height = max(r for r, _ in pattern) + 1
+    width = max(c for _, c in pattern) + 1
+    rows = size - height + 1
+    cols = size - width + 1
+    if rows <= 0 or cols <= 0:
+        return np.zeros((cells.shape[0], 0, 0), dtype=bool)
+    (first_row, first_col), rest = pattern[0], pattern[1:]
+    windows = cells[:, first_row:first_row + rows, first_col:first_col + cols].copy()
+    for dr, dc in rest:
+        windows &= cells[:, dr:dr + rows, dc:dc + cols]
+    return windows
+
+
+def detect_shapes(boards, code):
+    """
+    Sprawdza, które kształty ułożył symbol o podanym kodzie na każdej planszy.
+
+    Args:
+        boards (numpy.ndarray): Tablica plansz ``(N, size, size)``.
+        code (int): Kod symbolu.
+
+    Returns:
+        dict: Nazwa kształtu -> tablica ``(N,)`` wartości logicznych.
+    """
+    cells = boards == code
+    found = {}
+    for shape in registered_shapes():
+        result = np.zeros(boards.shape[0], dtype=bool)
+        for pattern in shape.variants():
+            result |= _pattern_windows(cells, pattern).any(axis=(1, 2))
+        found[shape.name] = result
+    return found
+
+
+def check_for_win(boards, code):
+    """
+    Odpowiednik ``GameBoard.check_for_win`` dla wielu plansz.
+
+    Kształty są sprawdzane w tej samej kolejności priorytetu (domyślnie T, kwadrat, linia, L).
+
+    Args:
+        boards (numpy.ndarray): Tablica plansz ``(N, size, size)``.
+        code (int): Kod symbolu.
+
+    Returns:
+        numpy.ndarray: Tablica ``(N,)`` z liczbą punktów (0, jeśli nie ma kształtu).
+    """
+    found = detect_shapes(boards, code)
+    shapes = registered_shapes()
+    return np.select([found[shape.name] for shape in shapes], [shape.points for shape in shapes],
+                     default=0).astype(np.int16)
+
+
+def available_moves(boards):
+    """
+    Wyznacza wolne pola na każdej planszy.
+
+    Args:
+        boards (numpy.ndarray): Tablica plansz ``(N, size, size)``.
+
+    Returns:
+        numpy.ndarray: Tablica ``(N, size, size)`` wartości logicznych (True - pole wolne).
+    """
+    return boards == EMPTY
+
+
+def random_boards(count, size, seed=0, symbols=2):
+    """
+    Losuje plansze o różnym stopniu zapełnienia.
+
+    Args:
+        count (int): Liczba plansz.
+        size (int): Rozmiar planszy.
+        seed (int): Ziarno generatora liczb losowych.
+        symbols (int): Liczba różnych symboli.
+
+    Returns:
+        numpy.ndarray: Tablica ``(count, size, size)`` typu int8.
+    """
+    rng = np.random.default_rng(seed)
+    fill = rng.random((count, 1, 1))
+    codes = rng.integers(1, symbols + 1, size=(count, size, size))
+    return np.where(rng.random((count, size, size)) < fill, codes, EMPTY).astype(np.int8)
+
+
+def main():
+    """
+    Mierzy przepustowość wersji wektorowej (zgodność z ``GameBoard`` sprawdzają testy).
+    """
+    parser = argparse.ArgumentParser(description="Vectorized shape detection timing.")
+    parser.add_argument('-n', '--boards', type=int, default=10000, help="number of boards to score")
+    parser.add_argument('--size', type=int, default=10, help="board size")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    boards = random_boards(args.boards, args.size, args.seed)
+    start = time.perf_counter()
+    check_for_win(boards, 1)
+    check_for_win(boards, 2)
+    elapsed = time.perf_counter() - start
+    print(f"scored {args.boards} boards x 2 symbols in {elapsed * 1000:.1f} ms "
+          f"({2 * args.boards / elapsed:,.0f} boards/s)")
+
+
+if __name__ == '__main__':
+    main()
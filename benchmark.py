@@ -0,0 +1,345 @@
+"""
+Moduł benchmarków najbardziej obciążonych fragmentów gry: planszy, AI i rysowania.
+
+Wyniki są zapisywane jako JSON (czas jednego wywołania w sekundach, najlepszy z kilku powtórzeń),
+a tryb porównania oznacza jako regresje pomiary wolniejsze od zapisanego wzorca o więcej niż
+zadany próg - proces kończy się wtedy kodem 1.
+
+Mierzony jest też zimny start silnika (import ``ENGINE_MODULES`` i pierwsza plansza w nowym
+interpreterze), który płaci każdy proces roboczy. Przekroczenie budżetu lub załadowanie pygame
+przez moduły silnika również kończy proces kodem 1.
+
+Przykłady:
+    python benchmark.py --output baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import ai
+from board import GameBoard
+from parallel import random_midgame_board
+from sparse_board import SparseBoard
+
+DEFAULT_SIZES = (10, 20, 50, 100)
+# Wypełnienie planszy w poszczególnych pozycjach testowych.
+POSITIONS = {'empty': 0.0, 'random': 0.5, 'nearly_full': 0.95}
+# Głębokość minimax dla rozmiarów planszy (liczba węzłów rośnie jak liczba_wolnych_pól ** głębokość).
+MINIMAX_DEPTHS = {10: 2}
+DEFAULT_MINIMAX_DEPTH = 1
+ALPHABETA_DEPTH = 2
+# Rzadkie plansze: rozmiary i liczba postawionych symboli (koszt ma zależeć od liczby symboli, nie od rozmiaru).
+SPARSE_SIZES = (1000, 10000)
+SPARSE_PIECES = 1000
+SPARSE_RADIUS = 1
+DEFAULT_MIN_TIME = 0.05
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2
+# Moduły silnika gry - muszą się importować szybko i bez pygame.
+ENGINE_MODULES = ('board', 'ai', 'player', 'game')
+# Budżet zimnego startu silnika w milisekundach.
+DEFAULT_STARTUP_BUDGET_MS = 100
+STARTUP_BENCHMARK = f"startup.engine[{','.join(ENGINE_MODULES)}]"
+
+
+def filled_board(size, fill, seed=0):
+    """
+    Tworzy planszę, na której losowo wybrane pola zajmują na przemian 'X' i 'O'.
+
+    Args:
+        size (int): Rozmiar planszy.
+        fill (float): Odsetek zajętych pól.
+        seed (int): Ziarno generatora liczb losowych.
+
+    Returns:
+        GameBoard: Wypełniona plansza (może zawierać ułożone kształty).
+    """
+    rng = random.Random(seed)
+    board = GameBoard(size)
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    rng.shuffle(cells)
+    for index, (row, col) in enumerate(cells[:int(fill * len(cells))]):
+        board.place_symbol('XO'[index % 2], row, col)
+    return board
+
+
+def measure(func, min_time=DEFAULT_MIN_TIME, repeat=DEFAULT_REPEAT):
+    """
+    Mierzy czas jednego wywołania funkcji.
+
+    Liczba wywołań w serii jest podwajana, aż seria trwa co najmniej ``min_time``; wynikiem
+    jest najlepszy czas na wywołanie spośród ``repeat`` serii.
+
+    Args:
+        func (callable): Funkcja bez argumentów.
+        min_time (float): Minimalny czas jednej serii w sekundach.
+        repeat (int): Liczba serii.
+
+    Returns:
+        dict: Czas jednego wywołania (``seconds``) i liczba wywołań w serii (``calls``).
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return {'seconds': best, 'calls': number}
+
+
+def board_benchmarks(size):
+    """
+    Zwraca benchmarki metod ``GameBoard`` dla pozycji pustej, losowej i prawie pełnej.
+
+    Returns:
+        dict: Nazwa benchmarku -> funkcja bez argumentów.
+    """
+    cases = {}
+    for position, fill in POSITIONS.items():
+        board = filled_board(size, fill)
+        suffix = f"[size={size},{position}]"
+        cases[f"board.check_for_win{suffix}"] = lambda board=board: board.check_for_win('X')
+        for method in ('check_t_shape', 'check_square_shape', 'check_line_shape', 'check_l_shape'):
+            cases[f"board.{method}{suffix}"] = lambda check=getattr(board, method): check('X')
+        cases[f"board.get_available_positions{suffix}"] = board.get_available_positions
+        cases[f"board.snapshot{suffix}"] = board.snapshot
+        cases[f"board.from_snapshot{suffix}"] = lambda snapshot=board.snapshot(): GameBoard.from_snapshot(snapshot)
+    return cases
+
+
+def ai_benchmarks(size):
+    """
+    Zwraca benchmarki AI na pozycji ze środka partii.
+
+    Returns:
+        dict: Nazwa benchmarku -> funkcja bez argumentów.
+    """
+    board = random_midgame_board(size, moves=max(10, size * size // 5), seed=size)
+    depth = MINIMAX_DEPTHS.get(size, DEFAULT_MINIMAX_DEPTH)
+    cases = {
+        f"ai.minimax[size={size},depth={depth}]": lambda: ai.minimax(board, 0, True, 'X', 'O', max_depth=depth),
+        f"ai.get_best_move[size={size},depth={depth - 1}]": lambda: ai.get_best_move(board, 'X', 'O',
+                                                                                     max_depth=depth - 1),
+        f"ai.ai_move[size={size}]": lambda: ai.ai_move(board, 'X'),
+    }
+    if size == 10:
+        search = ai.AlphaBetaSearch(time_budget_ms=None, tt_bytes=0)
+        cases[f"ai.AlphaBetaSearch.search_depth[size={size},depth={ALPHABETA_DEPTH}]"] = (
+            lambda: search.search_depth(board, 'X', 'O', ALPHABETA_DEPTH))
+    return cases
+
+
+def sparse_benchmarks(size, pieces=SPARSE_PIECES):
+    """
+    Zwraca benchmarki ``SparseBoard`` z losowo rozstawionymi symbolami na dużej planszy.
+
+    Returns:
+        dict: Nazwa benchmarku -> funkcja bez argumentów.
+    """
+    rng = random.Random(size)
+    board = SparseBoard(size)
+    for turn in range(pieces):
+        row, col = rng.randrange(size), rng.randrange(size)
+        if board.is_spot_available(row, col):
+            board.place_symbol('XO'[turn % 2], row, col)
+    cell = board.candidate_cells(SPARSE_RADIUS)[0]
+    row, col = divmod(cell, size)
+
+    def place_and_undo():
+        board.place_symbol('X', row, col)
+        board.place_symbol(' ', row, col)
+
+    suffix = f"[size={size},pieces={pieces}]"
+    return {
+        f"sparse_board.place_symbol{suffix}": place_and_undo,
+        f"sparse_board.check_for_win{suffix}": lambda: board.check_for_win('X'),
+        f"sparse_board.candidate_cells{suffix}": lambda: board.candidate_cells(SPARSE_RADIUS),
+    }
+
+
+def render_benchmarks():
+    """
+    Zwraca benchmark ``main.draw_board`` na niewidocznej powierzchni SDL.
+
+    Returns:
+        dict: Nazwa benchmarku -> funkcja bez argumentów (pusty, jeśli pygame nie jest dostępny).
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    # Bez tego import pygame wypisuje powitanie na stdout, psując wynik w formacie JSON
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    try:
+        import main
+    except ImportError:
+        return {}
+    from game import Game
+
+    main.init_display()
+    game = Game()
+    game.board = random_midgame_board(main.GRID_SIZE, moves=30)
+    return {f"main.draw_board[size={main.GRID_SIZE}]": lambda: main.draw_board(game)}
+
+
+def engine_startup(repeat=DEFAULT_REPEAT):
+    """
+    Mierzy zimny start silnika: import ``ENGINE_MODULES`` i utworzenie planszy 10x10 w nowym interpreterze.
+
+    Czas startu samego interpretera nie jest wliczany.
+
+    Args:
+        repeat (int): Liczba pomiarów.
+
+    Returns:
+        dict: Najlepszy czas (``seconds``), liczba wywołań (``calls``) i czy zostało załadowane pygame (``pygame``).
+    """
+    code = (f"import sys, time\n"
+            f"start = time.perf_counter()\n"
+            f"import {', '.join(ENGINE_MODULES)}\n"
+            f"board.GameBoard(10)\n"
+            f"print(time.perf_counter() - start, 'pygame' in sys.modules)")
+    best = float('inf')
+    pygame_loaded = False
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+        best = min(best, float(output[0]))
+        pygame_loaded = pygame_loaded or output[1] == 'True'
+    return {'seconds': best, 'calls': 1, 'pygame': pygame_loaded}
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, pattern=None, min_time=DEFAULT_MIN_TIME, repeat=DEFAULT_REPEAT):
+    """
+    Uruchamia benchmarki i zwraca wyniki.
+
+    Args:
+        sizes (tuple): Rozmiary plansz.
+        pattern (str): Uruchamiane są tylko benchmarki, których nazwa zawiera ten tekst (None - wszystkie).
+        min_time (float): Minimalny czas jednej serii pomiaru w sekundach.
+        repeat (int): Liczba serii pomiaru.
+
+    Returns:
+        dict: Dane o środowisku (``meta``) i wyniki benchmarków (``results``).
+    """
+    cases = {}
+    for size in sizes:
+        cases.update(board_benchmarks(size))
+        cases.update(ai_benchmarks(size))
+    for size in SPARSE_SIZES:
+        cases.update(sparse_benchmarks(size))
+    cases.update(render_benchmarks())
+
+    results = {}
+    if pattern is None or pattern in STARTUP_BENCHMARK:
+        results[STARTUP_BENCHMARK] = engine_startup(repeat)
+        print(f"{STARTUP_BENCHMARK:<70} {results[STARTUP_BENCHMARK]['seconds'] * 1e6:>14.2f} us", file=sys.stderr)
+    for name, func in cases.items():
+        if pattern is None or pattern in name:
+            results[name] = measure(func, min_time, repeat)
+            print(f"{name:<70} {results[name]['seconds'] * 1e6:>14.2f} us", file=sys.stderr)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Porównuje wyniki z zapisanym wzorcem.
+
+    Args:
+        current (dict): Wyniki bieżącego uruchomienia.
+        baseline (dict): Wyniki wzorcowe.
+        threshold (float): Dopuszczalny względny wzrost czasu (0.2 oznacza 20%).
+
+    Returns:
+        list: Lista słowników (``name``, ``baseline``, ``current``, ``ratio``, ``regression``) dla
+        benchmarków obecnych w obu zestawach wyników.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+        rows.append({
+            'name': name,
+            'baseline': base['seconds'],
+            'current': result['seconds'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return rows
+
+
+def main():
+    """
+    Uruchamia benchmarki z linii poleceń.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks for board, AI and rendering hot paths.")
+    parser.add_argument('-o', '--output', help="write results as JSON to this file (default: stdout)")
+    parser.add_argument('-c', '--compare', help="baseline JSON file to compare against")
+    parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative slowdown before a result is flagged (default: 0.2)")
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="board sizes")
+    parser.add_argument('-k', '--filter', help="only run benchmarks whose name contains this text")
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME, help="minimum seconds per timing run")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timing runs per benchmark")
+    parser.add_argument('--startup-budget-ms', type=float, default=DEFAULT_STARTUP_BUDGET_MS,
+                        help="maximum engine cold-start time (default: 100)")
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.sizes, args.filter, args.min_time, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2)
+    elif not args.compare:
+        print(json.dumps(current, indent=2))
+
+    startup = current['results'].get(STARTUP_BENCHMARK)
+    failed = False
+    if startup is not None:
+        if startup['pygame']:
+            print(f"engine modules ({', '.join(ENGINE_MODULES)}) import pygame", file=sys.stderr)
+            failed = True
+        if startup['seconds'] * 1000 > args.startup_budget_ms:
+            print(f"engine cold start {startup['seconds'] * 1000:.1f} ms exceeds the budget of "
+                  f"{args.startup_budget_ms:.0f} ms", file=sys.stderr)
+            failed = True
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        rows = compare(current, baseline, args.threshold)
+        for row in rows:
+            flag = "REGRESSION" if row['regression'] else ""
+            print(f"{row['name']:<70} {row['baseline'] * 1e6:>12.2f} -> {row['current'] * 1e6:>12.2f} us "
+                  f"x{row['ratio']:.2f} {flag}")
+        regressions = [row for row in rows if row['regression']]
+        print(f"{len(regressions)} regression(s) out of {len(rows)} compared benchmark(s)")
+        failed = failed or bool(regressions)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,126 @@
 """
 Moduł odpowiedzialny za logikę planszy do gry.
+
+Plansza przechowuje stan każdego symbolu jako maskę bitową (bit ``row * size + col``),
+a wszystkie możliwe ułożenia kształtów z rejestru ``shapes`` są wyliczane raz dla danego
+rozmiaru planszy, dzięki czemu sprawdzenie kształtu sprowadza się do testów
+``maska & zajęte == maska``.
 """
 
+import math
+import random
+from functools import lru_cache
+
+from shapes import compile_shapes
+
+@lru_cache(maxsize=None)
+def neighbourhood_masks(size):
+    """
+    Wylicza dla każdego pola maskę bitową jego sąsiedztwa (kwadrat 3x3 bez samego pola).
+
+    Args:
+        size (int): Rozmiar planszy.
+
+    Returns:
+        tuple: Krotka masek bitowych indeksowana numerem pola.
+    """
+    masks = []
+    for row in range(size):
+        for col in range(size):
+            mask = 0
+            for r in range(max(0, row - 1), min(size, row + 2)):
+                for c in range(max(0, col - 1), min(size, col + 2)):
+                    if (r, c) != (row, col):
+                        mask |= 1 << (r * size + c)
+            masks.append(mask)
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size, symbol):
+    """
+    Zwraca losowe 64-bitowe klucze Zobrista dla każdego pola planszy i danego symbolu.
+
+    Generator jest inicjalizowany rozmiarem planszy i symbolem, więc klucze są takie same
+    w każdym procesie i przy każdym uruchomieniu.
+
+    Args:
+        size (int): Rozmiar planszy.
+        symbol (str): Symbol, dla którego generowane są klucze.
+
+    Returns:
+        tuple: Krotka kluczy indeksowana numerem pola.
+    """
+    rng = random.Random(f"zobrist:{size}:{symbol}")
+    return tuple(rng.getrandbits(64) for _ in range(size * size))
+
+
+class BoardSnapshot:
+    """
+    Niezmienny, zwarty zapis pozycji - tani do kopiowania, przesyłania do innych procesów i użycia
+    jako klucz słownika.
+
+    Attributes:
+        cells (bytes): Plansza zakodowana metodą ``GameBoard.to_bytes``.
+        last_symbol (str): Symbol postawiony w ostatnim ruchu (None, jeśli nieznany).
+        last_shapes (tuple): Kształty ułożone ostatnim ruchem, w kolejności priorytetu.
+    """
+
+    __slots__ = ('cells', 'last_symbol', 'last_shapes')
+
+    def __init__(self, cells, last_symbol=None, last_shapes=()):
+        """
+        Tworzy zapis pozycji.
+
+        Args:
+            cells (bytes): Plansza zakodowana metodą ``GameBoard.to_bytes``.
+            last_symbol (str): Symbol postawiony w ostatnim ruchu.
+            last_shapes (tuple): Kształty ułożone ostatnim ruchem.
+        """
+        object.__setattr__(self, 'cells', bytes(cells))
+        object.__setattr__(self, 'last_symbol', last_symbol)
+        object.__setattr__(self, 'last_shapes', tuple(last_shapes))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return BoardSnapshot, (self.cells, self.last_symbol, self.last_shapes)
+
+    def __copy__(self):
+        return self  # Niezmienny - kopia nie jest potrzebna
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, BoardSnapshot):
+            return NotImplemented
+        return (self.cells, self.last_symbol, self.last_shapes) == (other.cells, other.last_symbol, other.last_shapes)
+
+    def __hash__(self):
+        return hash((self.cells, self.last_symbol, self.last_shapes))
+
+    def __repr__(self):
+        return f"BoardSnapshot(size={self.size}, occupied={self.occupied_count})"
+
+    @property
+    def size(self):
+        """
+        int: Rozmiar planszy.
+        """
+        return math.isqrt(len(self.cells))
+
+    @property
+    def occupied_count(self):
+        """
+        int: Liczba zajętych pól.
+        """
+        return len(self.cells) - self.cells.count(b' ')
+
 
 class GameBoard:
     """
@@ -9,7 +128,22 @@ class GameBoard:
 
     Attributes:
         size (int): Rozmiar planszy.
-        board (list): Dwuwymiarowa lista reprezentująca pola planszy.
+        board (list): Dwuwymiarowa lista reprezentująca pola planszy (widok tylko do odczytu,
+            aktualizowany przez ``place_symbol``).
+        masks (dict): Maski bitowe pól zajętych przez poszczególne symbole.
+        occupied (int): Maska bitowa wszystkich zajętych pól.
+        occupied_count (int): Liczba zajętych pól.
+        free (list): Numery wolnych pól (``wiersz * size + kolumna``) w nieokreślonej kolejności;
+            aktualizowana w O(1) przez ``place_symbol``.
+        shapes (ShapeTable): Skompilowany rejestr kształtów dla tego rozmiaru planszy.
+        shape_masks (dict): Maski bitowe wszystkich ułożeń kształtów (``shapes.masks``).
+        cell_index (tuple): Ułożenia kształtów pokrywające każde pole planszy (``shapes.cell_index``).
+        last_symbol (str): Symbol postawiony w ostatnim ruchu (None przed pierwszym ruchem).
+        last_shapes (tuple): Kształty ułożone ostatnim ruchem, w kolejności priorytetu.
+        hash (int): Hash Zobrista pozycji, aktualizowany przyrostowo przy każdym ruchu.
+        observers (list): Obiekty powiadamiane o każdej zmianie pola (patrz ``add_observer``).
+        undo_stack (list): Ruchy wykonane przez ``make_move`` i jeszcze nie cofnięte, jako krotki
+            (numer pola, poprzedni symbol, poprzedni ``last_symbol``, poprzednie ``last_shapes``).
     """
 
     def __init__(self, size):
@@ -21,6 +155,111 @@ class GameBoard:
         """
         self.size = size
         self.board = [[' ' for _ in range(size)] for _ in range(size)]
+        self.masks = {}
+        self.occupied = 0
+        self.occupied_count = 0
+        self.free = list(range(size * size))
+        self._free_index = list(range(size * size))  # Pozycja pola na liście ``free``
+        self.shapes = compile_shapes(size)
+        self.shape_masks = self.shapes.masks
+        self.cell_index = self.shapes.cell_index
+        self.last_symbol = None
+        self.last_shapes = ()
+        self.hash = 0
+        self.observers = []
+        self.undo_stack = []
+
+    def add_observer(self, observer):
+        """
+        Rejestruje obiekt powiadamiany o zmianach pól.
+
+        Po każdej zmianie ``place_symbol`` wywołuje ``observer.cell_changed(cell, previous, symbol)``,
+        gdzie ``previous`` i ``symbol`` to zawartość pola przed zmianą i po niej (' ' - wolne pole).
+
+        Args:
+            observer (object): Obiekt z metodą ``cell_changed``.
+        """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Wyrejestrowuje obiekt dodany przez ``add_observer``.
+
+        Args:
+            observer (object): Wcześniej zarejestrowany obiekt.
+        """
+        self.observers.remove(observer)
+
+    def to_bytes(self):
+        """
+        Koduje stan planszy jako zwarty ciąg bajtów (jeden znak ASCII na pole, wierszami).
+
+        Returns:
+            bytes: Zakodowana plansza o długości ``size * size``.
+        """
+        return ''.join(''.join(row) for row in self.board).encode('ascii')
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Odtwarza planszę zakodowaną metodą ``to_bytes``.
+
+        Args:
+            data (bytes): Zakodowana plansza.
+
+        Returns:
+            GameBoard: Nowa plansza o tym samym stanie.
+        """
+        size = math.isqrt(len(data))
+        board = cls(size)
+        grid = board.board
+        masks = board.masks
+        for cell, code in enumerate(data):
+            if code != 32:  # spacja - wolne pole
+                # Bez ``place_symbol`` - nowa plansza nie ma obserwatorów, a kształtów nie trzeba szukać
+                symbol = chr(code)
+                grid[cell // size][cell % size] = symbol
+                masks[symbol] = masks.get(symbol, 0) | 1 << cell
+                board.hash ^= zobrist_keys(size, symbol)[cell]
+                board._take_free(cell)
+        for mask in masks.values():
+            board.occupied |= mask
+        # Kolejność ruchów nie jest zakodowana, więc nie ma też "ostatniego ruchu"
+        return board
+
+    def snapshot(self):
+        """
+        Zapisuje bieżącą pozycję jako niezmienny ``BoardSnapshot`` (czas i pamięć O(size²) bajtów).
+
+        Returns:
+            BoardSnapshot: Zapis pozycji, łącznie z informacją o ostatnim ruchu.
+        """
+        return BoardSnapshot(self.to_bytes(), self.last_symbol, self.last_shapes)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Odtwarza planszę z zapisu pozycji.
+
+        Args:
+            snapshot (BoardSnapshot): Zapis zwrócony przez ``snapshot``.
+
+        Returns:
+            GameBoard: Nowa plansza o tym samym stanie, łącznie z informacją o ostatnim ruchu.
+        """
+        board = cls.from_bytes(snapshot.cells)
+        board.last_symbol = snapshot.last_symbol
+        board.last_shapes = snapshot.last_shapes
+        return board
+
+    def copy(self):
+        """
+        Tworzy niezależną kopię planszy (np. dla wątku lub procesu liczącego ruch AI).
+
+        Returns:
+            GameBoard: Nowa plansza o tym samym stanie, łącznie z informacją o ostatnim ruchu.
+        """
+        return GameBoard.from_snapshot(self.snapshot())
 
     def display_board(self):
         """
@@ -44,7 +283,7 @@ class GameBoard:
         Returns:
             bool: True, jeśli pole jest dostępne, False w przeciwnym wypadku.
         """
-        return self.board[row][col] == ' '
+        return not self.occupied >> (row * self.size + col) & 1
 
     def place_symbol(self, symbol, row, col):
         """
@@ -54,17 +293,189 @@ class GameBoard:
             symbol (str): Symbol, który ma zostać umieszczony (np. 'X' lub 'O').
             row (int): Wiersz planszy.
             col (int): Kolumna planszy.
+
+        Returns:
+            tuple: Nazwy kształtów ułożonych tym ruchem, w kolejności priorytetu
+            (pusta krotka, jeśli ruch nie utworzył kształtu lub zwalnia pole).
         """
+        cell = row * self.size + col
+        bit = 1 << cell
+        previous = self.board[row][col]
+        if previous != ' ':
+            self.masks[previous] &= ~bit
+            self.occupied &= ~bit
+            self.hash ^= zobrist_keys(self.size, previous)[cell]
+        if symbol != ' ':
+            self.masks[symbol] = self.masks.get(symbol, 0) | bit
+            self.occupied |= bit
+            self.hash ^= zobrist_keys(self.size, symbol)[cell]
+        if previous == ' ' and symbol != ' ':
+            self._take_free(cell)
+        elif previous != ' ' and symbol == ' ':
+            self._release_free(cell)
         self.board[row][col] = symbol
+        for observer in self.observers:
+            observer.cell_changed(cell, previous, symbol)
+
+        shapes = ()
+        if symbol != ' ':
+            mask = self.masks[symbol]
+            for name, shape_mask in self.cell_index[cell]:
+                if shape_mask & mask == shape_mask and name not in shapes:
+                    shapes += (name,)
+        self.last_symbol = symbol
+        self.last_shapes = shapes
+        return shapes
+
+    def make_move(self, symbol, row, col):
+        """
+        Stawia symbol na wolnym polu, zapamiętując ruch na stosie ``undo_stack``.
+
+        Args:
+            symbol (str): Symbol, który ma zostać umieszczony (np. 'X' lub 'O').
+            row (int): Wiersz planszy.
+            col (int): Kolumna planszy.
+
+        Returns:
+            tuple: Nazwy kształtów ułożonych tym ruchem (jak ``place_symbol``).
+        """
+        self.undo_stack.append((row * self.size + col, self.board[row][col], self.last_symbol, self.last_shapes))
+        return self.place_symbol(symbol, row, col)
+
+    def unmake_move(self):
+        """
+        Cofa ostatni ruch wykonany przez ``make_move``.
+
+        Przywracane są pole, maski, hash, lista wolnych pól (w tej samej kolejności), informacja
+        o ostatnim ruchu oraz - przez powiadomienie obserwatorów - ich przyrostowe dane.
+
+        Raises:
+            IndexError: Jeśli nie ma ruchu do cofnięcia.
+        """
+        cell, previous, last_symbol, last_shapes = self.undo_stack.pop()
+        self.place_symbol(previous, cell // self.size, cell % self.size)
+        self.last_symbol = last_symbol
+        self.last_shapes = last_shapes
+
+    def _take_free(self, cell):
+        """
+        Usuwa pole z listy wolnych pól, przenosząc na jego miejsce ostatni element.
+        """
+        free = self.free
+        index = self._free_index[cell]
+        last = free.pop()
+        if last != cell:
+            free[index] = last
+            self._free_index[last] = index
+        self.occupied_count += 1
+
+    def _release_free(self, cell):
+        """
+        Przywraca pole na listę wolnych pól.
+
+        ``_free_index`` zwolnionego pola nadal wskazuje jego dawną pozycję, więc przy cofaniu ruchów
+        w odwrotnej kolejności lista wraca dokładnie do poprzedniego stanu - iteracja po ``free``
+        z ruchem i jego cofnięciem w środku pętli jest więc bezpieczna.
+        """
+        free = self.free
+        index = self._free_index[cell]
+        if index < len(free):
+            moved = free[index]
+            self._free_index[moved] = len(free)
+            free.append(moved)
+            free[index] = cell
+        else:
+            index = len(free)
+            free.append(cell)
+            self._free_index[cell] = index
+        self.occupied_count -= 1
+
+    def is_full(self):
+        """
+        Sprawdza w O(1), czy wszystkie pola planszy są zajęte.
+
+        Returns:
+            bool: True, jeśli nie ma wolnych pól.
+        """
+        return self.occupied_count == self.size * self.size
+
+    def iter_free_cells(self):
+        """
+        Zwraca iterator numerów wolnych pól bez kopiowania listy.
+
+        W trakcie iteracji wolno wykonywać ruchy, o ile każdy zostanie cofnięty (w odwrotnej
+        kolejności) przed przejściem do następnego pola.
+
+        Returns:
+            iterator: Numery pól (``wiersz * size + kolumna``).
+        """
+        return iter(self.free)
+
+    def candidate_cells(self, radius):
+        """
+        Zwraca wolne pola w odległości co najwyżej ``radius`` (w wierszach i kolumnach) od zajętych pól.
+
+        Zwracana jest nowa lista, więc w trakcie iteracji wolno wykonywać ruchy.
+
+        Args:
+            radius (int): Promień sąsiedztwa.
+
+        Returns:
+            list: Numery pól (``wiersz * size + kolumna``); na pustej planszy - środek planszy.
+        """
+        size = self.size
+        occupied = self.occupied
+        if not occupied:
+            return [(size // 2) * size + size // 2]
+        candidates = {}  # Słownik zamiast zbioru - kolejność nie zależy od hashowania
+        mask = occupied
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            row, col = divmod(low.bit_length() - 1, size)
+            for r in range(max(0, row - radius), min(size, row + radius + 1)):
+                for neighbour in range(r * size + max(0, col - radius), r * size + min(size, col + radius + 1)):
+                    if not occupied >> neighbour & 1:
+                        candidates[neighbour] = None
+        return list(candidates)
+
+    def last_move_points(self):
+        """
+        Zwraca punkty za kształt ułożony ostatnim ruchem, bez przeszukiwania całej planszy.
+
+        Returns:
+            int: Liczba punktów za kształt o najwyższym priorytecie lub 0, jeśli ruch nie utworzył kształtu.
+        """
+        if self.last_shapes:
+            return self.shapes.points[self.last_shapes[0]]
+        return 0
 
     def get_available_positions(self):
         """
         Zwraca listę dostępnych pozycji na planszy.
 
         Returns:
-            list: Lista krotek zawierających dostępne współrzędne (wiersz, kolumna).
+            list: Lista krotek zawierających dostępne współrzędne (wiersz, kolumna), w kolejności listy ``free``.
+        """
+        size = self.size
+        return [divmod(cell, size) for cell in self.free]
+
+    def _has_shape(self, name, symbol):
+        """
+        Sprawdza, czy któreś z ułożeń danego kształtu jest w całości zajęte przez symbol.
+
+        Args:
+            name (str): Nazwa kształtu z rejestru ``shapes``.
+            symbol (str): Symbol, który ma być sprawdzony.
+
+        Returns:
+            bool: True, jeśli kształt został znaleziony, False w przeciwnym wypadku.
         """
-        return [(r, c) for r in range(self.size) for c in range(self.size) if self.board[r][c] == ' ']
+        mask = self.masks.get(symbol, 0)
+        for shape_mask in self.shape_masks[name]:
+            if shape_mask & mask == shape_mask:
+                return True
+        return False
 
     def check_t_shape(self, symbol):
         """
@@ -76,15 +487,7 @@ class GameBoard:
         Returns:
             bool: True, jeśli kształt T został znaleziony, False w przeciwnym wypadku.
         """
-        for r in range(self.size - 2):
-            for c in range(1, self.size - 1):
-                if (self.board[r][c] == symbol and
-                        self.board[r + 1][c - 1] == symbol and
-                        self.board[r + 1][c] == symbol and
-                        self.board[r + 1][c + 1] == symbol and
-                        self.board[r + 2][c] == symbol):
-                    return True
-        return False
+        return self._has_shape('t', symbol)
 
     def check_square_shape(self, symbol):
         """
@@ -96,18 +499,7 @@ class GameBoard:
         Returns:
             bool: True, jeśli kształt kwadratu został znaleziony, False w przeciwnym wypadku.
         """
-        for r in range(self.size - 2):
-            for c in range(self.size - 2):
-                if (self.board[r][c] == symbol and
-                        self.board[r][c + 2] == symbol and
-                        self.board[r + 2][c] == symbol and
-                        self.board[r + 2][c + 2] == symbol and
-                        self.board[r][c + 1] == symbol and
-                        self.board[r + 2][c + 1] == symbol and
-                        self.board[r + 1][c] == symbol and
-                        self.board[r + 1][c + 2] == symbol):
-                    return True
-        return False
+        return self._has_shape('square', symbol)
 
     def check_line_shape(self, symbol):
         """
@@ -119,17 +511,7 @@ class GameBoard:
         Returns:
             bool: True, jeśli linia została znaleziona, False w przeciwnym wypadku.
         """
-        for r in range(self.size):
-            for c in range(self.size - 4):
-                if all(self.board[r][c + i] == symbol for i in range(5)):
-                    return True
-
-        for c in range(self.size):
-            for r in range(self.size - 4):
-                if all(self.board[r + i][c] == symbol for i in range(5)):
-                    return True
-
-        return False
+        return self._has_shape('line', symbol)
 
     def check_l_shape(self, symbol):
         """
@@ -141,19 +523,15 @@ class GameBoard:
         Returns:
             bool: True, jeśli kształt L został znaleziony, False w przeciwnym wypadku.
         """
-        for r in range(self.size - 2):
-            for c in range(self.size - 2):
-                if (self.board[r][c] == symbol and
-                        self.board[r + 1][c] == symbol and
-                        self.board[r + 2][c] == symbol and
-                        self.board[r + 2][c + 1] == symbol and
-                        self.board[r + 2][c + 2] == symbol):
-                    return True
-        return False
+        return self._has_shape('l', symbol)
 
     def check_for_win(self, symbol):
         """
-        Sprawdza, czy któryś z kształtów (T, kwadrat, linia, L) utworzonych z danego symbolu został ułożony.
+        Sprawdza, czy któryś z zarejestrowanych kształtów (domyślnie T, kwadrat, linia, L) utworzonych
+        z danego symbolu został ułożony.
+
+        Ułożenia są sprawdzane w kolejności priorytetu kształtów, więc pierwsze dopasowanie
+        wyznacza wynik.
 
         Args:
             symbol (str): Symbol, który ma być sprawdzony.
@@ -161,12 +539,8 @@ class GameBoard:
         Returns:
             int: Liczba punktów za znaleziony kształt lub 0, jeśli kształt nie został znaleziony.
         """
-        if self.check_t_shape(symbol):
-            return 5  # Litera T
-        elif self.check_square_shape(symbol):
-            return 8  # Kwadrat
-        elif self.check_line_shape(symbol):
-            return 4  # Linia
-        elif self.check_l_shape(symbol):
-            return 5  # Litera L
+        mask = self.masks.get(symbol, 0)
+        for name, shape_mask in self.shapes.placements:
+            if shape_mask & mask == shape_mask:
+                return self.shapes.points[name]
         return 0  # Brak kształtu
@@ -0,0 +1,136 @@
+"""
+Moduł heurystycznej oceny pozycji dla przeszukiwania z ograniczoną głębokością.
+
+Ocena liczy dla każdego symbolu ułożenia kształtów, których nie blokuje jeszcze żaden symbol
+przeciwnika, ważone liczbą punktów kształtu i tym, ile pól brakuje do jego ułożenia. Wynik jest
+aktualizowany przyrostowo przy każdej zmianie pola (evaluator jest obserwatorem planszy),
+więc ocena liścia nie wymaga przeglądania planszy.
+"""
+
+# Waga ułożenia według liczby brakujących pól (indeks); ułożenia, którym brakuje więcej pól,
+# nie są liczone.
+THREAT_WEIGHTS = (0, 256, 64, 16, 4, 1)
+
+
+class ThreatEvaluator:
+    """
+    Przyrostowa ocena zagrożeń dla jednej planszy.
+
+    Attributes:
+        board (GameBoard): Oceniana plansza (evaluator jest zarejestrowany jako jej obserwator).
+        scores (dict): Suma wag niezablokowanych ułożeń według symbolu.
+    """
+
+    def __init__(self, board):
+        """
+        Wylicza ocenę bieżącej pozycji i rejestruje się jako obserwator planszy.
+
+        Args:
+            board (GameBoard): Oceniana plansza.
+        """
+        shapes = board.shapes
+        self.board = board
+        self.scores = {}
+        self._cell_placements = shapes.cell_placements
+        # Waga ułożenia według liczby zajętych pól
+        self._weights = []
+        for points, size in zip(shapes.placement_points, shapes.placement_sizes):
+            weights = [0] * (size + 1)
+            for count in range(1, size + 1):
+                missing = size - count
+                if missing < len(THREAT_WEIGHTS):
+                    weights[count] = points * THREAT_WEIGHTS[missing]
+            self._weights.append(weights)
+        self._counts = {}  # Liczba pól ułożenia zajętych przez symbol
+        self._totals = [0] * len(shapes.placements)  # Liczba zajętych pól ułożenia
+        self._owners = [None] * len(shapes.placements)  # Jedyny symbol w ułożeniu (None - puste lub zablokowane)
+
+        size = board.size
+        for cell in range(size * size):
+            symbol = board.board[cell // size][cell % size]
+            if symbol != ' ':
+                self.cell_changed(cell, ' ', symbol)
+        board.add_observer(self)
+
+    def detach(self):
+        """
+        Wyrejestrowuje evaluator z planszy.
+        """
+        self.board.remove_observer(self)
+
+    def cell_changed(self, cell, previous, symbol):
+        """
+        Aktualizuje ocenę po zmianie pola (wywoływane przez ``GameBoard.place_symbol``).
+
+        Args:
+            cell (int): Numer pola.
+            previous (str): Zawartość pola przed zmianą.
+            symbol (str): Zawartość pola po zmianie.
+        """
+        if previous != ' ':
+            self._remove(cell, previous)
+        if symbol != ' ':
+            self._add(cell, symbol)
+
+    def _add(self, cell, symbol):
+        """
+        Dolicza symbol postawiony na polu do ułożeń, które je pokrywają.
+        """
+        counts = self._counts.get(symbol)
+        if counts is None:
+            counts = self._counts[symbol] = [0] * len(self._totals)
+            self.scores[symbol] = 0
+        scores = self.scores
+        totals = self._totals
+        owners = self._owners
+        weights = self._weights
+        for number in self._cell_placements[cell]:
+            total = totals[number]
+            owner = owners[number]
+            if owner is not None:
+                scores[owner] -= weights[number][total]
+            counts[number] += 1
+            totals[number] = total + 1
+            if total == 0 or owner == symbol:
+                owners[number] = symbol
+                scores[symbol] += weights[number][total + 1]
+            else:
+                owners[number] = None  # Ułożenie zablokowane
+
+    def _remove(self, cell, symbol):
+        """
+        Odejmuje symbol zdjęty z pola od ułożeń, które je pokrywają.
+        """
+        counts = self._counts[symbol]
+        scores = self.scores
+        totals = self._totals
+        owners = self._owners
+        weights = self._weights
+        for number in self._cell_placements[cell]:
+            owner = owners[number]
+            if owner is not None:
+                scores[owner] -= weights[number][totals[number]]
+            counts[number] -= 1
+            total = totals[number] = totals[number] - 1
+            owner = None
+            if total:
+                # Ułożenie wraca do jedynego symbolu, który w nim pozostał
+                for other, other_counts in self._counts.items():
+                    if other_counts[number] == total:
+                        owner = other
+                        scores[other] += weights[number][total]
+                        break
+            owners[number] = owner
+
+    def score(self, symbol):
+        """
+        Zwraca ocenę pozycji z punktu widzenia symbolu.
+
+        Args:
+            symbol (str): Symbol gracza.
+
+        Returns:
+            int: Suma wag niezablokowanych ułożeń symbolu minus suma wag ułożeń pozostałych symboli.
+        """
+        own = self.scores.get(symbol, 0)
+        return own - (sum(self.scores.values()) - own)
@@ -1,7 +1,16 @@
 import random
+from ai import create_strategy
 from board import GameBoard
 from player import Player
-import pygame
+from records import MODE_SELFPLAY, GameRecord, RecordWriter, RoundRecord
+
+ROUNDS = 3
+BOARD_SIZE = 10
+
+# Wyniki ruchu zwracane przez Game.apply_move
+MOVE_CONTINUE = 'continue'
+MOVE_WIN = 'win'
+MOVE_DRAW = 'draw'
 
 
 class Game:
@@ -13,29 +22,44 @@ class Game:
         board (GameBoard): Obiekt planszy do gry.
         players (list): Lista graczy biorących udział w grze.
         current_player (Player): Aktualnie wykonujący ruch gracz.
+        ai_engines (dict): Silniki AI według symbolu gracza; zachowują stan (np. tablicę transpozycji
+            lub drzewo MCTS) między ruchami.
+        mode (int): Tryb gry zapisywany w rekordzie (``records.MODE_*``).
+        record (GameRecord): Zapis przebiegu gry (ruchy i wyniki rund).
+        record_path (str): Plik, do którego ``end_game`` dopisuje zapis gry (None - gra nie jest zapisywana).
     """
 
+    __slots__ = ('round_number', 'board', 'players', 'current_player', 'ai_engines', 'mode', 'record', 'record_path')
+
     def __init__(self):
         """
         Inicjalizuje nową grę, ustawia planszę i przygotowuje listę graczy.
         """
         self.round_number = 1
-        self.board = GameBoard(10)
+        self.board = GameBoard(BOARD_SIZE)
         self.players = []
         self.current_player = None
+        self.ai_engines = {}
+        self.mode = MODE_SELFPLAY
+        self.record = GameRecord(size=BOARD_SIZE)
+        self.record_path = None
 
     def choose_game_mode(self):
         """
         Wybiera tryb gry: gracz vs gracz lub gracz vs AI.
         Dodaje odpowiednich graczy do gry.
         """
-        choice = input("Choose game mode:\n1. Play vs Player\n2. Play vs AI\n")
+        choice = input("Choose game mode:\n1. Play vs Player\n2. Play vs AI\n3. Play vs AI (MCTS)\n")
+        self.mode = int(choice) if choice in ('1', '2', '3') else 1
         if choice == '1':
             self.players.append(Player('X'))
             self.players.append(Player('O'))
         elif choice == '2':
             self.players.append(Player('X'))
             self.players.append(Player('O', is_ai=True))
+        elif choice == '3':
+            self.players.append(Player('X'))
+            self.players.append(Player('O', is_ai=True, strategy='mcts'))
         else:
             print("Invalid choice, defaulting to Player vs Player.")
             self.players.append(Player('X'))
@@ -50,18 +74,21 @@ class Game:
         """
         self.round_number += 1
 
-    def check_for_round_end(self):
+    def check_for_round_end(self, outcome):
         """
-        Sprawdza, czy runda się zakończyła poprzez wygraną lub zapełnienie planszy.
+        Ogłasza koniec rundy, jeśli ostatni ruch ją zakończył (punkty przyznaje już ``apply_move``).
+
+        Args:
+            outcome (str): Wynik ruchu zwrócony przez ``apply_move``.
 
         Returns:
             bool: True, jeśli runda się zakończyła (ktoś wygrał lub plansza jest pełna), False w przeciwnym razie.
         """
-        if self.board.check_for_win(self.current_player.symbol):
-            print(f"{self.current_player.symbol} wins the round!")
-            self.current_player.points += 1
+        if outcome == MOVE_WIN:
+            points = self.board.last_move_points()
+            print(f"{self.current_player.symbol} wins the round and earns {points} points!")
             return True
-        elif not any(' ' in row for row in self.board.board):
+        elif outcome == MOVE_DRAW:
             print("The board is full! The round ends in a draw.")
             return True
         return False
@@ -72,11 +99,10 @@ class Game:
         """
         self.board.display_board()
         while True:
-            self.player_turn()
+            outcome = self.player_turn()
             self.board.display_board()
-            if self.check_for_round_end():
+            if self.check_for_round_end(outcome):
                 break
-            self.switch_player()
 
     def play_game(self):
         """
@@ -87,10 +113,10 @@ class Game:
         self.current_player = random.choice(self.players)
         print(f"{self.current_player.symbol} starts the game!")
 
-        while self.round_number <= 3:
+        while self.round_number <= ROUNDS:
             print(f"Starting round {self.round_number}!")
             self.play_round()
-            if self.round_number < 3:
+            if self.round_number < ROUNDS:
                 self.next_round()
             else:
                 self.end_game()
@@ -116,46 +142,171 @@ class Game:
         else:
             print("It's a draw!")
 
-        pygame.quit()
+        self.save_record()
+        self.close_engines()
         exit()
 
     def end_round(self):
         """
         Zakończenie rundy i reset planszy lub zakończenie gry po 3 rundach.
         """
-        self.round_number += 1
-        if self.round_number > 3:
-            self.end_game()
-        else:
-            self.board = GameBoard(10)
+        if self.start_next_round():
             print(f"Starting round {self.round_number}!")
+        else:
+            self.end_game()
+
+    def start_next_round(self):
+        """
+        Przechodzi do następnej rundy i przygotowuje nową planszę (bez wypisywania komunikatów).
+
+        Returns:
+            bool: True, jeśli rozpoczęła się kolejna runda, False, jeśli gra się zakończyła.
+        """
+        self.round_number += 1
+        if self.is_finished():
+            return False
+        self.board = GameBoard(BOARD_SIZE)
+        return True
+
+    def is_finished(self):
+        """
+        Sprawdza, czy rozegrano już wszystkie rundy.
+
+        Returns:
+            bool: True, jeśli gra się zakończyła.
+        """
+        return self.round_number > ROUNDS
+
+    def apply_move(self, row, col):
+        """
+        Stawia symbol aktualnego gracza i rozstrzyga skutki ruchu (bez wypisywania komunikatów).
+
+        Za ułożony kształt gracz dostaje jego punkty. Jeśli runda trwa dalej, ruch przechodzi
+        na drugiego gracza; po zakończeniu rundy aktualny gracz się nie zmienia.
+
+        Args:
+            row (int): Wiersz planszy.
+            col (int): Kolumna planszy.
+
+        Returns:
+            str: MOVE_WIN (gracz ułożył kształt), MOVE_DRAW (plansza pełna) lub MOVE_CONTINUE.
+        """
+        self.board.place_symbol(self.current_player.symbol, row, col)
+        self.record_move(row, col)
+        points = self.board.last_move_points()
+        if points > 0:
+            self.current_player.points += points
+            self.record_round_end(points)
+            return MOVE_WIN
+        elif self.board.is_full():
+            self.record_round_end(0)
+            return MOVE_DRAW
+        self.switch_player()
+        return MOVE_CONTINUE
+
+    def record_move(self, row, col):
+        """
+        Dopisuje ruch aktualnego gracza do zapisu gry; pierwszy ruch rundy rozpoczyna zapis rundy.
+
+        Args:
+            row (int): Wiersz planszy.
+            col (int): Kolumna planszy.
+        """
+        rounds = self.record.rounds
+        if len(rounds) < self.round_number:
+            self.record.symbols = ''.join(player.symbol for player in self.players)
+            rounds.append(RoundRecord(self.players.index(self.current_player)))
+        rounds[-1].moves.append(row * self.board.size + col)
+
+    def record_round_end(self, points):
+        """
+        Zapisuje wynik bieżącej rundy.
+
+        Args:
+            points (int): Punkty zdobyte przez aktualnego gracza (0 - remis).
+        """
+        game_round = self.record.rounds[-1]
+        if points:
+            game_round.winner = self.players.index(self.current_player)
+            game_round.shape = self.board.last_shapes[0]
+            game_round.points = points
+
+    def save_record(self):
+        """
+        Dopisuje zapis gry do pliku ``record_path`` (jeśli jest ustawiony).
+        """
+        if self.record_path is not None:
+            self.record.mode = self.mode
+            with RecordWriter(self.record_path) as writer:
+                writer.append(self.record)
 
     def player_turn(self):
         """
         Obsługuje ruch aktualnego gracza lub AI.
+
+        Returns:
+            str: Wynik ruchu (patrz ``apply_move``).
         """
         if self.current_player.is_ai:
             print("AI's turn...")
-            self.ai_move()
-        else:
-            print(f"{self.current_player.symbol}'s turn.")
-            while True:
-                try:
-                    row, col = map(int, input("Enter row and column (e.g., 1 1): ").split())
-                    if self.board.is_spot_available(row, col):
-                        self.board.place_symbol(self.current_player.symbol, row, col)
-                        break
-                    else:
-                        print("That spot is already taken. Try again.")
-                except (ValueError, IndexError):
-                    print("Invalid input. Please enter two numbers separated by a space, e.g., '1 1'.")
+            return self.ai_move()
+        print(f"{self.current_player.symbol}'s turn.")
+        while True:
+            try:
+                row, col = map(int, input("Enter row and column (e.g., 1 1): ").split())
+                if self.board.is_spot_available(row, col):
+                    return self.apply_move(row, col)
+                else:
+                    print("That spot is already taken. Try again.")
+            except (ValueError, IndexError):
+                print("Invalid input. Please enter two numbers separated by a space, e.g., '1 1'.")
 
     def ai_move(self):
         """
-        Logika ruchu AI - wybiera losowe wolne miejsce na planszy.
+        Logika ruchu AI - wybiera ruch strategią AI aktualnego gracza (domyślnie alfa-beta).
+
+        Returns:
+            str: Wynik ruchu (patrz ``apply_move``); MOVE_DRAW, jeśli plansza jest pełna.
+        """
+        move = self.choose_ai_move()
+        if move is None:
+            return MOVE_DRAW
+        row, col = move
+        symbol = self.current_player.symbol
+        outcome = self.apply_move(row, col)
+        print(f"AI placed {symbol} at ({row}, {col})")
+        return outcome
+
+    def choose_ai_move(self):
+        """
+        Wybiera ruch AI dla aktualnego gracza, nie wykonując go.
+
+        Returns:
+            tuple: Współrzędne (wiersz, kolumna) ruchu lub None, jeśli plansza jest pełna.
+        """
+        player = self.current_player
+        opponent = self.players[0] if player == self.players[1] else self.players[1]
+        return self.ai_engine(player).select_move(self.board, player.symbol, opponent.symbol)
+
+    def ai_engine(self, player):
+        """
+        Zwraca silnik AI gracza, tworząc go przy pierwszym użyciu.
+
+        Args:
+            player (Player): Gracz sterowany przez AI.
+
+        Returns:
+            object: Strategia z metodą ``select_move`` (patrz ``ai.create_strategy``).
+        """
+        engine = self.ai_engines.get(player.symbol)
+        if engine is None:
+            engine = self.ai_engines[player.symbol] = create_strategy(player.strategy)
+        return engine
+
+    def close_engines(self):
+        """
+        Zamyka silniki AI graczy (np. pulę procesów ``ParallelSearch``) i usuwa je z pamięci podręcznej.
         """
-        available_positions = self.board.get_available_positions()
-        if available_positions:
-            row, col = random.choice(available_positions)
-            self.board.place_symbol(self.current_player.symbol, row, col)
-            print(f"AI placed {self.current_player.symbol} at ({row}, {col})")
+        for engine in self.ai_engines.values():
+            engine.close()
+        self.ai_engines.clear()
@@ -0,0 +1,455 @@
+"""
+Moduł opcjonalnej instrumentacji AI i planszy: liczniki przeszukiwania, sprawdzeń kształtów,
+trafień w pamięci podręczne oraz czasy ruchów.
+
+Instrumentacja jest włączana przez podmianę (monkeypatching) funkcji i metod: ``ai.minimax``,
+``ai.get_best_move``, ``AlphaBetaSearch._alphabeta``, ``select_move`` strategii z
+``ai.STRATEGIES``, metod ``GameBoard`` (``place_symbol``, ``check_for_win``, ``_has_shape``),
+``ThreatEvaluator`` (``cell_changed``, ``score``) oraz ``OpeningBook.lookup``. Wyłączona nie kosztuje
+nic - kod gry działa na oryginalnych funkcjach. Funkcje są podmieniane jako atrybuty modułu ``ai``,
+więc wywołania przez nazwę zaimportowaną wcześniej (``from ai import get_best_move``) trafiają do
+oryginału i nie są liczone - instrumentowany kod musi wywoływać ``ai.get_best_move``.
+Liczniki są globalne dla procesu, więc naraz może być włączona jedna instrumentacja; przeszukiwania
+w innych procesach (parallel.py, opening_book.py) nie są liczone.
+
+Statystyki są zbierane dla jednej gry: ``end_game`` zwraca je jako słownik (jeden wiersz JSON
+w pliku ``write_json_line``) i zeruje liczniki. Statystyki wielu gier sumuje ``add``.
+
+Przykład:
+    stats = Instrumentation()
+    stats.enable()
+    ...
+    print(stats.summary_line())
+    write_json_line('stats.jsonl', stats.end_game(match=1))
+    stats.disable()
+"""
+
+import functools
+import json
+import time
+from collections import Counter
+
+import ai
+from board import GameBoard
+from evaluation import ThreatEvaluator
+from opening_book import OpeningBook
+
+# Górne granice przedziałów histogramu czasu ruchu w milisekundach (ostatni przedział jest otwarty).
+LATENCY_BUCKETS_MS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+LATENCY_LABELS = tuple(f"<{bound}ms" for bound in LATENCY_BUCKETS_MS) + (f">={LATENCY_BUCKETS_MS[-1]}ms",)
+
+_active = None
+
+
+def active():
+    """
+    Zwraca włączoną instrumentację.
+
+    Returns:
+        Instrumentation: Włączona instrumentacja lub None.
+    """
+    return _active
+
+
+def latency_bucket(ms):
+    """
+    Zwraca etykietę przedziału histogramu dla czasu ruchu.
+
+    Args:
+        ms (float): Czas ruchu w milisekundach.
+
+    Returns:
+        str: Etykieta przedziału, np. ``'<8ms'`` lub ``'>=4096ms'``.
+    """
+    for bound, label in zip(LATENCY_BUCKETS_MS, LATENCY_LABELS):
+        if ms < bound:
+            return label
+    return LATENCY_LABELS[-1]
+
+
+class Instrumentation:
+    """
+    Liczniki zbierane po włączeniu instrumentacji.
+
+    Attributes:
+        counters (Counter): Liczniki zdarzeń (węzły, ruchy, wywołania metod planszy, trafienia itd.).
+        shapes_formed (Counter): Kształty ułożone przez ``place_symbol`` według nazwy.
+        shape_checks (Counter): Sprawdzone ułożenia kształtów według nazwy kształtu - w ``place_symbol``
+            (ułożenia z ``cell_index`` pokrywające postawione pole), ``check_for_win`` i ``_has_shape``.
+        nodes_by_ply (Counter): Węzły przeszukiwania według odległości od korzenia.
+        latency (Counter): Histogram czasu ruchów AI (patrz ``latency_bucket``).
+        moves (list): Szczegóły kolejnych ruchów AI (strategia, czas, węzły, głębokość, ruchy w korzeniu).
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.shapes_formed = Counter()
+        self.shape_checks = Counter()
+        self.nodes_by_ply = Counter()
+        self.latency = Counter()
+        self.moves = []
+        self._originals = []
+        self._move = None  # Szczegóły liczonego właśnie ruchu AI
+        self._last_cell = None
+        self._fresh = False  # Czy bieżący węzeł przeszukiwania nie ma jeszcze potomków
+        self._cell_checks = {}  # Liczba ułożeń każdego kształtu pokrywających pole, według ShapeTable
+
+    def reset(self):
+        """
+        Zeruje liczniki (podmienione funkcje trzymają odwołania do tych samych obiektów ``Counter``).
+        """
+        for counter in (self.counters, self.shapes_formed, self.shape_checks, self.nodes_by_ply, self.latency):
+            counter.clear()
+        self.moves = []
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def enable(self):
+        """
+        Podmienia instrumentowane funkcje i metody.
+
+        Raises:
+            RuntimeError: Jeśli inna instrumentacja jest już włączona.
+        """
+        global _active
+        if _active is self:
+            return
+        if _active is not None:
+            raise RuntimeError("Another instrumentation is already enabled")
+        _active = self
+        self._patch(ai, 'minimax', self._wrap_minimax)
+        self._patch(ai, 'get_best_move', self._wrap_move('minimax'))
+        self._patch(ai.AlphaBetaSearch, '_alphabeta', self._wrap_alphabeta)
+        for name, strategy_class in ai.STRATEGIES.items():
+            self._patch(strategy_class, 'select_move', self._wrap_select_move(name))
+        self._patch(GameBoard, 'place_symbol', self._wrap_place_symbol)
+        self._patch(GameBoard, 'check_for_win', self._wrap_check_for_win)
+        self._patch(GameBoard, '_has_shape', self._wrap_has_shape)
+        self._patch(ThreatEvaluator, 'cell_changed', self._wrap_cell_changed)
+        self._patch(ThreatEvaluator, 'score', self._wrap_evaluator_score)
+        self._patch(OpeningBook, 'lookup', self._wrap_book_lookup)
+
+    def disable(self):
+        """
+        Przywraca oryginalne funkcje i metody (liczniki zostają).
+        """
+        global _active
+        if _active is not self:
+            return
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+        _active = None
+
+    def _patch(self, owner, name, make_wrapper):
+        """
+        Zastępuje atrybut ``owner.name`` funkcją zwróconą przez ``make_wrapper(oryginał)``.
+        """
+        original = owner.__dict__[name]
+        self._originals.append((owner, name, original))
+        setattr(owner, name, functools.wraps(original)(make_wrapper(original)))
+
+    def _wrap_minimax(self, original):
+        counters = self.counters
+        nodes_by_ply = self.nodes_by_ply
+
+        def minimax(board, depth, *args, **kwargs):
+            counters['minimax_nodes'] += 1
+            nodes_by_ply[depth + 1] += 1
+            if self._fresh:  # Pierwszy potomek - rodzic został rozwinięty
+                counters['expanded_nodes'] += 1
+            self._fresh = True
+            try:
+                if depth == 0:  # Ruch w korzeniu (wywołanie z get_best_move)
+                    return self._timed_root_move(original, board, depth, *args, **kwargs)
+                return original(board, depth, *args, **kwargs)
+            finally:
+                self._fresh = False
+        return minimax
+
+    def _wrap_alphabeta(self, original):
+        counters = self.counters
+        nodes_by_ply = self.nodes_by_ply
+
+        def _alphabeta(search, board, depth, ply, *args):
+            counters['alphabeta_nodes'] += 1
+            nodes_by_ply[ply] += 1
+            if self._fresh:
+                counters['expanded_nodes'] += 1
+            self._fresh = True
+            try:
+                if ply == 1:
+                    return self._timed_root_move(original, search, board, depth, ply, *args)
+                return original(search, board, depth, ply, *args)
+            finally:
+                self._fresh = False
+        return _alphabeta
+
+    def _timed_root_move(self, original, *args, **kwargs):
+        """
+        Wywołuje przeszukiwanie poddrzewa ruchu w korzeniu i dolicza jego czas i węzły do ruchu AI.
+        """
+        cell = self._last_cell
+        nodes = self.counters['minimax_nodes'] + self.counters['alphabeta_nodes']
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            if self._move is not None:
+                root = self._move['root'].setdefault(cell, [0.0, 0])
+                root[0] += (time.perf_counter() - start) * 1000
+                root[1] += self.counters['minimax_nodes'] + self.counters['alphabeta_nodes'] - nodes
+
+    def _wrap_move(self, strategy):
+        def wrap(original):
+            def select_move(*args, **kwargs):
+                return self._timed_move(strategy, None, original, *args, **kwargs)
+            return select_move
+        return wrap
+
+    def _wrap_select_move(self, strategy):
+        def wrap(original):
+            def select_move(engine, *args, **kwargs):
+                return self._timed_move(strategy, engine, original, engine, *args, **kwargs)
+            return select_move
+        return wrap
+
+    def _timed_move(self, strategy, engine, original, *args, **kwargs):
+        """
+        Wywołuje wybór ruchu AI i zapisuje jego czas, liczbę węzłów i statystyki silnika.
+        """
+        if self._move is not None:  # Strategia wywołana przez inną strategię - liczy się zewnętrzna
+            return original(*args, **kwargs)
+        counters = self.counters
+        tt = getattr(engine, 'tt', None)
+        tt_before = (tt.hits, tt.misses) if tt is not None else (0, 0)
+        nodes = counters['minimax_nodes'] + counters['alphabeta_nodes']
+        move = self._move = {'strategy': strategy, 'root': {}}
+        start = time.perf_counter()
+        try:
+            self._fresh = True  # Korzeń - każda iteracja pogłębiania liczy się jako osobne rozwinięcie
+            result = original(*args, **kwargs)
+        finally:
+            self._move = None
+            self._fresh = False
+        ms = (time.perf_counter() - start) * 1000
+
+        move['ms'] = ms
+        move['nodes'] = counters['minimax_nodes'] + counters['alphabeta_nodes'] - nodes
+        move['move'] = result
+        if tt is not None:
+            counters['tt_hits'] += tt.hits - tt_before[0]
+            counters['tt_misses'] += tt.misses - tt_before[1]
+        if getattr(engine, 'depth_reached', None) is not None and move['nodes']:
+            move['depth'] = engine.depth_reached
+            counters['depth_reached'] += engine.depth_reached
+            counters['searched_moves'] += 1
+        if getattr(engine, 'last_iterations', None) is not None:
+            move['iterations'] = engine.last_iterations
+            counters['mcts_iterations'] += engine.last_iterations
+        move['root'] = [[cell, round(root_ms, 3), root_nodes]
+                        for cell, (root_ms, root_nodes) in move['root'].items()]
+        counters['ai_moves'] += 1
+        counters['ai_ms'] += ms
+        counters['root_moves'] += len(move['root'])
+        self.latency[latency_bucket(ms)] += 1
+        self.moves.append(move)
+        return result
+
+    def _placement_counts(self, shapes, cell):
+        """
+        Zwraca liczbę ułożeń każdego kształtu pokrywających pole (sprawdzanych przez ``place_symbol``).
+        """
+        entry = self._cell_checks.get(id(shapes))
+        if entry is None or entry[0] is not shapes:  # Trzymamy tabelę, aby jej id nie zostało użyte ponownie
+            entry = self._cell_checks[id(shapes)] = (shapes, [None] * len(shapes.cell_index))
+        counts = entry[1][cell]
+        if counts is None:
+            counts = entry[1][cell] = Counter(name for name, _ in shapes.cell_index[cell])
+        return counts
+
+    def _wrap_place_symbol(self, original):
+        counters = self.counters
+        shapes_formed = self.shapes_formed
+        shape_checks = self.shape_checks
+
+        def place_symbol(board, symbol, row, col):
+            shapes = original(board, symbol, row, col)
+            if symbol != ' ':
+                cell = row * board.size + col
+                counters['place_symbol'] += 1
+                shape_checks.update(self._placement_counts(board.shapes, cell))
+                self._last_cell = cell
+                if shapes:
+                    shapes_formed[shapes[0]] += 1
+            return shapes
+        return place_symbol
+
+    def _wrap_check_for_win(self, original):
+        counters = self.counters
+        shape_checks = self.shape_checks
+
+        def check_for_win(board, symbol):
+            counters['check_for_win'] += 1
+            points = original(board, symbol)
+            # Ułożenia są sprawdzane w kolejności priorytetu do pierwszego dopasowania
+            mask = board.masks.get(symbol, 0)
+            for name, shape_mask in board.shapes.placements:
+                shape_checks[name] += 1
+                if points and shape_mask & mask == shape_mask:
+                    break
+            return points
+        return check_for_win
+
+    def _wrap_has_shape(self, original):
+        shape_checks = self.shape_checks
+
+        def _has_shape(board, name, symbol):
+            shape_checks[name] += 1
+            return original(board, name, symbol)
+        return _has_shape
+
+    def _wrap_cell_changed(self, original):
+        counters = self.counters
+
+        def cell_changed(evaluator, cell, previous, symbol):
+            counters['evaluator_updates'] += 1
+            # Każdy zdjęty i postawiony symbol aktualizuje wszystkie ułożenia pokrywające pole
+            changes = (previous != ' ') + (symbol != ' ')
+            counters['evaluator_placements'] += changes * len(evaluator.board.shapes.cell_placements[cell])
+            return original(evaluator, cell, previous, symbol)
+        return cell_changed
+
+    def _wrap_evaluator_score(self, original):
+        counters = self.counters
+
+        def score(evaluator, symbol):
+            counters['evaluations'] += 1
+            return original(evaluator, symbol)
+        return score
+
+    def _wrap_book_lookup(self, original):
+        counters = self.counters
+
+        def lookup(book, *args):
+            move = original(book, *args)
+            counters['book_hits' if move is not None else 'book_misses'] += 1
+            return move
+        return lookup
+
+    def snapshot(self):
+        """
+        Zwraca liczniki i wartości pochodne (średnie, współczynniki trafień, współczynnik rozgałęzienia).
+
+        Returns:
+            dict: Statystyki w postaci gotowej do zapisu jako JSON.
+        """
+        counters = self.counters
+        nodes = counters['minimax_nodes'] + counters['alphabeta_nodes']
+        max_ply = max(self.nodes_by_ply, default=0)
+        tt_probes = counters['tt_hits'] + counters['tt_misses']
+        book_probes = counters['book_hits'] + counters['book_misses']
+        return {
+            'counters': dict(counters),
+            'ai_moves': counters['ai_moves'],
+            'nodes': nodes,
+            'max_ply': max_ply,
+            # Średnia liczba potomków rozwiniętego węzła (każdy węzeł jest potomkiem korzenia lub innego węzła)
+            'branching_factor': nodes / counters['expanded_nodes'] if counters['expanded_nodes'] else 0.0,
+            'average_depth': (counters['depth_reached'] / counters['searched_moves']
+                              if counters['searched_moves'] else 0.0),
+            'average_move_ms': counters['ai_ms'] / counters['ai_moves'] if counters['ai_moves'] else 0.0,
+            'nodes_per_second': nodes / counters['ai_ms'] * 1000 if counters['ai_ms'] else 0.0,
+            'tt_hit_rate': counters['tt_hits'] / tt_probes if tt_probes else 0.0,
+            'book_hit_rate': counters['book_hits'] / book_probes if book_probes else 0.0,
+            'nodes_by_ply': {ply: self.nodes_by_ply[ply] for ply in sorted(self.nodes_by_ply)},
+            'shapes_formed': dict(self.shapes_formed),
+            'shape_checks': dict(self.shape_checks),
+            'latency_histogram': {label: self.latency[label] for label in LATENCY_LABELS if self.latency[label]},
+        }
+
+    def add(self, stats):
+        """
+        Dolicza statystyki gry (np. z procesu roboczego) do liczników.
+
+        Args:
+            stats (dict): Statystyki gry zwrócone przez ``end_game``.
+        """
+        self.counters.update(stats['counters'])
+        self.nodes_by_ply.update({int(ply): nodes for ply, nodes in stats['nodes_by_ply'].items()})
+        self.shapes_formed.update(stats['shapes_formed'])
+        self.shape_checks.update(stats['shape_checks'])
+        self.latency.update(stats['latency_histogram'])
+
+    def end_game(self, **meta):
+        """
+        Zamyka statystyki gry: zwraca je razem ze szczegółami ruchów i zeruje liczniki.
+
+        Args:
+            **meta: Dodatkowe pola zapisu (np. numer meczu, strategie graczy).
+
+        Returns:
+            dict: Statystyki gry (patrz ``snapshot``) z listą ruchów (``moves``).
+        """
+        stats = dict(meta, **self.snapshot(), moves=self.moves)
+        self.reset()
+        return stats
+
+    def summary_line(self):
+        """
+        Zwraca jednowierszowe podsumowanie ostatniego ruchu AI i całej gry.
+
+        Returns:
+            str: Podsumowanie do wypisania w trakcie gry.
+        """
+        stats = self.snapshot()
+        text = (f"{stats['ai_moves']} AI moves, avg {stats['average_move_ms']:.1f} ms, {stats['nodes']} nodes, "
+                f"branching {stats['branching_factor']:.1f}, TT hit rate {stats['tt_hit_rate']:.0%}")
+        if self.moves:
+            move = self.moves[-1]
+            depth = f", depth {move['depth']}" if 'depth' in move else ""
+            text = (f"last move {move['strategy']}: {move['ms']:.1f} ms, {move['nodes']} nodes{depth}, "
+                    f"{len(move['root'])} root moves | {text}")
+        return text
+
+
+def write_json_line(path, stats):
+    """
+    Dopisuje statystyki jako jeden wiersz JSON.
+
+    Args:
+        path (str): Ścieżka pliku.
+        stats (dict): Statystyki (np. wynik ``Instrumentation.end_game``).
+    """
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(stats) + '\n')
+
+
+def format_summary(stats):
+    """
+    Formatuje statystyki łączne jako kilka wierszy tekstu.
+
+    Args:
+        stats (dict): Statystyki (patrz ``Instrumentation.snapshot``).
+
+    Returns:
+        str: Podsumowanie do wypisania.
+    """
+    counters = stats['counters']
+    histogram = ", ".join(f"{bucket} {count}" for bucket, count in stats['latency_histogram'].items())
+    checks = ", ".join(f"{name} {count}" for name, count in stats['shape_checks'].items()) or "none"
+    return "\n".join((
+        f"AI moves: {stats['ai_moves']}, avg {stats['average_move_ms']:.2f} ms ({histogram or 'no moves'})",
+        f"search: {stats['nodes']} nodes ({stats['nodes_per_second']:.0f}/s), max ply {stats['max_ply']}, "
+        f"avg depth {stats['average_depth']:.2f}, branching factor {stats['branching_factor']:.2f}",
+        f"caches: TT hit rate {stats['tt_hit_rate']:.1%}, book hit rate {stats['book_hit_rate']:.1%}",
+        f"board: {counters.get('place_symbol', 0)} placements, {counters.get('check_for_win', 0)} check_for_win "
+        f"calls, shape checks: {checks}",
+        f"evaluator: {counters.get('evaluations', 0)} evaluations, {counters.get('evaluator_updates', 0)} "
+        f"updates touching {counters.get('evaluator_placements', 0)} placements",
+    ))
@@ -0,0 +1,487 @@
+"""
+Moduł wyuczonej oceny pozycji: mała sieć neuronowa (lub model liniowy) liczona w NumPy.
+
+Cechy pozycji są liczone z punktu widzenia gracza, który właśnie wykonał ruch ('własne' pola)
+względem przeciwnika: dwie płaszczyzny zajętych pól (``size * size`` wartości 0/1 każda) oraz dla
+każdego ułożenia kształtu z ``shapes.compile_shapes`` postęp jego ułożenia (odsetek zajętych pól),
+o ile przeciwnik go nie zablokował - osobno dla gracza i przeciwnika. Sieć ma jedną warstwę ukrytą
+(ReLU) i wyjście ``tanh`` - oczekiwany wynik rundy dla gracza (1 - wygrana, -1 - przegrana);
+przy zerowej liczbie neuronów ukrytych model jest liniowy.
+
+Wszystkie ruchy z danej pozycji są oceniane jedną operacją macierzową (``evaluate_moves``):
+liczniki zajętych pól ułożeń dla pozycji potomnych powstają przez dodanie kolumny macierzy
+incydencji pól i ułożeń, a wiersze cech wszystkich potomków przechodzą przez sieć razem.
+
+Wagi są uczone offline na zapisach gier z rozgrywek (``selfplay.py --record``) i zapisywane
+w pliku binarnym: nagłówek (``HEADER``: znacznik, wersja formatu, rozmiar planszy, liczba ułożeń
+kształtów, liczba neuronów ukrytych, skrót rejestru kształtów), a po nim tablice float32. Plik jest mapowany do pamięci,
+a tablice są widokami na mapowanie, więc wczytanie wag nic nie kopiuje.
+
+Przykłady:
+    python selfplay.py random random -n 2000 --record games.kgr
+    python learned_eval.py train games.kgr
+    python learned_eval.py info
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from records import RecordReader
+from shapes import compile_shapes
+
+MAGIC = b'KSZW'
+WEIGHTS_VERSION = 2
+# Znacznik, wersja, rozmiar planszy, liczba ułożeń kształtów, liczba neuronów ukrytych, skrót rejestru kształtów.
+HEADER = struct.Struct('<4sHHII8s')
+
+DEFAULT_WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'learned_eval.bin')
+DEFAULT_HIDDEN = 32
+DEFAULT_EPOCHS = 20
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_LEARNING_RATE = 0.001
+# Odsetek pozycji odkładanych do oceny błędu poza danymi uczącymi.
+DEFAULT_VALIDATION = 0.1
+
+
+def feature_table(size):
+    """
+    Buduje macierz incydencji pól i ułożeń kształtów dla planszy o podanym rozmiarze.
+
+    Wynik jest zapamiętywany dla skompilowanej tabeli kształtów, a nie dla rozmiaru, więc zmiana
+    rejestru (``shapes.register_shape``) daje nową macierz.
+
+    Args:
+        size (int): Rozmiar planszy.
+
+    Returns:
+        tuple: Para (macierz ``(size * size, P)`` typu float32 - 1, jeśli pole należy do ułożenia;
+        tablica ``(P,)`` liczby pól każdego ułożenia), gdzie P to liczba ułożeń.
+    """
+    return _feature_table(compile_shapes(size))
+
+
+@lru_cache(maxsize=None)
+def _feature_table(shapes):
+    """
+    Buduje macierz incydencji dla skompilowanej tabeli kształtów (patrz ``feature_table``).
+    """
+    size = shapes.size
+    incidence = np.zeros((size * size, len(shapes.placements)), dtype=np.float32)
+    for cell, numbers in enumerate(shapes.cell_placements):
+        incidence[cell, list(numbers)] = 1
+    return incidence, np.array(shapes.placement_sizes, dtype=np.float32)
+
+
+def shapes_digest(size):
+    """
+    Zwraca skrót rejestru kształtów skompilowanego dla planszy o podanym rozmiarze.
+
+    Skrót obejmuje nazwy, punkty i maski wszystkich ułożeń w kolejności priorytetu, więc zmienia się
+    po każdej zmianie kształtów, nawet jeśli liczba ułożeń pozostaje ta sama.
+
+    Args:
+        size (int): Rozmiar planszy.
+
+    Returns:
+        bytes: Skrót długości 8 bajtów.
+    """
+    return _shapes_digest(compile_shapes(size))
+
+
+@lru_cache(maxsize=None)
+def _shapes_digest(shapes):
+    """
+    Liczy skrót skompilowanej tabeli kształtów (patrz ``shapes_digest``).
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for name, mask in shapes.placements:
+        digest.update(f"{name}:{shapes.points[name]}:{mask:x};".encode('ascii'))
+    return digest.digest()
+
+
+def feature_count(size):
+    """
+    Zwraca liczbę cech pozycji na planszy o podanym rozmiarze.
+
+    Args:
+        size (int): Rozmiar planszy.
+
+    Returns:
+        int: Długość wektora cech.
+    """
+    return 2 * size * size + 2 * feature_table(size)[0].shape[1]
+
+
+def mask_plane(mask, cells):
+    """
+    Zamienia maskę bitową pól na wektor 0/1.
+
+    Args:
+        mask (int): Maska bitowa (bit ``wiersz * size + kolumna``).
+        cells (int): Liczba pól planszy.
+
+    Returns:
+        numpy.ndarray: Tablica ``(cells,)`` typu float32.
+    """
+    data = np.frombuffer(mask.to_bytes((cells + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(data, count=cells, bitorder='little').astype(np.float32)
+
+
+def features(own, opponent, own_counts, opponent_counts, sizes):
+    """
+    Składa wiersze cech z płaszczyzn pól i liczników zajętych pól ułożeń.
+
+    Args:
+        own (numpy.ndarray): Pola gracza ``(K, size * size)``.
+        opponent (numpy.ndarray): Pola przeciwnika ``(K, size * size)``.
+        own_counts (numpy.ndarray): Liczba pól gracza w każdym ułożeniu ``(K, P)``.
+        opponent_counts (numpy.ndarray): Liczba pól przeciwnika w każdym ułożeniu ``(K, P)``.
+        sizes (numpy.ndarray): Liczba pól każdego ułożenia ``(P,)``.
+
+    Returns:
+        numpy.ndarray: Macierz cech ``(K, F)`` typu float32.
+    """
+    own_progress = np.where(opponent_counts == 0, own_counts / sizes, 0)
+    opponent_progress = np.where(own_counts == 0, opponent_counts / sizes, 0)
+    return np.concatenate((own, opponent, own_progress, opponent_progress), axis=1, dtype=np.float32)
+
+
+def board_features(board, symbol, opponent_symbol):
+    """
+    Liczy cechy pozycji z punktu widzenia gracza, który wykonał ostatni ruch.
+
+    Args:
+        board (GameBoard): Obiekt planszy do gry.
+        symbol (str): Symbol gracza ('własne' pola).
+        opponent_symbol (str): Symbol przeciwnika.
+
+    Returns:
+        numpy.ndarray: Wektor cech ``(F,)``.
+    """
+    cells = board.size * board.size
+    incidence, sizes = feature_table(board.size)
+    own = mask_plane(board.masks.get(symbol, 0), cells)[None]
+    opponent = mask_plane(board.masks.get(opponent_symbol, 0), cells)[None]
+    return features(own, opponent, own @ incidence, opponent @ incidence, sizes)[0]
+
+
+class LearnedEvaluator:
+    """
+    Wyuczona ocena pozycji z wagami odczytywanymi z pliku mapowanego do pamięci.
+
+    Attributes:
+        path (str): Ścieżka pliku wag.
+        size (int): Rozmiar planszy, dla którego wyuczono wagi.
+        hidden (int): Liczba neuronów warstwy ukrytej (0 - model liniowy).
+    """
+
+    def __init__(self, path=DEFAULT_WEIGHTS_PATH):
+        """
+        Otwiera plik wag.
+
+        Args:
+            path (str): Ścieżka pliku wag.
+
+        Raises:
+            ValueError: Jeśli plik nie jest plikiem wag, ma nieobsługiwaną wersję formatu albo wagi
+                wyuczono dla innego rejestru kształtów.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < HEADER.size:
+            raise ValueError(f"{path} is not a weights file")
+        magic, version, self.size, placements, self.hidden, digest = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a weights file")
+        if version != WEIGHTS_VERSION:
+            raise ValueError(f"{path} has weights format version {version}, expected {WEIGHTS_VERSION}; "
+                             f"retrain it with 'python learned_eval.py train'")
+        self._incidence, self._sizes = feature_table(self.size)
+        if placements != len(self._sizes):
+            raise ValueError(f"{path} was trained for {placements} shape placements, the registered shapes "
+                             f"have {len(self._sizes)}; retrain it")
+        if digest != shapes_digest(self.size):
+            raise ValueError(f"{path} was trained for a different set of registered shapes; retrain it")
+        shapes = _layer_shapes(feature_count(self.size), self.hidden)
+        if len(self._data) != HEADER.size + 4 * sum(int(np.prod(shape)) for shape in shapes):
+            raise ValueError(f"{path} is truncated")
+        arrays = []
+        offset = HEADER.size
+        for shape in shapes:
+            count = int(np.prod(shape))
+            arrays.append(np.frombuffer(self._data, dtype='<f4', count=count, offset=offset).reshape(shape))
+            offset += 4 * count
+        self._w1, self._b1, self._w2, self._b2 = arrays
+
+    def close(self):
+        """
+        Zamyka mapowanie pliku.
+        """
+        self._w1 = self._b1 = self._w2 = self._b2 = None  # Widoki blokują zamknięcie mapowania
+        self._data.close()
+
+    def predict(self, rows):
+        """
+        Ocenia wiersze cech jednym przejściem sieci.
+
+        Args:
+            rows (numpy.ndarray): Macierz cech ``(K, F)``.
+
+        Returns:
+            numpy.ndarray: Oceny ``(K,)`` z przedziału (-1, 1).
+        """
+        return _forward(rows, self._w1, self._b1, self._w2, self._b2)
+
+    def evaluate(self, board, symbol, opponent_symbol):
+        """
+        Ocenia pozycję z punktu widzenia gracza, który wykonał ostatni ruch.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            symbol (str): Symbol gracza, który wykonał ostatni ruch.
+            opponent_symbol (str): Symbol przeciwnika (na ruchu).
+
+        Returns:
+            float: Oczekiwany wynik rundy dla gracza, z przedziału (-1, 1).
+        """
+        return float(self.predict(board_features(board, symbol, opponent_symbol)[None])[0])
+
+    def evaluate_moves(self, board, symbol, opponent_symbol, cells):
+        """
+        Ocenia wszystkie podane ruchy gracza jedną operacją macierzową, bez wykonywania ich na planszy.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry (gracz ``symbol`` jest na ruchu).
+            symbol (str): Symbol gracza na ruchu.
+            opponent_symbol (str): Symbol przeciwnika.
+            cells (list): Numery wolnych pól (``wiersz * size + kolumna``).
+
+        Returns:
+            tuple: Para tablic ``(K,)``: oceny pozycji po każdym ruchu z punktu widzenia gracza
+            oraz wartości logiczne - True, jeśli ruch układa kształt.
+        """
+        size = board.size
+        incidence, sizes = self._incidence, self._sizes
+        own = mask_plane(board.masks.get(symbol, 0), size * size)
+        opponent = mask_plane(board.masks.get(opponent_symbol, 0), size * size)
+        moves = incidence[cells]  # Ułożenia pokrywające pole ruchu
+        own_counts = own @ incidence + moves
+        opponent_counts = np.broadcast_to(opponent @ incidence, moves.shape)
+        children = np.tile(own, (len(cells), 1))
+        children[np.arange(len(cells)), cells] = 1
+        rows = features(children, np.broadcast_to(opponent, children.shape), own_counts, opponent_counts, sizes)
+        # Wcześniej ułożony kształt zakończyłby rundę, więc pełne ułożenie musi zawierać pole ruchu
+        wins = (own_counts == sizes).any(axis=1)
+        return self.predict(rows), wins
+
+
+def _layer_shapes(features, hidden):
+    """
+    Zwraca kształty tablic wag w kolejności zapisu w pliku (w1, b1, w2, b2).
+    """
+    if hidden:
+        return (features, hidden), (hidden,), (hidden,), (1,)
+    return (features, 0), (0,), (features,), (1,)
+
+
+def _forward(rows, w1, b1, w2, b2):
+    """
+    Przejście sieci w przód; przy pustej warstwie ukrytej model jest liniowy.
+    """
+    if w1.shape[1]:
+        rows = np.maximum(rows @ w1 + b1, 0)
+    return np.tanh(rows @ w2 + b2[0])
+
+
+def training_positions(paths):
+    """
+    Wylicza cechy i wyniki pozycji z zapisów gier.
+
+    Każda pozycja po ruchu jest oceniana z punktu widzenia gracza, który ten ruch wykonał:
+    1 - wygrał rundę, -1 - przegrał, 0 - remis. Rundy niedokończone są pomijane.
+
+    Args:
+        paths (list): Ścieżki plików z grami (``records``).
+
+    Returns:
+        tuple: Trójka (rozmiar planszy, macierz cech ``(N, F)``, wyniki ``(N,)``).
+
+    Raises:
+        ValueError: Jeśli pliki zawierają gry na planszach różnych rozmiarów lub nie zawierają rund.
+    """
+    size = None
+    rows = []
+    outcomes = []
+    for path in paths:
+        with RecordReader(path) as reader:
+            for record in reader:
+                if size is None:
+                    size = record.size
+                elif record.size != size:
+                    raise ValueError(f"{path} mixes board sizes {size} and {record.size}")
+                finished = [game_round.winner is not None or len(game_round.moves) == size * size
+                            for game_round in record.rounds]
+                for number, board, _, symbol in record.replay():
+                    if not finished[number]:
+                        continue
+                    game_round = record.rounds[number]
+                    opponent_symbol = record.symbols[1 - record.symbols.index(symbol)]
+                    rows.append(board_features(board, symbol, opponent_symbol))
+                    if game_round.winner is None:
+                        outcomes.append(0.0)
+                    else:
+                        outcomes.append(1.0 if record.symbols[game_round.winner] == symbol else -1.0)
+    if not rows:
+        raise ValueError("no finished rounds to train on")
+    return size, np.array(rows, dtype=np.float32), np.array(outcomes, dtype=np.float32)
+
+
+def train(rows, outcomes, hidden=DEFAULT_HIDDEN, epochs=DEFAULT_EPOCHS, batch_size=DEFAULT_BATCH_SIZE,
+          learning_rate=DEFAULT_LEARNING_RATE, validation=DEFAULT_VALIDATION, seed=0):
+    """
+    Uczy sieć metodą Adam, minimalizując błąd kwadratowy przewidywanego wyniku.
+
+    Args:
+        rows (numpy.ndarray): Macierz cech ``(N, F)``.
+        outcomes (numpy.ndarray): Wyniki ``(N,)`` z przedziału [-1, 1].
+        hidden (int): Liczba neuronów warstwy ukrytej (0 - model liniowy).
+        epochs (int): Liczba przejść przez dane.
+        batch_size (int): Liczba pozycji w jednym kroku.
+        learning_rate (float): Współczynnik uczenia.
+        validation (float): Odsetek pozycji, na których po każdej epoce liczony jest błąd (nie są używane do uczenia).
+        seed (int): Ziarno generatora liczb losowych.
+
+    Returns:
+        list: Tablice wag (w1, b1, w2, b2) typu float32.
+    """
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(rows))
+    held_out, kept = np.split(order, [int(len(rows) * validation)])
+    held_rows, held_outcomes = rows[held_out], outcomes[held_out]
+    rows, outcomes = rows[kept], outcomes[kept]
+    count, width = rows.shape
+    shapes = _layer_shapes(width, hidden)
+    params = [np.zeros(shape) for shape in shapes]
+    params[0] = rng.normal(0, np.sqrt(2 / width), shapes[0])
+    params[2] = rng.normal(0, np.sqrt(1 / shapes[2][0]), shapes[2])
+    moments = [np.zeros_like(param) for param in params]
+    velocities = [np.zeros_like(param) for param in params]
+    step = 0
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        order = rng.permutation(count)
+        loss = 0.0
+        for begin in range(0, count, batch_size):
+            batch = order[begin:begin + batch_size]
+            grads, batch_loss = _gradients(rows[batch], outcomes[batch], *params)
+            loss += batch_loss * len(batch)
+            step += 1
+            for param, grad, moment, velocity in zip(params, grads, moments, velocities):
+                moment *= 0.9
+                moment += 0.1 * grad
+                velocity *= 0.999
+                velocity += 0.001 * grad * grad
+                param -= learning_rate * (moment / (1 - 0.9 ** step)) / (
+                    np.sqrt(velocity / (1 - 0.999 ** step)) + 1e-8)
+        message = f"epoch {epoch + 1}: loss {loss / count:.4f}"
+        if len(held_rows):
+            error = _forward(held_rows, *params) - held_outcomes
+            message += f", validation loss {np.mean(error ** 2):.4f}"
+        print(f"{message} ({time.perf_counter() - start:.1f} s)", file=sys.stderr)
+    return [param.astype(np.float32) for param in params]
+
+
+def _gradients(rows, outcomes, w1, b1, w2, b2):
+    """
+    Liczy gradienty błędu kwadratowego względem wag dla jednej porcji pozycji.
+
+    Returns:
+        tuple: Para (gradienty w kolejności wag, średni błąd).
+    """
+    if w1.shape[1]:
+        pre = rows @ w1 + b1
+        hidden = np.maximum(pre, 0)
+    else:
+        hidden = rows
+    prediction = np.tanh(hidden @ w2 + b2[0])
+    error = prediction - outcomes
+    delta = 2 * error * (1 - prediction ** 2) / len(rows)
+    grad_w2 = hidden.T @ delta
+    grad_b2 = np.array([delta.sum()])
+    if w1.shape[1]:
+        delta_hidden = np.outer(delta, w2) * (pre > 0)
+        grad_w1 = rows.T @ delta_hidden
+        grad_b1 = delta_hidden.sum(axis=0)
+    else:
+        grad_w1 = np.zeros_like(w1)
+        grad_b1 = np.zeros_like(b1)
+    return (grad_w1, grad_b1, grad_w2, grad_b2), float(np.mean(error ** 2))
+
+
+def save_weights(path, size, params):
+    """
+    Zapisuje wagi do pliku (zastępowanego atomowo).
+
+    Args:
+        path (str): Ścieżka pliku wag.
+        size (int): Rozmiar planszy.
+        params (list): Tablice wag (w1, b1, w2, b2) zwrócone przez ``train``.
+    """
+    placements = feature_table(size)[0].shape[1]
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, WEIGHTS_VERSION, size, placements, params[0].shape[1], shapes_digest(size)))
+        for param in params:
+            file.write(np.ascontiguousarray(param, dtype='<f4').tobytes())
+    os.replace(temporary, path)
+
+
+def main():
+    """
+    Uczy wagi na zapisach gier lub wypisuje informacje o pliku wag z linii poleceń.
+    """
+    parser = argparse.ArgumentParser(description="Train or inspect the learned position evaluator.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    train_parser = commands.add_parser('train', help="train weights on recorded self-play games")
+    train_parser.add_argument('records', nargs='+', help="game record files (see 'selfplay.py --record')")
+    train_parser.add_argument('-o', '--output', default=DEFAULT_WEIGHTS_PATH, help="weights file to write")
+    train_parser.add_argument('--hidden', type=int, default=DEFAULT_HIDDEN,
+                              help="hidden units (0 - linear model)")
+    train_parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS, help="passes over the data")
+    train_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="positions per step")
+    train_parser.add_argument('--learning-rate', type=float, default=DEFAULT_LEARNING_RATE, help="Adam step size")
+    train_parser.add_argument('--validation', type=float, default=DEFAULT_VALIDATION,
+                              help="fraction of positions held out to report validation loss")
+    train_parser.add_argument('--seed', type=int, default=0, help="random seed")
+    info = commands.add_parser('info', help="print the weights file header")
+    info.add_argument('path', nargs='?', default=DEFAULT_WEIGHTS_PATH, help="weights file")
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        start = time.perf_counter()
+        size, rows, outcomes = training_positions(args.records)
+        print(f"{len(rows)} positions, {rows.shape[1]} features ({time.perf_counter() - start:.1f} s)",
+              file=sys.stderr)
+        params = train(rows, outcomes, args.hidden, args.epochs, args.batch_size, args.learning_rate,
+                       args.validation, args.seed)
+        save_weights(args.output, size, params)
+        print(f"wrote {args.output}")
+    else:
+        evaluator = LearnedEvaluator(args.path)
+        print(f"{args.path}: board {evaluator.size}x{evaluator.size}, "
+              f"{feature_count(evaluator.size)} features, {evaluator.hidden} hidden units, "
+              f"{os.path.getsize(args.path)} bytes")
+        evaluator.close()
+
+
+if __name__ == '__main__':
+    main()
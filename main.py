@@ -5,13 +5,16 @@ Kacper Sewruk s23466
 Michał Jastrzemski s26245
 """
 
+import argparse
+import atexit
+import threading
+
 import pygame
-from game import Game
+import instrumentation
+from ai import ai_move
+from game import Game, MOVE_DRAW, MOVE_WIN
 from player import Player
 
-# Inicjalizacja Pygame
-pygame.init()
-
 # Ustawienia okna gry
 WINDOW_SIZE = 600  # Rozmiar okna (kwadratowe)
 GRID_SIZE = 10  # Plansza 10x10
@@ -23,9 +26,32 @@ BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 
+# Maksymalna liczba klatek na sekundę (ogranicza odświeżanie przy serii zdarzeń)
+MAX_FPS = 60
+
+# Zdarzenia ruchu AI liczonego w tle
+AI_MOVE_EVENT = pygame.USEREVENT + 1
+AI_TIMEOUT_EVENT = pygame.USEREVENT + 2
+AI_TIMEOUT_MS = 5000  # Po tym czasie silnik jest proszony o przerwanie przeszukiwania
+AI_CANCEL_GRACE_MS = 1000  # Czas na odpowiedź po przerwaniu, potem ruch jest losowany
+
 # Ustawienia okna gry
-screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
-pygame.display.set_caption("Gra - Kształty")
+CAPTION = "Gra - Kształty"
+screen = None  # Okno gry, tworzone przez init_display (import modułu nie uruchamia pygame)
+
+
+def init_display():
+    """
+    Inicjalizuje pygame i otwiera okno gry.
+
+    Returns:
+        pygame.Surface: Powierzchnia okna gry (także w zmiennej ``screen``).
+    """
+    global screen
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+    pygame.display.set_caption(CAPTION)
+    return screen
 
 
 def draw_board(current_game):
@@ -47,9 +73,143 @@ def draw_board(current_game):
                                    CELL_SIZE // 3)
 
 
+class BoardRenderer:
+    """
+    Rysuje planszę przyrostowo: odświeża tylko pola, które zmieniły się od poprzedniej klatki.
+
+    Siatka i pionki są renderowane raz do powierzchni pomocniczych, a zmienione pola są
+    kopiowane na ekran i przekazywane do ``pygame.display.update``.
+
+    Attributes:
+        surface (pygame.Surface): Powierzchnia, na której rysowana jest plansza.
+        grid (pygame.Surface): Pusta plansza z siatką.
+        pieces (dict): Powierzchnie pól z pionkiem według symbolu.
+    """
+
+    def __init__(self, surface):
+        """
+        Przygotowuje powierzchnie siatki i pionków.
+
+        Args:
+            surface (pygame.Surface): Powierzchnia, na której rysowana jest plansza.
+        """
+        self.surface = surface
+        self.grid = pygame.Surface(surface.get_size()).convert()
+        self.grid.fill(WHITE)
+        for row in range(GRID_SIZE):
+            for col in range(GRID_SIZE):
+                pygame.draw.rect(self.grid, BLACK, pygame.Rect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE), 1)
+
+        self.pieces = {}
+        for symbol, color in (('X', RED), ('O', BLUE)):
+            piece = self.grid.subsurface(pygame.Rect(0, 0, CELL_SIZE, CELL_SIZE)).copy()
+            pygame.draw.circle(piece, color, (CELL_SIZE // 2, CELL_SIZE // 2), CELL_SIZE // 3)
+            self.pieces[symbol] = piece
+        self._drawn = None
+
+    def invalidate(self):
+        """
+        Wymusza przerysowanie całej planszy przy następnym wywołaniu ``render``.
+        """
+        self._drawn = None
+
+    def render(self, current_game):
+        """
+        Przerysowuje zmienione pola planszy i odświeża tylko te fragmenty ekranu.
+
+        Args:
+            current_game (Game): Obiekt gry, który przechowuje stan planszy i graczy.
+        """
+        cells = current_game.board.board
+        if self._drawn is None:
+            self.surface.blit(self.grid, (0, 0))
+            for row in range(GRID_SIZE):
+                for col in range(GRID_SIZE):
+                    if cells[row][col] in self.pieces:
+                        self.surface.blit(self.pieces[cells[row][col]], (col * CELL_SIZE, row * CELL_SIZE))
+            self._drawn = [list(row) for row in cells]
+            pygame.display.flip()
+            return
+
+        dirty = []
+        for row in range(GRID_SIZE):
+            drawn_row = self._drawn[row]
+            for col in range(GRID_SIZE):
+                symbol = cells[row][col]
+                if drawn_row[col] != symbol:
+                    rect = pygame.Rect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+                    if symbol in self.pieces:
+                        self.surface.blit(self.pieces[symbol], rect)
+                    else:
+                        self.surface.blit(self.grid, rect, rect)  # Czyścimy pole
+                    drawn_row[col] = symbol
+                    dirty.append(rect)
+        if dirty:
+            pygame.display.update(dirty)
+
+
+class AiTurn:
+    """
+    Ruch AI liczony w wątku w tle, aby okno gry odpowiadało przez cały czas namysłu.
+
+    Silnik dostaje kopię planszy, a wynik wraca do pętli gry jako zdarzenie ``AI_MOVE_EVENT``.
+    Po ``AI_TIMEOUT_MS`` (lub po naciśnięciu Esc) silnik jest proszony o przerwanie i zwraca
+    najlepszy ruch znaleziony do tej pory; jeśli nie odpowie w ciągu ``AI_CANCEL_GRACE_MS``,
+    ruch jest losowany.
+
+    Attributes:
+        player (Player): Gracz sterowany przez AI.
+        engine (object): Silnik AI gracza.
+        cancelled (bool): Czy przeszukiwanie zostało już przerwane.
+    """
+
+    def __init__(self, current_game):
+        """
+        Uruchamia wątek liczący ruch aktualnego gracza.
+
+        Args:
+            current_game (Game): Obiekt gry, który przechowuje stan planszy i graczy.
+        """
+        self.player = current_game.current_player
+        opponent = current_game.players[0] if self.player == current_game.players[1] else current_game.players[1]
+        self.engine = current_game.ai_engine(self.player)
+        self.cancelled = False
+        board = current_game.board.copy()
+        thread = threading.Thread(target=self._run, args=(board, opponent.symbol), daemon=True)
+        thread.start()
+        pygame.time.set_timer(pygame.event.Event(AI_TIMEOUT_EVENT, turn=self), AI_TIMEOUT_MS, loops=1)
+        pygame.display.set_caption(f"{CAPTION} - AI is thinking... (Esc to stop)")
+
+    def _run(self, board, opponent_symbol):
+        """
+        Liczy ruch (w wątku w tle) i przekazuje go do pętli gry.
+        """
+        move = self.engine.select_move(board, self.player.symbol, opponent_symbol)
+        pygame.event.post(pygame.event.Event(AI_MOVE_EVENT, turn=self, move=move))
+
+    def cancel(self):
+        """
+        Przerywa przeszukiwanie - wynik przyjdzie jako ``AI_MOVE_EVENT`` albo, jeśli silnik
+        nie odpowie, jako kolejne ``AI_TIMEOUT_EVENT``.
+        """
+        if not self.cancelled:
+            self.cancelled = True
+            self.engine.cancel()
+            pygame.time.set_timer(pygame.event.Event(AI_TIMEOUT_EVENT, turn=self), AI_CANCEL_GRACE_MS, loops=1)
+
+    def finish(self):
+        """
+        Kończy turę: wyłącza zegar i przywraca tytuł okna.
+        """
+        pygame.time.set_timer(AI_TIMEOUT_EVENT, 0)
+        pygame.display.set_caption(CAPTION)
+
+
 def handle_mouse_click(current_game, x, y):
     """
-    Obsługuje kliknięcia myszką i wykonuje ruch gracza lub AI.
+    Obsługuje kliknięcia myszką i wykonuje ruch gracza.
+
+    Ruch AI, jeśli jest następny, liczy ``AiTurn`` w pętli gry.
 
     Args:
         current_game (Game): Obiekt gry, który przechowuje stan planszy i graczy.
@@ -59,32 +219,58 @@ def handle_mouse_click(current_game, x, y):
     row = y // CELL_SIZE
     col = x // CELL_SIZE
     if current_game.board.is_spot_available(row, col):
-        current_game.board.place_symbol(current_game.current_player.symbol, row, col)
-
-        points = current_game.board.check_for_win(current_game.current_player.symbol)
-        if points > 0:
-            print(f"{current_game.current_player.symbol} wins the round and earns {points} points!")
-            current_game.current_player.points += points
-            current_game.end_round()
-        elif not any(' ' in row for row in current_game.board.board):
-            print("The board is full! The round ends in a draw.")
-            current_game.end_round()
-        else:
-            current_game.switch_player()
-
-            # Sprawdzenie ruchu AI
-            if current_game.current_player.is_ai:
-                current_game.ai_move()
-                points = current_game.board.check_for_win(current_game.current_player.symbol)
-                if points > 0:
-                    print(f"{current_game.current_player.symbol} wins the round and earns {points} points!")
-                    current_game.current_player.points += points
-                    current_game.end_round()
-                elif not any(' ' in row for row in current_game.board.board):
-                    print("The board is full! The round ends in a draw.")
-                    current_game.end_round()
-                else:
-                    current_game.switch_player()
+        outcome = current_game.apply_move(row, col)
+        end_round_if_over(current_game, outcome)
+
+
+def handle_ai_move(current_game, move):
+    """
+    Wykonuje ruch obliczony przez AI.
+
+    Args:
+        current_game (Game): Obiekt gry, który przechowuje stan planszy i graczy.
+        move (tuple): Współrzędne (wiersz, kolumna) ruchu.
+    """
+    row, col = move
+    print(f"AI placed {current_game.current_player.symbol} at ({row}, {col})")
+    stats = instrumentation.active()
+    if stats is not None:
+        print(stats.summary_line())
+    outcome = current_game.apply_move(row, col)
+    end_round_if_over(current_game, outcome)
+
+
+def end_round_if_over(current_game, outcome):
+    """
+    Ogłasza wynik rundy i przechodzi do następnej, jeśli ostatni ruch zakończył rundę.
+
+    Args:
+        current_game (Game): Obiekt gry, który przechowuje stan planszy i graczy.
+        outcome (str): Wynik ruchu zwrócony przez ``Game.apply_move``.
+    """
+    if outcome == MOVE_WIN:
+        points = current_game.board.last_move_points()
+        print(f"{current_game.current_player.symbol} wins the round and earns {points} points!")
+        current_game.end_round()
+    elif outcome == MOVE_DRAW:
+        print("The board is full! The round ends in a draw.")
+        current_game.end_round()
+
+
+def save_stats(current_game, stats, path):
+    """
+    Dopisuje statystyki instrumentacji gry jako wiersz JSON (wywoływane przy zakończeniu programu,
+    także gdy ``Game.end_game`` kończy proces).
+
+    Args:
+        current_game (Game): Obiekt gry, który przechowuje stan planszy i graczy.
+        stats (Instrumentation): Włączona instrumentacja.
+        path (str): Plik ze statystykami.
+    """
+    stats.disable()
+    if stats.moves:
+        instrumentation.write_json_line(path, stats.end_game(mode=current_game.mode,
+                                                             points=[player.points for player in current_game.players]))
 
 
 def choose_game_mode_with_keys():
@@ -92,18 +278,19 @@ def choose_game_mode_with_keys():
     Wyświetla ekran wyboru trybu gry i czeka na decyzję użytkownika.
 
     Returns:
-        int: 1, jeśli użytkownik wybierze grę gracz vs gracz, 2 dla gracz vs AI.
+        int: 1, jeśli użytkownik wybierze grę gracz vs gracz, 2 dla gracz vs AI, 3 dla gracz vs AI (MCTS).
     """
+    font = pygame.font.Font(None, 36)
+    text_surface = font.render("1: Player vs Player, 2: vs AI, 3: vs AI (MCTS)", True, BLACK)
+    screen.fill(WHITE)
+    screen.blit(text_surface, (20, WINDOW_SIZE // 2))
+    pygame.display.flip()
+
     choosing_mode = True
     mode = None
     while choosing_mode:
-        screen.fill(WHITE)
-        font = pygame.font.Font(None, 36)
-        text_surface = font.render("Press 1 for Player vs Player or 2 for Player vs AI", True, BLACK)
-        screen.blit(text_surface, (20, WINDOW_SIZE // 2))
-        pygame.display.flip()
-
-        for event in pygame.event.get():
+        # Czekamy na zdarzenie zamiast odpytywać kolejkę w pętli
+        for event in [pygame.event.wait()] + pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return None
@@ -114,38 +301,110 @@ def choose_game_mode_with_keys():
                 elif event.key == pygame.K_2:
                     mode = 2
                     choosing_mode = False
+                elif event.key == pygame.K_3:
+                    mode = 3
+                    choosing_mode = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                pygame.display.flip()
 
     return mode
 
 
-# Inicjalizacja gry
-game = Game()
+def main():
+    """
+    Uruchamia grę w oknie pygame.
+    """
+    parser = argparse.ArgumentParser(description="Play 'Kształty' in a pygame window.")
+    parser.add_argument('--stats', metavar='PATH',
+                        help="instrument the AI, print a summary after every AI move and append the game's "
+                             "statistics to this JSON lines file")
+    parser.add_argument('--record', metavar='PATH',
+                        help="append the finished game to this game record file (see records.py)")
+    args = parser.parse_args()
 
-# Wybór trybu gry
-mode = choose_game_mode_with_keys()
+    init_display()
 
-# Inicjalizacja graczy w zależności od wybranego trybu gry
-if mode == 1:
-    game.players.append(Player('X'))
-    game.players.append(Player('O'))
-elif mode == 2:
-    game.players.append(Player('X'))
-    game.players.append(Player('O', is_ai=True))
-game.current_player = game.players[0]
+    # Inicjalizacja gry
+    game = Game()
 
-# Główna pętla gry
-running = True
-while running:
-    draw_board(game)
-    pygame.display.flip()
+    # Wybór trybu gry
+    mode = choose_game_mode_with_keys()
+    if mode is None:
+        return
+
+    # Inicjalizacja graczy w zależności od wybranego trybu gry
+    if mode == 1:
+        game.players.append(Player('X'))
+        game.players.append(Player('O'))
+    elif mode == 2:
+        game.players.append(Player('X'))
+        game.players.append(Player('O', is_ai=True))
+    elif mode == 3:
+        game.players.append(Player('X'))
+        game.players.append(Player('O', is_ai=True, strategy='mcts'))
+    game.current_player = game.players[0]
+    game.mode = mode
+    game.record_path = args.record
+    if args.stats:
+        ai_stats = instrumentation.Instrumentation()
+        ai_stats.enable()
+        atexit.register(save_stats, game, ai_stats, args.stats)
+
+    renderer = BoardRenderer(screen)
+    clock = pygame.time.Clock()
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+
+    # Główna pętla gry - blokuje się do nadejścia zdarzenia i przerysowuje tylko zmienione pola.
+    # Ruch AI jest liczony w tle; w tym czasie kliknięcia są ignorowane.
+    running = True
+    ai_turn = None
+    renderer.render(game)
+    while running:
+        if ai_turn is None and game.current_player.is_ai:
+            ai_turn = AiTurn(game)
+
+        for event in [pygame.event.wait()] + pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1 and ai_turn is None and not game.current_player.is_ai:
+                    mouse_x, mouse_y = event.pos
+                    handle_mouse_click(game, mouse_x, mouse_y)
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE and ai_turn is not None:
+                    ai_turn.cancel()
+            elif event.type == AI_MOVE_EVENT:
+                if event.turn is ai_turn:
+                    ai_turn.finish()
+                    ai_turn = None
+                    handle_ai_move(game, event.move)
+            elif event.type == AI_TIMEOUT_EVENT:
+                if event.turn is ai_turn:
+                    if not ai_turn.cancelled:
+                        ai_turn.cancel()
+                    else:
+                        # Silnik nie odpowiedział - porzucamy go (nowy powstanie w następnej turze)
+                        print("AI did not answer in time, playing a random move.")
+                        ai_turn.finish()
+                        game.ai_engines.pop(ai_turn.player.symbol, None)
+                        ai_turn = None
+                        handle_ai_move(game, ai_move(game.board, game.current_player.symbol))
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderer.invalidate()
+
+        renderer.render(game)
+        clock.tick(MAX_FPS)
+
+    if ai_turn is not None:
+        ai_turn.cancel()
+        # Silnik wciąż liczy w swoim wątku - nie zamykamy go pod nim
+        game.ai_engines.pop(ai_turn.player.symbol, None)
+    game.save_record()  # Zapisujemy także grę przerwaną przed końcem
+    game.close_engines()
+
+    # Zakończenie gry i wyjście
+    pygame.quit()
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if pygame.mouse.get_pressed()[0]:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                handle_mouse_click(game, mouse_x, mouse_y)
 
-# Zakończenie gry i wyjście
-pygame.quit()
+if __name__ == '__main__':
+    main()
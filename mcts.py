@@ -0,0 +1,311 @@
+"""
+Moduł AI oparty na przeszukiwaniu drzewa Monte Carlo (MCTS, wariant UCT).
+
+Każda iteracja schodzi po drzewie według wzoru UCT, dodaje jeden nowy węzeł i rozgrywa
+losową partię do końca rundy. Wygraną wykrywa przyrostowe sprawdzenie kształtów w
+``GameBoard.place_symbol``, więc rozgrywka nie przeszukuje całej planszy. Drzewo jest
+zachowywane między kolejnymi ruchami w tej samej rundzie.
+"""
+
+import math
+import random
+import time
+from functools import lru_cache
+
+from board import neighbourhood_masks
+
+DEFAULT_TIME_BUDGET_MS = 100
+DEFAULT_EXPLORATION = 1.4
+# Prawdopodobieństwo, że ruch w rozgrywce ukierunkowanej padnie obok poprzedniego ruchu.
+ROLLOUT_BIAS = 0.5
+# Co ile iteracji sprawdzany jest zegar.
+TIME_CHECK_INTERVAL = 16
+
+
+class _Node:
+    """
+    Węzeł drzewa MCTS.
+
+    Attributes:
+        move (int): Numer pola ruchu prowadzącego do węzła (None w korzeniu).
+        symbol (str): Symbol gracza, który wykonał ten ruch.
+        parent (_Node): Węzeł nadrzędny.
+        children (dict): Węzły potomne według numeru pola ruchu.
+        untried (list): Ruchy jeszcze nierozwinięte (None - lista nie została jeszcze utworzona).
+        visits (int): Liczba przejść przez węzeł.
+        wins (float): Suma wyników z punktu widzenia ``symbol`` (1 - wygrana, 0.5 - remis).
+        terminal (bool): Czy ruch zakończył rundę ułożeniem kształtu.
+    """
+
+    __slots__ = ('move', 'symbol', 'parent', 'children', 'untried', 'visits', 'wins', 'terminal')
+
+    def __init__(self, move, symbol, parent):
+        self.move = move
+        self.symbol = symbol
+        self.parent = parent
+        self.children = {}
+        self.untried = None
+        self.visits = 0
+        self.wins = 0.0
+        self.terminal = False
+
+
+class MonteCarloTreeSearch:
+    """
+    Strategia AI wykorzystująca przeszukiwanie drzewa Monte Carlo z ograniczeniem czasu lub iteracji.
+
+    Attributes:
+        time_budget_ms (int): Limit czasu na ruch w milisekundach (None - bez limitu).
+        iterations (int): Limit liczby iteracji na ruch (None - bez limitu).
+        exploration (float): Stała eksploracji we wzorze UCT.
+        rollout (str): Rodzaj rozgrywek: 'random' albo 'biased' (częściej obok poprzedniego ruchu).
+        last_iterations (int): Liczba iteracji wykonanych przy ostatnim ruchu.
+        reused_visits (int): Liczba odwiedzin korzenia przejęta z poprzedniego ruchu.
+        cancelled (bool): Ustawiane przez ``cancel`` - kończy bieżące przeszukiwanie.
+    """
+
+    def __init__(self, time_budget_ms=DEFAULT_TIME_BUDGET_MS, iterations=None, exploration=DEFAULT_EXPLORATION,
+                 rollout='random', seed=None):
+        """
+        Inicjalizuje strategię MCTS.
+
+        Args:
+            time_budget_ms (int): Limit czasu na ruch w milisekundach (None - bez limitu).
+            iterations (int): Limit liczby iteracji na ruch (None - bez limitu).
+            exploration (float): Stała eksploracji we wzorze UCT.
+            rollout (str): Rodzaj rozgrywek: 'random' albo 'biased'.
+            seed (int): Ziarno generatora liczb losowych (None - losowe).
+
+        Raises:
+            ValueError: Jeśli nie podano żadnego limitu, limit lub stała eksploracji mają złą wartość
+                albo rodzaj rozgrywek jest nieznany.
+        """
+        from ai import _is_number  # ai importuje ten moduł
+
+        if time_budget_ms is None and iterations is None:
+            raise ValueError("MCTS needs a time budget or an iteration limit")
+        if time_budget_ms is not None and (not _is_number(time_budget_ms) or time_budget_ms <= 0):
+            raise ValueError(f"time_budget_ms must be a positive number or None, not {time_budget_ms!r}")
+        if iterations is not None and (not _is_number(iterations, integer=True) or iterations < 1):
+            raise ValueError(f"iterations must be a positive integer or None, not {iterations!r}")
+        if not _is_number(exploration) or exploration < 0:
+            raise ValueError(f"exploration must be a non-negative number, not {exploration!r}")
+        if rollout not in ('random', 'biased'):
+            raise ValueError(f"Unknown rollout policy: {rollout!r}")
+        self.time_budget_ms = time_budget_ms
+        self.iterations = iterations
+        self.exploration = exploration
+        self.rollout = rollout
+        self.rng = random.Random(seed)
+        self.last_iterations = 0
+        self.reused_visits = 0
+        self.cancelled = False
+        self._root = None
+        self._masks = None
+
+    def cancel(self):
+        """
+        Przerywa trwające przeszukiwanie (np. z innego wątku) - ``select_move`` zwróci
+        najczęściej odwiedzany dotąd ruch.
+        """
+        self.cancelled = True
+
+    def close(self):
+        """
+        Zwalnia drzewo zachowane z poprzedniego ruchu.
+        """
+        self._root = None
+
+    def select_move(self, board, symbol, opponent_symbol):
+        """
+        Wybiera ruch - najczęściej odwiedzany ruch z korzenia po wyczerpaniu limitu.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            symbol (str): Symbol gracza wykonującego ruch.
+            opponent_symbol (str): Symbol przeciwnika.
+
+        Returns:
+            tuple: Współrzędne (wiersz, kolumna) wybranego ruchu lub None, jeśli plansza jest pełna.
+        """
+        size = board.size
+        free = list(board.free)
+        if not free:
+            return None
+
+        # Ruch natychmiast wygrywający rundę nie wymaga przeszukiwania
+        for cell in free:
+            row, col = divmod(cell, size)
+            shapes = board.make_move(symbol, row, col)
+            board.unmake_move()
+            if shapes:
+                self._root = None
+                return row, col
+
+        self.cancelled = False
+        root = self._reuse_root(board, symbol, opponent_symbol)
+        self.reused_visits = root.visits
+        deadline = None
+        if self.time_budget_ms is not None:
+            deadline = time.perf_counter() + self.time_budget_ms / 1000
+
+        iterations = 0
+        while self.iterations is None or iterations < self.iterations:
+            if iterations % TIME_CHECK_INTERVAL == 0:
+                if self.cancelled or (deadline is not None and time.perf_counter() > deadline):
+                    break
+            self._iterate(board, root, symbol, opponent_symbol)
+            iterations += 1
+        self.last_iterations = iterations
+
+        best = max(root.children.values(), key=lambda child: child.visits, default=None)
+        if best is None:
+            move = self.rng.choice(free)
+        else:
+            move = best.move
+        # Drzewo pod wybranym ruchem przyda się przy następnym ruchu w tej rundzie
+        self._root = best
+        self._masks = (board.masks.get(symbol, 0) | 1 << move, board.masks.get(opponent_symbol, 0))
+        return divmod(move, size)
+
+    def _reuse_root(self, board, symbol, opponent_symbol):
+        """
+        Odnajduje w zachowanym drzewie węzeł odpowiadający obecnej pozycji.
+
+        Drzewo jest używane ponownie, jeśli od poprzedniego ruchu przybył dokładnie jeden symbol
+        przeciwnika, a pozostałe pola się nie zmieniły (plansza może być kopią - porównywane są maski).
+        W przeciwnym razie, np. w nowej rundzie, tworzony jest nowy korzeń.
+
+        Returns:
+            _Node: Korzeń drzewa dla obecnej pozycji.
+        """
+        root = self._root
+        self._root = None
+        if root is not None:
+            own_mask, opponent_mask = self._masks
+            current = board.masks.get(opponent_symbol, 0)
+            new_cells = current & ~opponent_mask
+            if (board.masks.get(symbol, 0) == own_mask and current & opponent_mask == opponent_mask
+                    and new_cells and new_cells & (new_cells - 1) == 0):
+                child = root.children.get(new_cells.bit_length() - 1)
+                if child is not None and not child.terminal:
+                    child.parent = None
+                    return child
+        return _Node(None, opponent_symbol, None)
+
+    def _iterate(self, board, root, symbol, opponent_symbol):
+        """
+        Wykonuje jedną iterację: wybór, rozwinięcie, rozgrywkę i propagację wyniku.
+        """
+        size = board.size
+        placed = []
+        node = root
+        winner = None
+
+        # Wybór - schodzimy po w pełni rozwiniętych węzłach według UCT
+        while not node.terminal:
+            if node.untried is None:
+                node.untried = list(board.free)
+                self.rng.shuffle(node.untried)
+            if node.untried or not node.children:
+                break
+            node = self._select_child(node)
+            board.make_move(node.symbol, *divmod(node.move, size))
+            placed.append(node.move)
+
+        if node.terminal:
+            winner = node.symbol
+        elif node.untried:
+            # Rozwinięcie - dodajemy jeden nowy węzeł
+            move = node.untried.pop()
+            mover = opponent_symbol if node.symbol == symbol else symbol
+            child = _Node(move, mover, node)
+            node.children[move] = child
+            node = child
+            placed.append(move)
+            if board.make_move(mover, *divmod(move, size)):
+                child.terminal = True
+                winner = mover
+            else:
+                winner = self._rollout(board, node.symbol, symbol, opponent_symbol, move, placed)
+
+        # Propagacja wyniku w górę drzewa
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.symbol:
+                node.wins += 1.0
+            node = node.parent
+
+        for _ in placed:
+            board.unmake_move()  # Cofamy ruchy
+
+    def _select_child(self, node):
+        """
+        Wybiera potomka o największej wartości UCT.
+        """
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        best = None
+        best_value = -1.0
+        for child in node.children.values():
+            value = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best_value = value
+                best = child
+        return best
+
+    def _rollout(self, board, last_symbol, symbol, opponent_symbol, last_move, placed):
+        """
+        Rozgrywa losowo rundę do końca, dopisując wykonane ruchy do ``placed``.
+
+        Returns:
+            str: Symbol zwycięzcy rozgrywki lub None w przypadku remisu.
+        """
+        size = board.size
+        rng = self.rng
+        order = list(board.free)
+        rng.shuffle(order)
+        neighbours = neighbour_cells(size) if self.rollout == 'biased' else None
+        mover = opponent_symbol if last_symbol == symbol else symbol
+        index = 0
+        while True:
+            cell = None
+            if neighbours is not None and rng.random() < ROLLOUT_BIAS:
+                candidates = [c for c in neighbours[last_move] if not board.occupied >> c & 1]
+                if candidates:
+                    cell = rng.choice(candidates)
+            if cell is None:
+                while index < len(order) and board.occupied >> order[index] & 1:
+                    index += 1
+                if index == len(order):
+                    return None  # Plansza pełna - remis
+                cell = order[index]
+            placed.append(cell)
+            if board.make_move(mover, *divmod(cell, size)):
+                return mover
+            last_move = cell
+            mover = opponent_symbol if mover == symbol else symbol
+
+
+@lru_cache(maxsize=None)
+def neighbour_cells(size):
+    """
+    Zwraca dla każdego pola listę numerów pól sąsiednich (kwadrat 3x3 bez samego pola).
+
+    Args:
+        size (int): Rozmiar planszy.
+
+    Returns:
+        tuple: Krotka krotek numerów pól indeksowana numerem pola.
+    """
+    result = []
+    for mask in neighbourhood_masks(size):
+        cells = []
+        while mask:
+            low = mask & -mask
+            cells.append(low.bit_length() - 1)
+            mask ^= low
+        result.append(tuple(cells))
+    return tuple(result)
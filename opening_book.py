@@ -0,0 +1,351 @@
+"""
+Moduł księgi otwarć: najlepsze ruchy we wczesnych pozycjach, wyliczone zawczasu głębokim
+przeszukiwaniem i zapisane w zwartym pliku binarnym.
+
+Plik zaczyna się nagłówkiem (``HEADER``: znacznik, wersja formatu, rozmiar planszy, liczba
+wpisów, głębokość przeszukiwania i liczba półruchów), po którym następują wpisy (``ENTRY``:
+klucz pozycji, wynik, numer pola ruchu, głębokość) posortowane według klucza. Plik jest
+mapowany do pamięci (``mmap``), a wpis jest wyszukiwany binarnie, więc otwarcie księgi
+praktycznie nic nie kosztuje.
+
+Klucz pozycji jest liczony względem gracza na ruchu (symbole 'własny' i 'przeciwnika'), więc
+ta sama księga obsługuje gracza 'X' i 'O', i jest kanoniczny ze względu na symetrie planszy
+(``symmetry.symmetry_group``) - pozycje symetryczne mają jeden wpis, a ruch jest zapisany
+w układzie pozycji kanonicznej.
+
+Przykłady:
+    python opening_book.py build --depth 4 --plies 2
+    python opening_book.py info
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+import warnings
+
+from board import GameBoard, zobrist_keys
+from symmetry import inverse_permutation, symmetry_group
+
+MAGIC = b'KSZB'
+BOOK_VERSION = 2
+# Znacznik, wersja, rozmiar planszy, liczba wpisów, głębokość przeszukiwania, liczba półruchów.
+HEADER = struct.Struct('<4sHHIHH')
+# Klucz pozycji, wynik, numer pola ruchu, głębokość przeszukiwania.
+ENTRY = struct.Struct('<QiHH')
+
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+DEFAULT_BOOK_DEPTH = 4
+DEFAULT_BOOK_PLIES = 2
+# Symbole, którymi liczony jest klucz pozycji (niezależny od symboli graczy).
+OWN = '+'
+OPPONENT = '-'
+
+
+def position_key(board, symbol, opponent_symbol):
+    """
+    Liczy kanoniczny klucz pozycji względem gracza na ruchu.
+
+    Args:
+        board (GameBoard): Obiekt planszy do gry.
+        symbol (str): Symbol gracza na ruchu.
+        opponent_symbol (str): Symbol przeciwnika.
+
+    Returns:
+        tuple: Para (klucz, permutacja pól przeprowadzająca pozycję do postaci kanonicznej). Klucz to
+        najmniejszy z hashy Zobrista symetrycznych odpowiedników pozycji, z symbolami zastąpionymi
+        przez ``OWN`` i ``OPPONENT``.
+    """
+    best = None
+    for _, permutation in symmetry_group(board.shapes):
+        key = 0
+        for mask, relative in ((board.masks.get(symbol, 0), OWN), (board.masks.get(opponent_symbol, 0), OPPONENT)):
+            keys = zobrist_keys(board.size, relative)
+            while mask:
+                low = mask & -mask
+                key ^= keys[permutation[low.bit_length() - 1]]
+                mask ^= low
+        if best is None or key < best[0]:
+            best = (key, permutation)
+    return best
+
+
+class OpeningBook:
+    """
+    Księga otwarć odczytywana z pliku mapowanego do pamięci.
+
+    Attributes:
+        path (str): Ścieżka pliku księgi.
+        size (int): Rozmiar planszy, dla której zbudowano księgę.
+        entries (int): Liczba pozycji w księdze.
+        depth (int): Głębokość przeszukiwania użyta przy budowie.
+        plies (int): Największa liczba zajętych pól w pozycjach z księgi.
+        hits (int): Liczba zapytań, na które księga znała ruch.
+        misses (int): Liczba zapytań o pozycje spoza księgi.
+    """
+
+    def __init__(self, path=DEFAULT_BOOK_PATH):
+        """
+        Otwiera plik księgi.
+
+        Args:
+            path (str): Ścieżka pliku księgi.
+
+        Raises:
+            ValueError: Jeśli plik nie jest księgą otwarć lub ma nieobsługiwaną wersję formatu.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < HEADER.size:
+            raise ValueError(f"{path} is not an opening book")
+        magic, version, self.size, self.entries, self.depth, self.plies = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an opening book")
+        if version != BOOK_VERSION:
+            raise ValueError(f"{path} has book format version {version}, expected {BOOK_VERSION}; "
+                             f"rebuild it with 'python opening_book.py build'")
+        if len(self._data) != HEADER.size + self.entries * ENTRY.size:
+            raise ValueError(f"{path} is truncated")
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        """
+        Zamyka mapowanie pliku.
+        """
+        self._data.close()
+
+    def probe(self, key):
+        """
+        Wyszukuje wpis o podanym kluczu.
+
+        Args:
+            key (int): Klucz pozycji (patrz ``position_key``).
+
+        Returns:
+            tuple: Krotka (numer pola ruchu, wynik, głębokość) lub None, jeśli pozycji nie ma w księdze.
+        """
+        data = self._data
+        low, high = 0, self.entries
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, score, cell, depth = ENTRY.unpack_from(data, HEADER.size + middle * ENTRY.size)
+            if entry_key == key:
+                return cell, score, depth
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def lookup(self, board, symbol, opponent_symbol):
+        """
+        Zwraca ruch z księgi dla bieżącej pozycji.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            symbol (str): Symbol gracza na ruchu.
+            opponent_symbol (str): Symbol przeciwnika.
+
+        Returns:
+            tuple: Współrzędne (wiersz, kolumna) ruchu lub None, jeśli pozycji nie ma w księdze.
+        """
+        if board.size != self.size or board.occupied_count > self.plies:
+            return None  # Pozycja na pewno spoza księgi - nie liczymy jej do statystyk
+        key, permutation = position_key(board, symbol, opponent_symbol)
+        entry = self.probe(key)
+        if entry is not None:
+            move = divmod(inverse_permutation(permutation)[entry[0]], board.size)
+            if board.is_spot_available(*move):
+                self.hits += 1
+                return move
+        self.misses += 1
+        return None
+
+    def stats(self):
+        """
+        Zwraca statystyki księgi.
+
+        Returns:
+            dict: Liczba wpisów, trafień i chybień, odsetek trafień oraz rozmiar pliku w bajtach.
+        """
+        probes = self.hits + self.misses
+        return {
+            'entries': self.entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'file_bytes': len(self._data),
+        }
+
+
+_default_book = None
+_default_book_loaded = False
+
+
+def default_book():
+    """
+    Zwraca księgę z ``DEFAULT_BOOK_PATH`` otwieraną przy pierwszym użyciu.
+
+    Returns:
+        OpeningBook: Księga otwarć lub None, jeśli plik nie istnieje albo jest nieaktualny.
+    """
+    global _default_book, _default_book_loaded
+    if not _default_book_loaded:
+        _default_book_loaded = True
+        if os.path.exists(DEFAULT_BOOK_PATH):
+            try:
+                _default_book = OpeningBook(DEFAULT_BOOK_PATH)
+            except ValueError as error:
+                warnings.warn(f"Opening book ignored: {error}")
+    return _default_book
+
+
+# Silnik przeszukiwania procesu budującego księgę (tworzony raz na proces).
+_worker_search = None
+
+
+def _analyse_position(data, depth):
+    """
+    Przeszukuje pozycję dla księgi (zadanie dla procesu roboczego); na ruchu jest 'X'.
+
+    Args:
+        data (bytes): Plansza zakodowana metodą ``GameBoard.to_bytes``.
+        depth (int): Głębokość przeszukiwania.
+
+    Returns:
+        tuple: Para (numer pola najlepszego ruchu, wynik).
+    """
+    global _worker_search
+    if _worker_search is None:
+        from ai import AlphaBetaSearch  # ai korzysta z tego modułu
+
+        _worker_search = AlphaBetaSearch(time_budget_ms=None, use_book=False)
+    board = GameBoard.from_bytes(data)
+    move, score = _worker_search.search_depth(board, 'X', 'O', depth)
+    return move[0] * board.size + move[1], score
+
+
+def book_positions(size, plies, best_moves):
+    """
+    Wylicza pozycje, w których gracz korzystający z księgi może być na ruchu.
+
+    Gracz na ruchu gra symbolem 'X'. Jego ruchy pochodzą z księgi (``best_moves``), a przeciwnik
+    może odpowiedzieć na każdym wolnym polu.
+
+    Args:
+        size (int): Rozmiar planszy.
+        plies (int): Liczba zajętych pól w wyliczanych pozycjach.
+        best_moves (dict): Ruchy z księgi (numery pól w układzie pozycji kanonicznej) według klucza
+            pozycji dla pozycji o mniejszej liczbie zajętych pól.
+
+    Returns:
+        list: Plansze (``GameBoard``) o ``plies`` zajętych polach, z 'X' na ruchu.
+    """
+    if plies == 0:
+        return [GameBoard(size)]
+    if plies == 1:
+        openings = []
+        for cell in range(size * size):
+            board = GameBoard(size)
+            board.place_symbol('O', *divmod(cell, size))
+            openings.append(board)
+        return openings
+
+    positions = []
+    for board in book_positions(size, plies - 2, best_moves):
+        key, permutation = position_key(board, 'X', 'O')
+        cell = inverse_permutation(permutation)[best_moves[key]]
+        for reply in range(size * size):
+            if reply != cell and board.is_spot_available(*divmod(reply, size)):
+                child = board.copy()
+                child.place_symbol('X', *divmod(cell, size))
+                child.place_symbol('O', *divmod(reply, size))
+                positions.append(child)
+    return positions
+
+
+def build_book(path=DEFAULT_BOOK_PATH, size=10, depth=DEFAULT_BOOK_DEPTH, plies=DEFAULT_BOOK_PLIES, workers=None):
+    """
+    Buduje księgę otwarć i zapisuje ją do pliku.
+
+    Args:
+        path (str): Ścieżka pliku wynikowego (zastępowanego atomowo).
+        size (int): Rozmiar planszy.
+        depth (int): Głębokość przeszukiwania każdej pozycji.
+        plies (int): Największa liczba zajętych pól w pozycjach z księgi.
+        workers (int): Liczba procesów (None - liczba rdzeni, 1 - w bieżącym procesie).
+
+    Returns:
+        int: Liczba zapisanych pozycji.
+    """
+    # Importowane dopiero tutaj - ai importuje ten moduł, a pula procesów wydłuża start silnika
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    best = {}  # klucz pozycji -> (numer pola w układzie pozycji kanonicznej, wynik)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for ply in range(plies + 1):
+            positions = {}
+            for board in book_positions(size, ply, {key: cell for key, (cell, _) in best.items()}):
+                key, permutation = position_key(board, 'X', 'O')
+                positions.setdefault(key, (board.to_bytes(), permutation))
+            keys = [key for key in positions if key not in best]
+            data = [positions[key][0] for key in keys]
+            start = time.perf_counter()
+            if executor is None:
+                results = [_analyse_position(item, depth) for item in data]
+            else:
+                results = executor.map(_analyse_position, data, [depth] * len(data),
+                                       chunksize=max(1, len(data) // (4 * workers)))
+            for key, (cell, score) in zip(keys, results):
+                best[key] = (positions[key][1][cell], score)
+            print(f"ply {ply}: {len(keys)} positions in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, BOOK_VERSION, size, len(best), depth, plies))
+        for key in sorted(best):
+            cell, score = best[key]
+            file.write(ENTRY.pack(key, score, cell, depth))
+    os.replace(temporary, path)
+    return len(best)
+
+
+def main():
+    """
+    Buduje księgę otwarć lub wypisuje informacje o niej z linii poleceń.
+    """
+    import argparse  # Tylko dla linii poleceń - ai importuje ten moduł
+
+    parser = argparse.ArgumentParser(description="Build or inspect the AI opening book.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="(re)build the book with deep searches of early positions")
+    build.add_argument('-o', '--output', default=DEFAULT_BOOK_PATH, help="book file to write")
+    build.add_argument('--size', type=int, default=10, help="board size")
+    build.add_argument('--depth', type=int, default=DEFAULT_BOOK_DEPTH, help="search depth per position")
+    build.add_argument('--plies', type=int, default=DEFAULT_BOOK_PLIES, help="deepest position (occupied cells)")
+    build.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    info = commands.add_parser('info', help="print the book header")
+    info.add_argument('path', nargs='?', default=DEFAULT_BOOK_PATH, help="book file")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        count = build_book(args.output, args.size, args.depth, args.plies, args.workers)
+        print(f"wrote {count} positions to {args.output} in {time.perf_counter() - start:.1f} s")
+    else:
+        book = OpeningBook(args.path)
+        print(f"{args.path}: format v{BOOK_VERSION}, {book.size}x{book.size} board, {book.entries} positions, "
+              f"depth {book.depth}, up to {book.plies} occupied cells, {book.stats()['file_bytes']} bytes")
+        book.close()
+
+
+if __name__ == '__main__':
+    main()
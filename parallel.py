@@ -0,0 +1,304 @@
+"""
+Moduł równoległego przeszukiwania ruchów AI na wielu rdzeniach.
+
+Pierwszy ruch w korzeniu jest przeszukiwany w procesie głównym, a jego wynik staje się dolnym
+ograniczeniem (alfa) dla pozostałych ruchów, rozdzielanych między procesy ``ProcessPoolExecutor``.
+Procesy dostają planszę zakodowaną metodą ``GameBoard.snapshot``, a nie zserializowany obiekt.
+
+Przyspieszenie zależy od liczby rdzeni i głębokości: przy płytkim przeszukiwaniu koszt przesłania
+pozycji i uruchomienia procesów przewyższa zysk (patrz ``speedup_report``).
+"""
+
+import itertools
+import os
+import random
+import time
+
+from board import GameBoard
+
+DEFAULT_DEPTH = 3
+
+# Silnik przeszukiwania procesu roboczego (tworzony raz na proces) i numer przeszukiwania,
+# dla którego zawiera wpisy jego tablica transpozycji.
+_worker_search = None
+_worker_search_id = None
+
+
+def _search_root_move(search_id, snapshot, symbol, opponent_symbol, move, depth, alpha):
+    """
+    Przeszukuje jeden ruch z korzenia w procesie roboczym.
+
+    Args:
+        search_id (int): Numer przeszukiwania - nowy numer czyści tablicę transpozycji procesu.
+        snapshot (BoardSnapshot): Pozycja w korzeniu (``GameBoard.snapshot``).
+        symbol (str): Symbol gracza wykonującego ruch w korzeniu.
+        opponent_symbol (str): Symbol przeciwnika.
+        move (tuple): Ruch (wiersz, kolumna) do zbadania.
+        depth (int): Głębokość przeszukiwania liczona od korzenia.
+        alpha (float): Wynik najlepszego dotąd ruchu w korzeniu.
+
+    Returns:
+        tuple: Para (wynik ruchu, liczba odwiedzonych węzłów).
+    """
+    global _worker_search, _worker_search_id
+    if _worker_search is None:
+        from ai import AlphaBetaSearch  # ai importuje ten moduł
+
+        _worker_search = AlphaBetaSearch(time_budget_ms=None)
+    if search_id != _worker_search_id:
+        _new_search(_worker_search)
+        _worker_search_id = search_id
+    board = GameBoard.from_snapshot(snapshot)
+    score = _worker_search.score_root_move(board, symbol, opponent_symbol, move, depth, alpha)
+    return score, _worker_search.nodes
+
+
+def _new_search(search):
+    """
+    Czyści tablicę transpozycji przed przeszukiwaniem nowej pozycji.
+
+    Wpisy z wcześniejszych przeszukiwań mogą pochodzić z większej głębokości i zmienić wyniki ruchów,
+    a każdy proces ma własną tablicę - bez czyszczenia wybrany ruch zależałby od tego, które ruchy
+    trafiły wcześniej do którego procesu.
+    """
+    if search.tt is not None:
+        search.tt.clear()
+
+
+class ParallelSearch:
+    """
+    Przeszukiwanie alfa-beta o stałej głębokości z ruchami w korzeniu rozdzielonymi między procesy.
+
+    Zwraca ten sam ruch co ``AlphaBetaSearch.search_depth`` nowego silnika (z pustą tablicą
+    transpozycji): wyniki ruchów lepszych od pierwszego są dokładne, a remisy rozstrzyga kolejność
+    ruchów. Każdy proces ma własną tablicę transpozycji, czyszczoną na początku przeszukiwania.
+    Pozycja o danej liczbie kamieni leży zawsze na tej samej głębokości drzewa, więc wpisy zapisane
+    przy innych ruchach z korzenia dotyczą tej samej pozostałej głębokości i nie zmieniają dokładnych
+    wyników.
+
+    Pula procesów powstaje przy pierwszym przeszukiwaniu; właściciel silnika zwalnia ją przez ``close``
+    (lub blok ``with``).
+
+    Attributes:
+        workers (int): Liczba procesów roboczych (None - domyślny rozmiar puli, 1 - przeszukiwanie
+            w bieżącym procesie).
+        depth (int): Głębokość przeszukiwania (w półruchach).
+        nodes (int): Łączna liczba węzłów odwiedzonych w ostatnim przeszukiwaniu.
+        cancelled (bool): Ustawiane przez ``cancel`` - kończy przeszukiwanie po bieżącym ruchu z korzenia.
+    """
+
+    def __init__(self, workers=None, depth=DEFAULT_DEPTH):
+        """
+        Inicjalizuje przeszukiwanie równoległe.
+
+        Args:
+            workers (int): Liczba procesów roboczych (None - domyślny rozmiar puli
+                ``ProcessPoolExecutor``; na komputerze z jednym rdzeniem przeszukiwanie jest szeregowe).
+            depth (int): Głębokość przeszukiwania (w półruchach).
+
+        Raises:
+            ValueError: Jeśli liczba procesów lub głębokość mają złą wartość.
+        """
+        from ai import AlphaBetaSearch, _is_number  # ai importuje ten moduł
+
+        if workers is not None and (not _is_number(workers, integer=True) or workers < 1):
+            raise ValueError(f"workers must be a positive integer or None, not {workers!r}")
+        if not _is_number(depth, integer=True) or depth < 1:
+            raise ValueError(f"depth must be a positive integer, not {depth!r}")
+        if workers is None and (os.cpu_count() or 1) == 1:
+            workers = 1  # Procesy robocze tylko spowolniłyby przeszukiwanie
+        self.workers = workers
+        self._executor = None  # Pula procesów tworzona przy pierwszym przeszukiwaniu (patrz ``_pool``)
+        self.depth = depth
+        self.nodes = 0
+        self.cancelled = False
+        self._search = AlphaBetaSearch(time_budget_ms=None)
+        self._search_ids = itertools.count()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Zamyka pulę procesów roboczych (kolejne przeszukiwanie utworzy nową).
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _pool(self):
+        """
+        Zwraca pulę procesów roboczych, tworząc ją przy pierwszym użyciu.
+
+        Returns:
+            ProcessPoolExecutor: Pula procesów lub None, jeśli przeszukiwanie jest szeregowe.
+        """
+        if self._executor is None and self.workers != 1:
+            # Importowane dopiero tutaj - ai importuje ten moduł, a pula procesów wydłuża start silnika
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def cancel(self):
+        """
+        Przerywa trwające przeszukiwanie (np. z innego wątku) - ``select_move`` zwróci najlepszy ruch
+        znaleziony do tej pory, gdy skończy się bieżący ruch z korzenia.
+        """
+        self.cancelled = True
+
+    def select_move(self, board, symbol, opponent_symbol):
+        """
+        Wybiera ruch, przeszukując ruchy z korzenia równolegle.
+
+        Args:
+            board (GameBoard): Obiekt planszy do gry.
+            symbol (str): Symbol gracza wykonującego ruch.
+            opponent_symbol (str): Symbol przeciwnika.
+
+        Returns:
+            tuple: Współrzędne (wiersz, kolumna) najlepszego ruchu lub None, jeśli plansza jest pełna.
+        """
+        return self.search(board, symbol, opponent_symbol)[0]
+
+    def search(self, board, symbol, opponent_symbol):
+        """
+        Przeszukuje pozycję do głębokości ``self.depth``.
+
+        Returns:
+            tuple: Para (najlepszy ruch, jego ocena z punktu widzenia gracza).
+        """
+        self.cancelled = False
+        search = self._search
+        moves = search.root_moves(board)
+        if not moves:
+            return None, 0
+
+        # Pierwszy ruch przeszukujemy sami - jego wynik zawęża okno pozostałych
+        _new_search(search)
+        best_move = moves[0]
+        best_score = search.score_root_move(board, symbol, opponent_symbol, best_move, self.depth)
+        self.nodes = search.nodes
+        if len(moves) == 1:
+            return best_move, best_score
+
+        executor = self._pool()
+        if executor is None:
+            alpha = best_score
+
+            def score(move):
+                move_score = search.score_root_move(board, symbol, opponent_symbol, move, self.depth, alpha)
+                return move_score, search.nodes
+
+            results = map(score, moves[1:])
+        else:
+            snapshot = board.snapshot()
+            count = len(moves) - 1
+            workers = self.workers or os.cpu_count() or 1
+            results = executor.map(_search_root_move, [next(self._search_ids)] * count, [snapshot] * count,
+                                   [symbol] * count, [opponent_symbol] * count, moves[1:],
+                                   [self.depth] * count, [best_score] * count,
+                                   chunksize=max(1, count // (4 * workers)))
+
+        # Ruchy są zwracane w kolejności, więc ścisła nierówność zachowuje rozstrzyganie remisów
+        for move, (score, nodes) in zip(moves[1:], results):
+            self.nodes += nodes
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if self.cancelled:
+                break  # Niezakończone zadania puli są anulowane przy zamknięciu generatora wyników
+        return best_move, best_score
+
+
+def random_midgame_board(size=10, moves=20, seed=0):
+    """
+    Tworzy pozycję ze środka partii: losowe ruchy na przemian, bez ułożonych kształtów.
+
+    Args:
+        size (int): Rozmiar planszy.
+        moves (int): Liczba ruchów do wykonania.
+        seed (int): Ziarno generatora liczb losowych.
+
+    Returns:
+        GameBoard: Plansza po wykonaniu ruchów ('X' zaczyna).
+    """
+    rng = random.Random(seed)
+    board = GameBoard(size)
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    rng.shuffle(cells)
+    placed = 0
+    for row, col in cells:
+        if placed == moves:
+            break
+        symbol = 'XO'[placed % 2]
+        if board.place_symbol(symbol, row, col):
+            board.place_symbol(' ', row, col)  # Ruch kończyłby rundę - pomijamy
+            continue
+        placed += 1
+    return board
+
+
+def speedup_report(board, symbol, opponent_symbol, depth=DEFAULT_DEPTH, max_workers=4):
+    """
+    Mierzy czas przeszukiwania dla od 1 do ``max_workers`` procesów.
+
+    Args:
+        board (GameBoard): Pozycja do przeszukania.
+        symbol (str): Symbol gracza wykonującego ruch.
+        opponent_symbol (str): Symbol przeciwnika.
+        depth (int): Głębokość przeszukiwania.
+        max_workers (int): Największa badana liczba procesów.
+
+    Returns:
+        list: Lista słowników z kluczami ``workers``, ``seconds``, ``speedup``, ``move`` i ``same_move``.
+    """
+    from ai import AlphaBetaSearch  # ai importuje ten moduł
+
+    serial_move, _ = AlphaBetaSearch(time_budget_ms=None).search_depth(board, symbol, opponent_symbol, depth)
+    report = []
+    for workers in range(1, max_workers + 1):
+        with ParallelSearch(workers, depth) as search:
+            executor = search._pool()
+            if executor is not None:
+                # Rozgrzewka - uruchomienie procesów nie wlicza się do pomiaru
+                list(executor.map(abs, range(workers)))
+            start = time.perf_counter()
+            move = search.select_move(board, symbol, opponent_symbol)
+            seconds = time.perf_counter() - start
+        report.append({
+            'workers': workers,
+            'seconds': seconds,
+            'speedup': report[0]['seconds'] / seconds if report else 1.0,
+            'move': move,
+            'same_move': move == serial_move,
+        })
+    return report
+
+
+def main():
+    """
+    Wypisuje raport przyspieszenia przeszukiwania równoległego dla pozycji ze środka partii.
+    """
+    import argparse  # Tylko dla linii poleceń - ai importuje ten moduł
+
+    parser = argparse.ArgumentParser(description="Parallel root search speedup report.")
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH, help="search depth in plies")
+    parser.add_argument('--workers', type=int, default=4, help="largest number of worker processes")
+    parser.add_argument('--size', type=int, default=10, help="board size")
+    parser.add_argument('--moves', type=int, default=20, help="moves played before the searched position")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the position")
+    args = parser.parse_args()
+
+    board = random_midgame_board(args.size, args.moves, args.seed)
+    print(f"{'workers':>7} {'seconds':>9} {'speedup':>8}  move")
+    for row in speedup_report(board, 'X', 'O', args.depth, args.workers):
+        note = "" if row['same_move'] else "  (differs from serial search!)"
+        print(f"{row['workers']:>7} {row['seconds']:>9.3f} {row['speedup']:>8.2f}  {row['move']}{note}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,16 +6,21 @@ class Player:
         symbol (str): Symbol przypisany do gracza ('X' lub 'O').
         is_ai (bool): Flaga określająca, czy gracz jest AI. Domyślnie False (gracz to człowiek).
         points (int): Liczba punktów zdobytych przez gracza w trakcie gry.
+        strategy (str): Nazwa strategii AI z ``ai.STRATEGIES`` (używana, gdy gracz jest AI).
     """
 
-    def __init__(self, symbol, is_ai=False):
+    __slots__ = ('symbol', 'is_ai', 'strategy', 'points')
+
+    def __init__(self, symbol, is_ai=False, strategy='alphabeta'):
         """
         Inicjalizuje nowego gracza.
 
         Args:
             symbol (str): Symbol przypisany do gracza ('X' lub 'O').
             is_ai (bool): Flaga określająca, czy gracz jest AI. Domyślnie False (gracz to człowiek).
+            strategy (str): Nazwa strategii AI z ``ai.STRATEGIES``, np. 'alphabeta' lub 'mcts'.
         """
         self.symbol = symbol
         self.is_ai = is_ai
+        self.strategy = strategy
         self.points = 0
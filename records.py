@@ -0,0 +1,441 @@
+"""
+Moduł zapisu rozegranych gier w zwartym formacie binarnym.
+
+Plik danych zaczyna się nagłówkiem (``MAGIC`` i wersja formatu), po którym następują kolejne
+gry, każda poprzedzona długością (``<I``). Gra zapisuje tryb, rozmiar planszy i symbole graczy,
+a każda runda - gracza zaczynającego, zwycięzcę, punkty, nazwę ułożonego kształtu i ruchy jako
+numery pól (1 bajt na ruch na planszach do 256 pól). Gry są tylko dopisywane na końcu pliku.
+
+Obok pliku danych leży indeks (``<ścieżka>.idx``) z przesunięciami kolejnych gier (``<Q``),
+dzięki któremu odczyt gry numer N wymaga jednego odczytu indeksu i jednego pliku danych.
+Indeks można odbudować z pliku danych (``rebuild_index``); brakujący lub nieaktualny indeks (np. po
+przerwanym zapisie) jest odbudowywany przy otwarciu pliku.
+
+Przykłady:
+    python records.py info games.kgr
+    python records.py show games.kgr 12
+"""
+
+import os
+import struct
+
+from board import GameBoard
+
+MAGIC = b'KSZR'
+RECORD_VERSION = 1
+HEADER = struct.Struct('<4sB')
+LENGTH = struct.Struct('<I')
+# Tryb, rozmiar planszy, symbole obu graczy, liczba rund.
+GAME = struct.Struct('<BB2sB')
+# Gracz zaczynający, zwycięzca (NO_WINNER - remis), punkty, liczba ruchów, długość nazwy kształtu.
+ROUND = struct.Struct('<BBBHB')
+OFFSET = struct.Struct('<Q')
+NO_WINNER = 255
+
+# Tryby gry zapisywane w rekordzie.
+MODE_SELFPLAY = 0
+MODE_PLAYER_VS_PLAYER = 1
+MODE_PLAYER_VS_AI = 2
+MODE_PLAYER_VS_MCTS = 3
+
+
+class RoundRecord:
+    """
+    Zapis jednej rundy.
+
+    Attributes:
+        starting_player (int): Indeks gracza, który wykonał pierwszy ruch.
+        moves (list): Numery pól (``wiersz * size + kolumna``) w kolejności ruchów; gracze ruszają się na przemian.
+        winner (int): Indeks gracza, który ułożył kształt (None - remis lub runda niedokończona).
+        shape (str): Nazwa ułożonego kształtu (None, jeśli nie ułożono kształtu).
+        points (int): Punkty przyznane zwycięzcy rundy.
+    """
+
+    def __init__(self, starting_player, moves=None, winner=None, shape=None, points=0):
+        self.starting_player = starting_player
+        self.moves = moves if moves is not None else []
+        self.winner = winner
+        self.shape = shape
+        self.points = points
+
+
+class GameRecord:
+    """
+    Zapis całej gry.
+
+    Attributes:
+        mode (int): Tryb gry (``MODE_*``).
+        size (int): Rozmiar planszy.
+        symbols (str): Symbole graczy w kolejności indeksów, np. 'XO'.
+        rounds (list): Zapisy rund (``RoundRecord``).
+    """
+
+    def __init__(self, mode=MODE_SELFPLAY, size=10, symbols='XO', rounds=None):
+        self.mode = mode
+        self.size = size
+        self.symbols = symbols
+        self.rounds = rounds if rounds is not None else []
+
+    def to_bytes(self):
+        """
+        Koduje grę (bez prefiksu długości).
+
+        Returns:
+            bytes: Zakodowana gra.
+        """
+        wide = self.size * self.size > 256
+        parts = [GAME.pack(self.mode, self.size, self.symbols.encode('ascii'), len(self.rounds))]
+        for game_round in self.rounds:
+            shape = (game_round.shape or '').encode('ascii')
+            winner = NO_WINNER if game_round.winner is None else game_round.winner
+            parts.append(ROUND.pack(game_round.starting_player, winner, game_round.points, len(game_round.moves),
+                                    len(shape)))
+            parts.append(shape)
+            if wide:
+                parts.append(struct.pack(f'<{len(game_round.moves)}H', *game_round.moves))
+            else:
+                parts.append(bytes(game_round.moves))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Odtwarza grę zakodowaną metodą ``to_bytes``.
+
+        Args:
+            data (bytes): Zakodowana gra.
+
+        Returns:
+            GameRecord: Zapis gry.
+        """
+        mode, size, symbols, round_count = GAME.unpack_from(data, 0)
+        offset = GAME.size
+        wide = size * size > 256
+        rounds = []
+        for _ in range(round_count):
+            starting_player, winner, points, move_count, shape_length = ROUND.unpack_from(data, offset)
+            offset += ROUND.size
+            shape = data[offset:offset + shape_length].decode('ascii') or None
+            offset += shape_length
+            if wide:
+                moves = list(struct.unpack_from(f'<{move_count}H', data, offset))
+                offset += 2 * move_count
+            else:
+                moves = list(data[offset:offset + move_count])
+                offset += move_count
+            rounds.append(RoundRecord(starting_player, moves, None if winner == NO_WINNER else winner, shape, points))
+        return cls(mode, size, symbols.decode('ascii'), rounds)
+
+    def replay(self):
+        """
+        Odtwarza ruchy gry na planszy.
+
+        Każda runda korzysta z jednej planszy, więc zwracany obiekt ``GameBoard`` zmienia się
+        między kolejnymi krokami (należy go skopiować, jeśli ma być zachowany).
+
+        Yields:
+            tuple: Krotka (numer rundy od 0, plansza po ruchu, numer pola ruchu, symbol gracza).
+        """
+        for number, game_round in enumerate(self.rounds):
+            board = GameBoard(self.size)
+            player = game_round.starting_player
+            for cell in game_round.moves:
+                symbol = self.symbols[player]
+                board.place_symbol(symbol, cell // self.size, cell % self.size)
+                yield number, board, cell, symbol
+                player = 1 - player
+
+
+def index_path(path):
+    """
+    Zwraca ścieżkę indeksu pliku z grami.
+
+    Args:
+        path (str): Ścieżka pliku danych.
+
+    Returns:
+        str: Ścieżka indeksu.
+    """
+    return path + '.idx'
+
+
+class RecordWriter:
+    """
+    Dopisuje gry do pliku danych i indeksu.
+
+    Attributes:
+        path (str): Ścieżka pliku danych.
+    """
+
+    def __init__(self, path):
+        """
+        Otwiera (lub tworzy) plik danych i indeks do dopisywania.
+
+        Brakujący lub nieaktualny indeks jest odbudowywany, a niedokończona ostatnia gra (np. po
+        przerwanym zapisie) jest odcinana, aby nowe gry nie trafiły za uszkodzony fragment pliku.
+
+        Args:
+            path (str): Ścieżka pliku danych.
+
+        Raises:
+            ValueError: Jeśli istniejący plik nie jest plikiem z grami lub ma inną wersję formatu.
+        """
+        self.path = path
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new:
+            _check_header(path)
+            if _indexed_end(path) != os.path.getsize(path):
+                rebuild_index(path)
+                end = _indexed_end(path)
+                if end != os.path.getsize(path):
+                    os.truncate(path, end)
+        self._data = open(path, 'ab')
+        self._index = open(index_path(path), 'ab')
+        if new:
+            self._data.write(HEADER.pack(MAGIC, RECORD_VERSION))
+            self._index.truncate(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, record):
+        """
+        Dopisuje grę na końcu pliku.
+
+        Args:
+            record (GameRecord | bytes): Zapis gry lub gra już zakodowana metodą ``GameRecord.to_bytes``.
+        """
+        data = record if isinstance(record, bytes) else record.to_bytes()
+        self._index.write(OFFSET.pack(self._data.tell()))
+        self._data.write(LENGTH.pack(len(data)))
+        self._data.write(data)
+
+    def close(self):
+        """
+        Zapisuje bufory i zamyka pliki.
+        """
+        self._data.close()
+        self._index.close()
+
+
+def _check_header(path):
+    """
+    Sprawdza nagłówek pliku z grami.
+
+    Raises:
+        ValueError: Jeśli plik nie jest plikiem z grami lub ma inną wersję formatu.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a game record file")
+    magic, version = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a game record file")
+    if version != RECORD_VERSION:
+        raise ValueError(f"{path} has record format version {version}, expected {RECORD_VERSION}")
+
+
+def _indexed_end(path):
+    """
+    Zwraca koniec ostatniej gry wskazanej przez indeks - dla aktualnego indeksu równy rozmiarowi
+    pliku danych. Sprawdzany jest tylko ostatni wpis, więc koszt nie zależy od liczby gier.
+
+    Returns:
+        int: Przesunięcie końca ostatniej gry lub None, jeśli indeksu nie ma albo jest uszkodzony.
+    """
+    index = index_path(path)
+    if not os.path.exists(index):
+        return None
+    index_size = os.path.getsize(index)
+    if index_size % OFFSET.size:
+        return None
+    if not index_size:
+        return HEADER.size
+    with open(index, 'rb') as file:
+        file.seek(index_size - OFFSET.size)
+        (offset,) = OFFSET.unpack(file.read(OFFSET.size))
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        prefix = file.read(LENGTH.size)
+    if len(prefix) < LENGTH.size:
+        return None
+    return offset + LENGTH.size + LENGTH.unpack(prefix)[0]
+
+
+def rebuild_index(path):
+    """
+    Odbudowuje indeks, przechodząc po prefiksach długości w pliku danych.
+
+    Niedokończona ostatnia gra (plik urwany w trakcie zapisu) nie trafia do indeksu.
+
+    Args:
+        path (str): Ścieżka pliku danych.
+
+    Returns:
+        int: Liczba gier w pliku.
+    """
+    _check_header(path)
+    count = 0
+    size = os.path.getsize(path)
+    with open(path, 'rb') as data, open(index_path(path), 'wb') as index:
+        offset = HEADER.size
+        data.seek(offset)
+        while True:
+            prefix = data.read(LENGTH.size)
+            if len(prefix) < LENGTH.size:
+                break
+            (length,) = LENGTH.unpack(prefix)
+            if offset + LENGTH.size + length > size:
+                break
+            index.write(OFFSET.pack(offset))
+            offset += LENGTH.size + length
+            data.seek(offset)
+            count += 1
+    return count
+
+
+class RecordReader:
+    """
+    Odczytuje gry z pliku danych, korzystając z indeksu do wyszukiwania gry o danym numerze.
+
+    Attributes:
+        path (str): Ścieżka pliku danych.
+    """
+
+    def __init__(self, path):
+        """
+        Otwiera plik danych; brakujący lub nieaktualny indeks jest odbudowywany.
+
+        Args:
+            path (str): Ścieżka pliku danych.
+
+        Raises:
+            ValueError: Jeśli plik nie jest plikiem z grami lub ma inną wersję formatu.
+        """
+        _check_header(path)
+        if _indexed_end(path) != os.path.getsize(path):
+            rebuild_index(path)
+        self.path = path
+        self._data = open(path, 'rb')
+        self._index = open(index_path(path), 'rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return os.fstat(self._index.fileno()).st_size // OFFSET.size
+
+    def offset(self, number):
+        """
+        Zwraca przesunięcie gry w pliku danych.
+
+        Args:
+            number (int): Numer gry (od 0).
+
+        Returns:
+            int: Przesunięcie prefiksu długości gry.
+
+        Raises:
+            IndexError: Jeśli gra o tym numerze nie istnieje.
+        """
+        if not 0 <= number < len(self):
+            raise IndexError(f"game {number} out of range")
+        self._index.seek(number * OFFSET.size)
+        return OFFSET.unpack(self._index.read(OFFSET.size))[0]
+
+    def __getitem__(self, number):
+        """
+        Odczytuje grę o podanym numerze.
+
+        Returns:
+            GameRecord: Zapis gry.
+        """
+        self._data.seek(self.offset(number))
+        (length,) = LENGTH.unpack(self._data.read(LENGTH.size))
+        return GameRecord.from_bytes(self._data.read(length))
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def iter_from(self, number):
+        """
+        Strumieniowo odczytuje gry od podanego numeru do końca pliku (bez wczytywania całego pliku).
+
+        Args:
+            number (int): Numer pierwszej gry.
+
+        Yields:
+            GameRecord: Kolejne zapisy gier.
+        """
+        offset = self.offset(number) if number else HEADER.size
+        with open(self.path, 'rb') as data:
+            data.seek(offset)
+            while True:
+                prefix = data.read(LENGTH.size)
+                if len(prefix) < LENGTH.size:
+                    return
+                (length,) = LENGTH.unpack(prefix)
+                game = data.read(length)
+                if len(game) < length:  # Niedokończona ostatnia gra
+                    return
+                yield GameRecord.from_bytes(game)
+
+    def close(self):
+        """
+        Zamyka pliki.
+        """
+        self._data.close()
+        self._index.close()
+
+
+def main():
+    """
+    Wypisuje informacje o pliku z grami lub przebieg wybranej gry.
+    """
+    import argparse  # Tylko dla linii poleceń - game importuje ten moduł
+
+    parser = argparse.ArgumentParser(description="Inspect recorded games.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    info = commands.add_parser('info', help="count games and moves")
+    info.add_argument('path', help="game record file")
+    show = commands.add_parser('show', help="print one game")
+    show.add_argument('path', help="game record file")
+    show.add_argument('number', type=int, help="game number (from 0)")
+    index = commands.add_parser('reindex', help="rebuild the offset index")
+    index.add_argument('path', help="game record file")
+    args = parser.parse_args()
+
+    if args.command == 'reindex':
+        print(f"indexed {rebuild_index(args.path)} games")
+        return
+
+    with RecordReader(args.path) as reader:
+        if args.command == 'info':
+            games = moves = 0
+            for record in reader:
+                games += 1
+                moves += sum(len(game_round.moves) for game_round in record.rounds)
+            print(f"{args.path}: format v{RECORD_VERSION}, {games} games, {moves} moves, "
+                  f"{os.path.getsize(args.path)} bytes")
+        else:
+            record = reader[args.number]
+            print(f"game {args.number}: mode {record.mode}, {record.size}x{record.size} board, "
+                  f"players {', '.join(record.symbols)}")
+            for number, game_round in enumerate(record.rounds, start=1):
+                if game_round.winner is None:
+                    result = "draw" if len(game_round.moves) == record.size * record.size else "unfinished"
+                else:
+                    result = f"{record.symbols[game_round.winner]} wins with {game_round.shape} (+{game_round.points})"
+                moves = ' '.join(str(cell) for cell in game_round.moves)
+                print(f"round {number}: {record.symbols[game_round.starting_player]} starts, {result}; moves: {moves}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""
+Moduł rozgrywek bez interfejsu: dwie strategie AI grają przeciwko sobie wiele meczów.
+
+Mecze korzystają z zasad ``Game`` (3 rundy, punkty za kształty) bez wypisywania komunikatów
+i są rozdzielane między procesy. Wynikiem są odsetki wygranych i remisów, średnie punkty
+za każdy rodzaj kształtu oraz liczba rozegranych meczów na sekundę.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from ai import create_strategy
+from game import Game, MOVE_CONTINUE, MOVE_WIN, ROUNDS
+from instrumentation import Instrumentation, format_summary, write_json_line
+from player import Player
+from records import RecordWriter
+from shapes import registered_shapes
+
+# Liczba meczów rozgrywanych przez proces roboczy w jednym zadaniu.
+DEFAULT_CHUNK_SIZE = 50
+
+
+def parse_strategy(spec):
+    """
+    Odczytuje opis strategii w postaci ``nazwa`` lub ``nazwa:opcja=wartość,opcja=wartość``.
+
+    Wartości liczbowe są zamieniane na liczby, a ``none`` na None.
+
+    Args:
+        spec (str): Opis strategii, np. ``alphabeta:max_depth=2,time_budget_ms=none``.
+
+    Returns:
+        tuple: Para (nazwa strategii, słownik opcji).
+    """
+    name, _, option_text = spec.partition(':')
+    options = {}
+    for item in filter(None, option_text.split(',')):
+        key, _, value = item.partition('=')
+        if value.lower() == 'none':
+            options[key] = None
+        else:
+            try:
+                options[key] = int(value)
+            except ValueError:
+                try:
+                    options[key] = float(value)
+                except ValueError:
+                    options[key] = value
+    return name, options
+
+
+def play_match(strategies, rng):
+    """
+    Rozgrywa jeden mecz (3 rundy) między dwiema strategiami.
+
+    Strategia pierwsza gra symbolem 'X', druga symbolem 'O'; zaczynający gracz jest losowany.
+
+    Args:
+        strategies (list): Dwa obiekty strategii z metodą ``select_move``.
+        rng (random.Random): Generator używany do losowania zaczynającego gracza.
+
+    Returns:
+        tuple: Krotka (punkty obu graczy, lista kształtów ułożonych w rundach jako pary (gracz, kształt),
+        zapis gry ``GameRecord``).
+    """
+    game = Game()
+    game.players.append(Player('X', is_ai=True))
+    game.players.append(Player('O', is_ai=True))
+    game.current_player = rng.choice(game.players)
+    shapes = []
+    while not game.is_finished():
+        player = game.current_player
+        index = game.players.index(player)
+        opponent = game.players[1 - index]
+        row, col = strategies[index].select_move(game.board, player.symbol, opponent.symbol)
+        outcome = game.apply_move(row, col)
+        if outcome != MOVE_CONTINUE:
+            if outcome == MOVE_WIN:
+                shapes.append((index, game.board.last_shapes[0]))
+            game.start_next_round()
+    return [player.points for player in game.players], shapes, game.record
+
+
+def play_matches(strategy_specs, first_match, count, seed, record=False, stats=False):
+    """
+    Rozgrywa serię meczów i zwraca zsumowane wyniki (zadanie dla procesu roboczego).
+
+    Args:
+        strategy_specs (list): Dwie pary (nazwa strategii, opcje).
+        first_match (int): Numer pierwszego meczu w serii.
+        count (int): Liczba meczów.
+        seed (int): Ziarno bazowe; mecz n używa ziarna ``seed + n``, więc wyniki nie zależą od podziału na procesy.
+        record (bool): Czy dołączyć do wyników zakodowane zapisy gier (lista ``records``).
+        stats (bool): Czy włączyć instrumentację i dołączyć do wyników statystyki każdego meczu
+            (lista ``stats``, patrz ``Instrumentation.end_game``).
+
+    Returns:
+        dict: Zsumowane wyniki serii (patrz ``merge_results``).
+    """
+    strategies = []
+    for name, options in strategy_specs:
+        if name == 'random' and 'seed' not in options:
+            options = dict(options, seed=seed + first_match)
+        strategies.append(create_strategy(name, **options))
+
+    results = empty_results()
+    if record:
+        results['records'] = []
+    instrumentation = None
+    if stats:
+        results['stats'] = []
+        instrumentation = Instrumentation()
+        instrumentation.enable()
+    try:
+        for match in range(first_match, first_match + count):
+            points, shapes, game_record = play_match(strategies, random.Random(seed + match))
+            if record:
+                results['records'].append(game_record.to_bytes())
+            if stats:
+                results['stats'].append(instrumentation.end_game(match=match, points=points))
+            results['matches'] += 1
+            if points[0] > points[1]:
+                results['wins'][0] += 1
+            elif points[1] > points[0]:
+                results['wins'][1] += 1
+            else:
+                results['draws'] += 1
+            for index in range(2):
+                results['points'][index] += points[index]
+            for index, shape in shapes:
+                results['shapes'][index][shape] += 1
+            results['rounds'] += ROUNDS
+    finally:
+        if instrumentation is not None:
+            instrumentation.disable()
+        for strategy in strategies:
+            strategy.close()
+    return results
+
+
+def empty_results():
+    """
+    Tworzy pusty zbiór wyników.
+
+    Returns:
+        dict: Wyniki z zerowymi licznikami.
+    """
+    return {
+        'matches': 0,
+        'rounds': 0,
+        'wins': [0, 0],
+        'draws': 0,
+        'points': [0, 0],
+        'shapes': [Counter(), Counter()],
+    }
+
+
+def merge_results(total, part):
+    """
+    Dodaje wyniki serii meczów do wyników łącznych.
+
+    Args:
+        total (dict): Wyniki łączne (modyfikowane w miejscu).
+        part (dict): Wyniki serii.
+    """
+    total['matches'] += part['matches']
+    total['rounds'] += part['rounds']
+    total['draws'] += part['draws']
+    for index in range(2):
+        total['wins'][index] += part['wins'][index]
+        total['points'][index] += part['points'][index]
+        total['shapes'][index].update(part['shapes'][index])
+
+
+def run_tournament(strategy_a, strategy_b, matches, workers=None, seed=0, chunk_size=DEFAULT_CHUNK_SIZE,
+                   record_path=None, stats_path=None):
+    """
+    Rozgrywa ``matches`` meczów między dwiema strategiami, rozdzielając je między procesy.
+
+    Args:
+        strategy_a (str): Opis pierwszej strategii (patrz ``parse_strategy``), gra symbolem 'X'.
+        strategy_b (str): Opis drugiej strategii, gra symbolem 'O'.
+        matches (int): Liczba meczów.
+        workers (int): Liczba procesów (None - liczba rdzeni, 1 - w bieżącym procesie).
+        seed (int): Ziarno bazowe.
+        chunk_size (int): Liczba meczów w jednym zadaniu procesu roboczego.
+        record_path (str): Plik, do którego dopisywane są zapisy gier w kolejności meczów (None - bez zapisu).
+        stats_path (str): Plik, do którego dopisywane są statystyki instrumentacji każdego meczu jako
+            wiersze JSON (None - instrumentacja wyłączona). Po każdej serii meczów na stderr trafia
+            bieżące podsumowanie.
+
+    Returns:
+        dict: Podsumowanie rozgrywek (patrz ``summarize``); z instrumentacją także statystyki
+        łączne (``stats``, patrz ``Instrumentation.snapshot``).
+    """
+    specs = [parse_strategy(strategy_a), parse_strategy(strategy_b)]
+    workers = workers or os.cpu_count() or 1
+    chunks = [(start, min(chunk_size, matches - start)) for start in range(0, matches, chunk_size)]
+    total = empty_results()
+    writer = RecordWriter(record_path) if record_path else None
+    record = writer is not None
+    stats = stats_path is not None
+    stats_total = Instrumentation() if stats else None
+
+    def collect(part):
+        if writer is not None:
+            for data in part.pop('records'):
+                writer.append(data)
+        if stats:
+            for game_stats in part.pop('stats'):
+                write_json_line(stats_path, game_stats)
+                stats_total.add(game_stats)
+            print(f"{total['matches'] + part['matches']} matches: {stats_total.summary_line()}", file=sys.stderr)
+        merge_results(total, part)
+
+    start_time = time.perf_counter()
+    try:
+        if workers == 1:
+            for first_match, count in chunks:
+                collect(play_matches(specs, first_match, count, seed, record, stats))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(play_matches, specs, first_match, count, seed, record, stats)
+                           for first_match, count in chunks]
+                for future in futures:
+                    collect(future.result())
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start_time
+
+    summary = summarize(total, elapsed, [strategy_a, strategy_b])
+    if stats:
+        summary['stats'] = stats_total.snapshot()
+    return summary
+
+
+def summarize(results, elapsed, names):
+    """
+    Przelicza zsumowane wyniki na odsetki i średnie.
+
+    Args:
+        results (dict): Zsumowane wyniki meczów.
+        elapsed (float): Czas rozgrywek w sekundach.
+        names (list): Opisy obu strategii.
+
+    Returns:
+        dict: Podsumowanie z odsetkami wygranych i remisów, średnimi punktami za kształty
+        (na mecz) i liczbą meczów na sekundę.
+    """
+    matches = results['matches'] or 1
+    players = []
+    for index in range(2):
+        shapes = results['shapes'][index]
+        players.append({
+            'strategy': names[index],
+            'win_rate': results['wins'][index] / matches,
+            'average_points': results['points'][index] / matches,
+            'average_points_per_shape': {
+                shape.name: shapes[shape.name] * shape.points / matches for shape in registered_shapes()
+            },
+        })
+    return {
+        'matches': results['matches'],
+        'rounds': results['rounds'],
+        'draw_rate': results['draws'] / matches,
+        'players': players,
+        'seconds': elapsed,
+        'games_per_second': results['matches'] / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    """
+    Uruchamia rozgrywki z linii poleceń i wypisuje podsumowanie.
+    """
+    parser = argparse.ArgumentParser(description="Headless AI vs AI matches.")
+    parser.add_argument('strategy_a', help="strategy playing X, e.g. random or alphabeta:max_depth=2,time_budget_ms=none")
+    parser.add_argument('strategy_b', help="strategy playing O")
+    parser.add_argument('-n', '--matches', type=int, default=1000, help="number of three-round matches")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0, help="base random seed")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="matches per worker task")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    parser.add_argument('--record', metavar='PATH', help="append every match to this game record file")
+    parser.add_argument('--stats', metavar='PATH', help="instrument the AI and append per-match JSON lines here")
+    args = parser.parse_args()
+
+    summary = run_tournament(args.strategy_a, args.strategy_b, args.matches, args.workers, args.seed,
+                             args.chunk_size, args.record, args.stats)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{summary['matches']} matches in {summary['seconds']:.2f} s "
+          f"({summary['games_per_second']:.1f} games/s), draw rate {summary['draw_rate']:.1%}")
+    for symbol, player in zip('XO', summary['players']):
+        per_shape = ", ".join(f"{shape} {points:.2f}" for shape, points in player['average_points_per_shape'].items())
+        print(f"{symbol} {player['strategy']}: win rate {player['win_rate']:.1%}, "
+              f"avg points {player['average_points']:.2f} ({per_shape})")
+    if 'stats' in summary:
+        print(format_summary(summary['stats']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,670 @@
+"""
+Moduł serwera gier: wiele równoległych meczów w jednym procesie (asyncio).
+
+Klient łączy się przez TCP lub gniazdo uniksowe i wysyła żądania JSON, po jednym w wierszu;
+każda odpowiedź jest jednym wierszem JSON z polem ``ok`` i polem ``id`` skopiowanym z żądania,
+więc klient może wysyłać kolejne żądania bez czekania na odpowiedzi (także dla wielu meczów
+naraz). Żądania (pole ``op``):
+
+- ``new`` - nowy mecz; ``ai`` to opis strategii przeciwnika (jak w selfplay.py, np. ``mcts`` lub
+  ``alphabeta:max_depth=2``; null - obaj gracze grają przez klienta), ``symbol`` - symbol klienta.
+  Dozwolone są tylko strategie i opcje z ``CLIENT_STRATEGIES``, z ograniczonymi wartościami;
+- ``move`` - ruch w meczu ``match`` na pole ``row``, ``col``; po nim serwer wykonuje ruchy AI;
+- ``state`` - stan meczu ``match``;
+- ``close`` - usunięcie meczu ``match``.
+
+Każdy mecz to osobny obiekt ``Game`` sterowany metodami ``apply_move`` i ``start_next_round``
+(bez ``end_game``, które kończy proces). Ruchy AI są liczone w procesach roboczych
+(``ProcessPoolExecutor``), które trzymają po jednym silniku na strategię, wspólnym dla wszystkich
+meczów - pamięć meczu to tylko plansza i zapis gry. Mecze należą do połączenia i są usuwane po
+jego zamknięciu; liczba meczów i żądań w toku jest ograniczona.
+
+Przykłady:
+    python server.py serve --port 8765
+    python server.py play --port 8765 --matches 1000 --ai random
+    python server.py play --local --matches 200 --ai alphabeta:max_depth=1
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from ai import _is_number, create_strategy
+from board import GameBoard
+from game import Game, MOVE_CONTINUE, ROUNDS
+from player import Player
+from records import MODE_PLAYER_VS_AI, MODE_PLAYER_VS_MCTS, MODE_PLAYER_VS_PLAYER, RecordWriter
+from selfplay import parse_strategy
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_MATCHES = 10000  # Najwięcej meczów jednocześnie na serwer
+MAX_PENDING_REQUESTS = 256  # Najwięcej żądań w toku na połączenie (dalsze czekają w gnieździe)
+MAX_LINE = 4096  # Najdłuższe żądanie w bajtach
+
+# Ograniczenia opcji strategii podawanych przez klientów.
+MAX_SEARCH_DEPTH = 6
+MAX_TIME_BUDGET_MS = 5000
+MAX_TT_BYTES = 16 * 1024 * 1024
+MAX_ITERATIONS = 100000
+MAX_WORKER_ENGINES = 8  # Najwięcej silników (z tablicami transpozycji) w jednym procesie roboczym
+MAX_CHECKED_STRATEGIES = 1024  # Najwięcej zapamiętanych poprawnych opisów strategii
+
+# Strategie dostępne dla klientów: dla każdej opcji rodzaj wartości ('int', 'number' lub 'choice'),
+# dozwolony przedział (dla 'choice' - dozwolone wartości) i czy wolno podać None. Strategia 'parallel'
+# (własna pula procesów) i opcja ``weights`` (ścieżka pliku na serwerze) nie są udostępniane.
+CLIENT_STRATEGIES = {
+    'random': {
+        'seed': ('int', (0, 2 ** 63), False),
+    },
+    'alphabeta': {
+        'max_depth': ('int', (1, MAX_SEARCH_DEPTH), False),
+        'time_budget_ms': ('number', (1, MAX_TIME_BUDGET_MS), False),
+        'tt_bytes': ('int', (0, MAX_TT_BYTES), True),
+        'evaluate': ('int', (0, 1), False),
+        'use_book': ('int', (0, 1), False),
+        'symmetry': ('int', (0, 1), False),
+    },
+    'mcts': {
+        'time_budget_ms': ('number', (1, MAX_TIME_BUDGET_MS), False),
+        'iterations': ('int', (1, MAX_ITERATIONS), True),
+        'exploration': ('number', (0, 100), False),
+        'rollout': ('choice', ('random', 'biased'), False),
+        'seed': ('int', (0, 2 ** 63), False),
+    },
+}
+
+
+class ProtocolError(Exception):
+    """
+    Błędne żądanie klienta (zwracane jako odpowiedź z ``ok: false``).
+    """
+
+
+def _select_move(spec, snapshot, symbol, opponent_symbol):
+    """
+    Wybiera ruch AI (zadanie dla procesu roboczego).
+
+    Args:
+        spec (str): Opis strategii (patrz ``selfplay.parse_strategy``).
+        snapshot (BoardSnapshot): Pozycja (``GameBoard.snapshot``).
+        symbol (str): Symbol gracza na ruchu.
+        opponent_symbol (str): Symbol przeciwnika.
+
+    Returns:
+        tuple: Współrzędne (wiersz, kolumna) ruchu.
+    """
+    return _worker_engine(spec).select_move(GameBoard.from_snapshot(snapshot), symbol, opponent_symbol)
+
+
+@lru_cache(maxsize=MAX_WORKER_ENGINES)
+def _worker_engine(spec):
+    """
+    Zwraca silnik AI procesu roboczego dla opisu strategii (wspólny dla meczów, tworzony raz na proces).
+    """
+    name, options = parse_strategy(spec)
+    return create_strategy(name, **options)
+
+
+@lru_cache(maxsize=MAX_CHECKED_STRATEGIES)
+def check_client_strategy(spec):
+    """
+    Sprawdza opis strategii podany przez klienta z ``CLIENT_STRATEGIES``, nie tworząc silnika.
+
+    Args:
+        spec (str): Opis strategii (patrz ``selfplay.parse_strategy``).
+
+    Raises:
+        ProtocolError: Jeśli strategia lub opcja nie jest dostępna albo wartość opcji jest zła.
+    """
+    name, options = parse_strategy(spec)
+    allowed = CLIENT_STRATEGIES.get(name)
+    if allowed is None:
+        raise ProtocolError(f"Invalid AI strategy {spec!r}: unknown strategy {name!r}")
+    for option, value in options.items():
+        if option not in allowed:
+            raise ProtocolError(f"Invalid AI strategy {spec!r}: option {option!r} is not available")
+        kind, limits, nullable = allowed[option]
+        if value is None:
+            valid = nullable
+        elif kind == 'choice':
+            valid = value in limits
+        else:
+            valid = _is_number(value, integer=kind == 'int') and limits[0] <= value <= limits[1]
+        if not valid:
+            raise ProtocolError(f"Invalid AI strategy {spec!r}: bad value {value!r} for {option!r}")
+
+
+class Match:
+    """
+    Jeden mecz prowadzony przez serwer.
+
+    Attributes:
+        number (int): Numer meczu (unikalny w obrębie serwera).
+        game (Game): Stan gry.
+        ai (str): Opis strategii gracza AI (None - obaj gracze grają przez klienta).
+        lock (asyncio.Lock): Szereguje żądania dotyczące meczu.
+    """
+
+    def __init__(self, number, ai, symbol):
+        """
+        Tworzy mecz; zaczyna gracz 'X'.
+
+        Args:
+            number (int): Numer meczu.
+            ai (str): Opis strategii gracza AI lub None.
+            symbol (str): Symbol klienta ('X' lub 'O'), gdy przeciwnikiem jest AI.
+        """
+        self.number = number
+        self.ai = ai
+        self.lock = asyncio.Lock()
+        game = self.game = Game()
+        for player_symbol in 'XO':
+            game.players.append(Player(player_symbol, is_ai=ai is not None and player_symbol != symbol))
+        game.current_player = game.players[0]
+        if ai is None:
+            game.mode = MODE_PLAYER_VS_PLAYER
+        else:
+            game.mode = MODE_PLAYER_VS_MCTS if parse_strategy(ai)[0] == 'mcts' else MODE_PLAYER_VS_AI
+        game.record.mode = game.mode
+
+    def play(self, row, col):
+        """
+        Wykonuje ruch aktualnego gracza i rozpoczyna kolejną rundę, jeśli ruch zakończył rundę.
+
+        Args:
+            row (int): Wiersz planszy.
+            col (int): Kolumna planszy.
+
+        Returns:
+            dict: Opis ruchu (symbol, pole i wynik ruchu z ``Game.apply_move``).
+        """
+        game = self.game
+        symbol = game.current_player.symbol
+        outcome = game.apply_move(row, col)
+        move = {'symbol': symbol, 'row': row, 'col': col, 'outcome': outcome}
+        if outcome != MOVE_CONTINUE:
+            move['points'] = game.board.last_move_points()
+            game.start_next_round()
+        return move
+
+    def state(self):
+        """
+        Zwraca stan meczu w postaci wysyłanej klientowi.
+
+        Returns:
+            dict: Numer meczu, runda, plansza (``size * size`` znaków, wierszami), gracz na ruchu,
+            punkty graczy i czy mecz się zakończył.
+        """
+        game = self.game
+        finished = game.is_finished()
+        return {
+            'match': self.number,
+            'round': min(game.round_number, ROUNDS),
+            'board': game.board.to_bytes().decode('ascii'),
+            'turn': None if finished else game.current_player.symbol,
+            'points': {player.symbol: player.points for player in game.players},
+            'finished': finished,
+        }
+
+
+class GameServer:
+    """
+    Serwer wielu meczów.
+
+    Attributes:
+        matches (dict): Trwające mecze według numeru.
+        max_matches (int): Największa liczba meczów jednocześnie.
+        writer (RecordWriter): Plik, do którego dopisywane są zakończone mecze (None - bez zapisu).
+    """
+
+    def __init__(self, workers=None, max_matches=DEFAULT_MAX_MATCHES, record_path=None):
+        """
+        Przygotowuje pulę procesów liczących ruchy AI.
+
+        Args:
+            workers (int): Liczba procesów roboczych (domyślnie liczba procesorów).
+            max_matches (int): Największa liczba meczów jednocześnie.
+            record_path (str): Plik z grami (patrz records.py) lub None.
+        """
+        self.matches = {}
+        self.max_matches = max_matches
+        self.writer = RecordWriter(record_path) if record_path else None
+        # Procesy uruchomione przez fork dziedziczyłyby gniazda klientów i zamknięcie połączenia
+        # przez klienta nie docierałoby do serwera - forkserver (lub spawn tam, gdzie go nie ma,
+        # np. w Windows) startuje je z czystego procesu.
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                             mp_context=multiprocessing.get_context(method))
+        self._numbers = itertools.count(1)
+        self._connections = set()
+
+    def close(self):
+        """
+        Zamyka pulę procesów i plik z grami.
+        """
+        self._executor.shutdown(cancel_futures=True)
+        if self.writer is not None:
+            self.writer.close()
+
+    async def wait_disconnected(self):
+        """
+        Czeka, aż wszystkie połączenia zostaną zamknięte (np. przed zatrzymaniem serwera lokalnego).
+        """
+        while self._connections:
+            await asyncio.wait(self._connections)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """
+        Zaczyna przyjmować połączenia.
+
+        Args:
+            host (str): Adres TCP.
+            port (int): Port TCP (0 - dowolny wolny).
+            unix_path (str): Ścieżka gniazda uniksowego (zamiast TCP).
+
+        Returns:
+            asyncio.Server: Uruchomiony serwer.
+        """
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, unix_path, limit=MAX_LINE)
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Obsługuje jedno połączenie: każde żądanie jest wykonywane w osobnym zadaniu.
+
+        Args:
+            reader (asyncio.StreamReader): Strumień żądań.
+            writer (asyncio.StreamWriter): Strumień odpowiedzi.
+        """
+        self._connections.add(asyncio.current_task())
+        owned = set()
+        pending = asyncio.Semaphore(MAX_PENDING_REQUESTS)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            try:
+                response = await self.handle_request(line, owned)
+            finally:
+                pending.release()
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        try:
+            while True:
+                await pending.acquire()
+                try:
+                    line = await reader.readline()
+                except ValueError:  # Wiersz dłuższy niż MAX_LINE
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            # Mecze rozłączonego klienta są usuwane od razu; trwające ruchy AI kończą się bez dalszych ruchów
+            for number in owned:
+                self.matches.pop(number, None)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            self._connections.discard(asyncio.current_task())
+
+    async def handle_request(self, line, owned):
+        """
+        Wykonuje jedno żądanie.
+
+        Args:
+            line (bytes): Wiersz z żądaniem JSON.
+            owned (set): Numery meczów utworzonych przez to połączenie.
+
+        Returns:
+            dict: Odpowiedź dla klienta.
+        """
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("Request must be a JSON object")
+            op = request.get('op')
+            if op == 'new':
+                response = await self.new_match(request, owned)
+            elif op in ('move', 'state', 'close'):
+                match = self._owned_match(request, owned)
+                async with match.lock:
+                    if op == 'move':
+                        response = await self.move(match, request)
+                    elif op == 'state':
+                        response = match.state()
+                    else:
+                        owned.discard(match.number)
+                        del self.matches[match.number]
+                        response = match.state()
+            else:
+                raise ProtocolError(f"Unknown op: {op!r}")
+            response['ok'] = True
+        except (ProtocolError, ValueError) as error:
+            response = {'ok': False, 'error': str(error)}
+        except Exception as error:  # Np. błąd silnika AI w procesie roboczym - klient musi dostać odpowiedź
+            response = {'ok': False, 'error': f"{type(error).__name__}: {error}"}
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    async def new_match(self, request, owned):
+        """
+        Tworzy mecz i, jeśli zaczyna AI, wykonuje jego ruch.
+
+        Returns:
+            dict: Stan meczu z listą wykonanych ruchów (``moves``).
+        """
+        ai = request.get('ai')
+        symbol = request.get('symbol', 'X')
+        if ai is not None:
+            ai = str(ai)
+            self._check_strategy(ai)
+        if symbol not in ('X', 'O'):
+            raise ProtocolError(f"Symbol must be 'X' or 'O', not {symbol!r}")
+        if len(self.matches) >= self.max_matches:
+            raise ProtocolError("Too many matches")
+        match = Match(next(self._numbers), ai, symbol)
+        self.matches[match.number] = match
+        owned.add(match.number)
+        try:
+            async with match.lock:
+                moves = await self.play_ai_moves(match)
+                return dict(match.state(), moves=moves)
+        except BaseException:
+            # Mecz, w którym AI nie wykonało pierwszego ruchu, nie może być kontynuowany
+            self.matches.pop(match.number, None)
+            owned.discard(match.number)
+            raise
+
+    def _check_strategy(self, ai):
+        """
+        Sprawdza opis strategii, zanim trafi do procesu roboczego (patrz ``check_client_strategy``).
+
+        Args:
+            ai (str): Opis strategii (patrz ``selfplay.parse_strategy``).
+
+        Raises:
+            ProtocolError: Jeśli strategia nie jest dostępna dla klientów lub opcje są błędne.
+        """
+        check_client_strategy(ai)
+
+    async def move(self, match, request):
+        """
+        Wykonuje ruch klienta, a po nim ruchy AI.
+
+        Returns:
+            dict: Stan meczu z listą wykonanych ruchów (``moves``).
+
+        Raises:
+            ProtocolError: Jeśli ruch jest niedozwolony.
+        """
+        game = match.game
+        if game.is_finished():
+            raise ProtocolError("Match is finished")
+        if game.current_player.is_ai:
+            raise ProtocolError("It is not your turn")
+        row, col = request.get('row'), request.get('col')
+        size = game.board.size
+        valid = all(isinstance(value, int) and not isinstance(value, bool) for value in (row, col))
+        if not (valid and 0 <= row < size and 0 <= col < size):
+            raise ProtocolError(f"Move must be a row and column in 0..{size - 1}")
+        if not game.board.is_spot_available(row, col):
+            raise ProtocolError("That spot is already taken")
+        moves = [match.play(row, col)]
+        moves.extend(await self.play_ai_moves(match))
+        return dict(match.state(), moves=moves)
+
+    async def play_ai_moves(self, match):
+        """
+        Wykonuje ruchy AI, dopóki AI jest na ruchu; zapisuje mecz, jeśli się zakończył.
+
+        Returns:
+            list: Opisy wykonanych ruchów.
+        """
+        game = match.game
+        loop = asyncio.get_running_loop()
+        moves = []
+        while not game.is_finished() and game.current_player.is_ai:
+            player = game.current_player
+            opponent = game.players[0] if player == game.players[1] else game.players[1]
+            try:
+                row, col = await loop.run_in_executor(self._executor, _select_move, match.ai, game.board.snapshot(),
+                                                      player.symbol, opponent.symbol)
+            except Exception as error:
+                # AI nie może wykonać ruchu, więc mecz nie może być kontynuowany
+                self.matches.pop(match.number, None)
+                raise ProtocolError(f"AI failed, match {match.number} closed: {type(error).__name__}: {error}") \
+                    from None
+            if match.number not in self.matches:  # Mecz usunięty w trakcie namysłu
+                break
+            moves.append(match.play(row, col))
+        if game.is_finished() and self.writer is not None:
+            self.writer.append(game.record)
+        return moves
+
+    def _owned_match(self, request, owned):
+        """
+        Zwraca mecz z żądania, jeśli należy do połączenia.
+
+        Raises:
+            ProtocolError: Jeśli mecz nie istnieje lub należy do innego połączenia.
+        """
+        number = request.get('match')
+        if number not in owned or number not in self.matches:
+            raise ProtocolError(f"Unknown match: {number!r}")
+        return self.matches[number]
+
+
+class GameClient:
+    """
+    Klient serwera gier; żądania mogą być wysyłane równolegle z wielu zadań.
+    """
+
+    def __init__(self, reader, writer):
+        """
+        Args:
+            reader (asyncio.StreamReader): Strumień odpowiedzi.
+            writer (asyncio.StreamWriter): Strumień żądań.
+        """
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._waiting = {}
+        self._listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """
+        Łączy się z serwerem.
+
+        Args:
+            host (str): Adres TCP.
+            port (int): Port TCP.
+            unix_path (str): Ścieżka gniazda uniksowego (zamiast TCP).
+
+        Returns:
+            GameClient: Połączony klient.
+        """
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op, **fields):
+        """
+        Wysyła żądanie i czeka na odpowiedź.
+
+        Args:
+            op (str): Rodzaj żądania.
+            **fields: Pozostałe pola żądania.
+
+        Returns:
+            dict: Odpowiedź serwera.
+
+        Raises:
+            ProtocolError: Jeśli serwer odrzucił żądanie.
+        """
+        number = next(self._ids)
+        future = self._waiting[number] = asyncio.get_running_loop().create_future()
+        self._writer.write(json.dumps(dict(fields, op=op, id=number)).encode() + b'\n')
+        await self._writer.drain()
+        response = await future
+        if not response['ok']:
+            raise ProtocolError(response['error'])
+        return response
+
+    async def _listen(self):
+        """
+        Przekazuje odpowiedzi serwera do czekających żądań.
+        """
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                future = self._waiting.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection closed by the server"))
+
+    async def close(self):
+        """
+        Zamyka połączenie.
+        """
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._listener.cancel()
+
+
+async def play_scripted_match(client, rng, ai):
+    """
+    Rozgrywa mecz losowymi ruchami klienta (np. do testów obciążeniowych serwera).
+
+    Args:
+        client (GameClient): Połączony klient.
+        rng (random.Random): Generator ruchów.
+        ai (str): Opis strategii przeciwnika (None - klient gra oboma symbolami).
+
+    Returns:
+        dict: Końcowy stan meczu.
+    """
+    state = await client.request('new', ai=ai, symbol=rng.choice('XO'))
+    while not state['finished']:
+        free = [cell for cell, content in enumerate(state['board']) if content == ' ']
+        size = int(len(state['board']) ** 0.5)
+        row, col = divmod(rng.choice(free), size)
+        state = await client.request('move', match=state['match'], row=row, col=col)
+    await client.request('close', match=state['match'])
+    return state
+
+
+async def run_scripted_client(matches, ai, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, seed=0,
+                              local=False, workers=None):
+    """
+    Rozgrywa równolegle wiele meczów przez jedno połączenie i mierzy przepustowość.
+
+    Args:
+        matches (int): Liczba meczów.
+        ai (str): Opis strategii przeciwnika.
+        host (str): Adres TCP serwera.
+        port (int): Port TCP serwera.
+        unix_path (str): Ścieżka gniazda uniksowego serwera.
+        seed (int): Ziarno bazowe; mecz n używa ziarna ``seed + n``.
+        local (bool): Czy uruchomić serwer w tym samym procesie (na wolnym porcie).
+        workers (int): Liczba procesów roboczych serwera lokalnego.
+
+    Returns:
+        dict: Liczba meczów, wygrane klienta, AI i remisy, czas i liczba meczów na sekundę.
+    """
+    server = listener = None
+    if local:
+        server = GameServer(workers)
+        listener = await server.start(host, 0, unix_path)
+        if unix_path is None:
+            port = listener.sockets[0].getsockname()[1]
+    client = await GameClient.connect(host, port, unix_path)
+    start = time.perf_counter()
+    try:
+        states = await asyncio.gather(*(play_scripted_match(client, random.Random(seed + number), ai)
+                                        for number in range(matches)))
+    finally:
+        await client.close()
+        if server is not None:
+            await server.wait_disconnected()
+            listener.close()
+            await listener.wait_closed()
+            server.close()
+    elapsed = time.perf_counter() - start
+    return {
+        'matches': matches,
+        'decided': sum(len(set(state['points'].values())) > 1 for state in states),
+        'seconds': elapsed,
+        'matches_per_second': matches / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    """
+    Uruchamia serwer lub klienta testowego z linii poleceń.
+    """
+    parser = argparse.ArgumentParser(description="Asyncio server hosting many concurrent matches.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="run the game server")
+    play = commands.add_parser('play', help="play random-move matches against a server and report throughput")
+    for command in (serve, play):
+        command.add_argument('--host', default=DEFAULT_HOST, help="TCP address")
+        command.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port")
+        command.add_argument('--unix', metavar='PATH', help="Unix socket path (instead of TCP)")
+        command.add_argument('-w', '--workers', type=int, default=None, help="AI worker processes (default: CPU count)")
+    serve.add_argument('--max-matches', type=int, default=DEFAULT_MAX_MATCHES, help="concurrent match limit")
+    serve.add_argument('--record', metavar='PATH', help="append finished matches to this game record file")
+    play.add_argument('-n', '--matches', type=int, default=100, help="number of concurrent matches")
+    play.add_argument('--ai', default='random', help="opponent strategy, e.g. random or alphabeta:max_depth=1")
+    play.add_argument('--seed', type=int, default=0, help="base random seed")
+    play.add_argument('--local', action='store_true', help="start the server in this process")
+    args = parser.parse_args()
+
+    if args.command == 'play':
+        summary = asyncio.run(run_scripted_client(args.matches, args.ai, args.host, args.port, args.unix, args.seed,
+                                                  args.local, args.workers))
+        print(f"{summary['matches']} matches in {summary['seconds']:.2f} s "
+              f"({summary['matches_per_second']:.1f} matches/s), {summary['decided']} decided")
+        return
+
+    async def serve_forever():
+        server = GameServer(args.workers, args.max_matches, args.record)
+        listener = await server.start(args.host, args.port, args.unix)
+        print(f"serving on {args.unix or f'{args.host}:{args.port}'}")
+        try:
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            server.close()
+
+    try:
+        asyncio.run(serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
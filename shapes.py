@@ -0,0 +1,252 @@
+"""
+Moduł rejestru kształtów.
+
+Kształty są opisane danymi: wzorzec przesunięć pól, liczba punktów, priorytet oraz dozwolone
+obroty i odbicia. Dla każdego rozmiaru planszy rejestr jest raz kompilowany do płaskiej tabeli
+masek bitowych wszystkich ułożeń (``compile_shapes``), współdzielonej przez wszystkie plansze
+tego rozmiaru. Nowe kształty należy rejestrować przed utworzeniem plansz.
+"""
+
+from functools import lru_cache
+
+# Przekształcenia przesunięcia (wiersz, kolumna): obroty zgodnie z ruchem wskazówek zegara
+# oraz odbicie lustrzane (w poziomie), po którym następuje obrót.
+ORIENTATIONS = {
+    'identity': lambda r, c: (r, c),
+    'rot90': lambda r, c: (c, -r),
+    'rot180': lambda r, c: (-r, -c),
+    'rot270': lambda r, c: (-c, r),
+    'mirror': lambda r, c: (r, -c),
+    'mirror_rot90': lambda r, c: (-c, -r),
+    'mirror_rot180': lambda r, c: (-r, c),
+    'mirror_rot270': lambda r, c: (c, r),
+}
+ROTATIONS = ('identity', 'rot90', 'rot180', 'rot270')
+ALL_ORIENTATIONS = tuple(ORIENTATIONS)
+
+
+def normalize(pattern):
+    """
+    Przesuwa wzorzec tak, by zaczynał się w wierszu i kolumnie 0, i porządkuje pola.
+
+    Args:
+        pattern (iterable): Przesunięcia (wiersz, kolumna).
+
+    Returns:
+        tuple: Posortowana krotka przesunięć o najmniejszym wierszu i kolumnie równych 0.
+    """
+    pattern = tuple(pattern)
+    top = min(r for r, _ in pattern)
+    left = min(c for _, c in pattern)
+    return tuple(sorted((r - top, c - left) for r, c in pattern))
+
+
+class Shape:
+    """
+    Opis kształtu punktowanego w grze.
+
+    Attributes:
+        name (str): Nazwa kształtu.
+        pattern (tuple): Przesunięcia (wiersz, kolumna) pól kształtu w podstawowym ułożeniu.
+        points (int): Punkty za ułożenie kształtu.
+        priority (int): Priorytet - przy kilku kształtach ułożonych jednym ruchem liczy się ten
+            o najmniejszej wartości.
+        orientations (tuple): Nazwy dozwolonych przekształceń z ``ORIENTATIONS``.
+    """
+
+    def __init__(self, name, pattern, points, priority, orientations=('identity',)):
+        """
+        Inicjalizuje opis kształtu.
+
+        Args:
+            name (str): Nazwa kształtu.
+            pattern (iterable): Przesunięcia (wiersz, kolumna) pól kształtu.
+            points (int): Punkty za ułożenie kształtu.
+            priority (int): Priorytet (mniejsza wartość - sprawdzany wcześniej).
+            orientations (tuple): Dozwolone przekształcenia, np. ``ROTATIONS`` lub ``ALL_ORIENTATIONS``.
+
+        Raises:
+            ValueError: Jeśli wzorzec jest pusty, punkty nie są dodatnie lub przekształcenie jest nieznane.
+        """
+        pattern = tuple(pattern)
+        if not pattern:
+            raise ValueError(f"Shape {name!r} has an empty pattern")
+        if points <= 0:
+            raise ValueError(f"Shape {name!r} must be worth a positive number of points")
+        unknown = [orientation for orientation in orientations if orientation not in ORIENTATIONS]
+        if unknown:
+            raise ValueError(f"Unknown orientations for shape {name!r}: {', '.join(unknown)}")
+        self.name = name
+        self.pattern = normalize(pattern)
+        self.points = points
+        self.priority = priority
+        self.orientations = tuple(orientations)
+
+    def variants(self):
+        """
+        Zwraca różne ułożenia kształtu po zastosowaniu dozwolonych przekształceń.
+
+        Przekształcenia dające ten sam wzorzec (np. obroty kwadratu) są pomijane.
+
+        Returns:
+            tuple: Krotka znormalizowanych wzorców w kolejności ``orientations``.
+        """
+        variants = []
+        for orientation in self.orientations:
+            transform = ORIENTATIONS[orientation]
+            variant = normalize(transform(r, c) for r, c in self.pattern)
+            if variant not in variants:
+                variants.append(variant)
+        return tuple(variants)
+
+
+class ShapeTable:
+    """
+    Rejestr kształtów skompilowany dla jednego rozmiaru planszy.
+
+    Attributes:
+        size (int): Rozmiar planszy.
+        order (tuple): Nazwy kształtów w kolejności priorytetu.
+        points (dict): Punkty według nazwy kształtu.
+        masks (dict): Krotka masek bitowych wszystkich ułożeń według nazwy kształtu.
+        placements (tuple): Płaska tabela par (nazwa, maska) wszystkich ułożeń w kolejności priorytetu.
+        cell_index (tuple): Dla każdego pola pary (nazwa, maska) ułożeń, które je pokrywają,
+            w kolejności priorytetu.
+        placement_points (tuple): Punkty za każde ułożenie z ``placements``.
+        placement_sizes (tuple): Liczba pól każdego ułożenia z ``placements``.
+        cell_placements (tuple): Dla każdego pola numery (pozycje w ``placements``) ułożeń, które je pokrywają.
+    """
+
+    def __init__(self, size, shapes):
+        """
+        Wylicza maski ułożeń każdego kształtu na planszy o podanym rozmiarze.
+
+        Args:
+            size (int): Rozmiar planszy.
+            shapes (tuple): Kształty w kolejności priorytetu.
+        """
+        self.size = size
+        self.order = tuple(shape.name for shape in shapes)
+        self.points = {shape.name: shape.points for shape in shapes}
+        self.masks = {}
+        placements = []
+        for shape in shapes:
+            masks = []
+            for pattern in shape.variants():
+                height = max(r for r, _ in pattern) + 1
+                width = max(c for _, c in pattern) + 1
+                for row in range(size - height + 1):
+                    for col in range(size - width + 1):
+                        mask = 0
+                        for dr, dc in pattern:
+                            mask |= 1 << ((row + dr) * size + col + dc)
+                        masks.append(mask)
+            self.masks[shape.name] = tuple(masks)
+            placements.extend((shape.name, mask) for mask in masks)
+        self.placements = tuple(placements)
+        self.placement_points = tuple(self.points[name] for name, _ in placements)
+        self.placement_sizes = tuple(mask.bit_count() for _, mask in placements)
+
+        index = [[] for _ in range(size * size)]
+        ids = [[] for _ in range(size * size)]
+        for number, (name, mask) in enumerate(placements):
+            bits = mask
+            while bits:
+                low = bits & -bits
+                index[low.bit_length() - 1].append((name, mask))
+                ids[low.bit_length() - 1].append(number)
+                bits ^= low
+        self.cell_index = tuple(tuple(cell_placements) for cell_placements in index)
+        self.cell_placements = tuple(tuple(cell_ids) for cell_ids in ids)
+
+
+_registry = {}
+
+
+def register_shape(shape):
+    """
+    Dodaje kształt do rejestru (lub zastępuje kształt o tej samej nazwie).
+
+    Skompilowane tabele są unieważniane; plansze utworzone wcześniej zachowują starą tabelę.
+
+    Args:
+        shape (Shape): Opis kształtu.
+    """
+    _registry[shape.name] = shape
+    compile_shapes.cache_clear()
+    compile_patterns.cache_clear()
+
+
+def unregister_shape(name):
+    """
+    Usuwa kształt z rejestru.
+
+    Args:
+        name (str): Nazwa kształtu.
+
+    Raises:
+        KeyError: Jeśli kształt nie jest zarejestrowany.
+    """
+    del _registry[name]
+    compile_shapes.cache_clear()
+    compile_patterns.cache_clear()
+
+
+def registered_shapes():
+    """
+    Zwraca zarejestrowane kształty.
+
+    Returns:
+        tuple: Kształty w kolejności priorytetu.
+    """
+    return tuple(sorted(_registry.values(), key=lambda shape: shape.priority))
+
+
+@lru_cache(maxsize=None)
+def compile_shapes(size):
+    """
+    Kompiluje rejestr kształtów dla planszy o podanym rozmiarze.
+
+    Wynik jest zapamiętywany, więc wszystkie plansze tego samego rozmiaru współdzielą tabelę.
+
+    Args:
+        size (int): Rozmiar planszy.
+
+    Returns:
+        ShapeTable: Tabela ułożeń kształtów.
+    """
+    return ShapeTable(size, registered_shapes())
+
+
+@lru_cache(maxsize=None)
+def compile_patterns():
+    """
+    Kompiluje rejestr kształtów do wzorców względnych wobec stawianego pola, niezależnych od rozmiaru planszy.
+
+    Dla każdego ułożenia (wariantu) kształtu i każdego jego pola powstaje wpis opisujący, jakie
+    inne pola muszą być zajęte, jeśli to pole zostało postawione. Pozwala to sprawdzać kształty
+    tylko wokół postawionego pola, bez tabel rozmiaru ``size * size`` (patrz ``sparse_board``).
+
+    Returns:
+        tuple: Wpisy (nazwa, wiersz, kolumna, wysokość, szerokość, pozostałe) w kolejności priorytetu,
+        gdzie (wiersz, kolumna) to położenie stawianego pola we wzorcu, a ``pozostałe`` to przesunięcia
+        (wiersz, kolumna) pozostałych pól względem niego.
+    """
+    entries = []
+    for shape in registered_shapes():
+        for pattern in shape.variants():
+            height = max(r for r, _ in pattern) + 1
+            width = max(c for _, c in pattern) + 1
+            for row, col in pattern:
+                others = tuple((r - row, c - col) for r, c in pattern if (r, c) != (row, col))
+                entries.append((shape.name, row, col, height, width, others))
+    return tuple(entries)
+
+
+# Kształty gry: T, kwadrat 3x3 bez środka, linia 5 pól (pozioma lub pionowa) i L.
+register_shape(Shape('t', ((0, 1), (1, 0), (1, 1), (1, 2), (2, 1)), points=5, priority=0))
+register_shape(Shape('square', ((0, 0), (0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1), (2, 2)), points=8,
+                     priority=1))
+register_shape(Shape('line', tuple((0, i) for i in range(5)), points=4, priority=2,
+                     orientations=('identity', 'rot90')))
+register_shape(Shape('l', ((0, 0), (1, 0), (2, 0), (2, 1), (2, 2)), points=5, priority=3))
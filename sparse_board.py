@@ -0,0 +1,349 @@
+"""
+Moduł rzadkiej planszy do gry na bardzo dużych planszach (np. 1000x1000 i większych).
+
+``GameBoard`` alokuje struktury rozmiaru ``size * size`` (siatkę, listę wolnych pól, tabelę
+wszystkich ułożeń kształtów), więc nadaje się tylko do małych plansz. ``SparseBoard`` przechowuje
+wyłącznie zajęte pola w słowniku, a kształty z rejestru ``shapes`` sprawdza wzorcami względnymi
+(``compile_patterns``) tylko wokół postawionego pola. Pamięć i koszt ruchu rosną więc z liczbą
+postawionych symboli, a nie z powierzchnią planszy.
+"""
+
+import hashlib
+from functools import lru_cache
+
+from shapes import compile_patterns, registered_shapes
+
+MASK64 = (1 << 64) - 1
+
+
+@lru_cache(maxsize=None)
+def _zobrist_seed(size, symbol):
+    """
+    Zwraca ziarno kluczy Zobrista dla danego rozmiaru planszy i symbolu (takie samo w każdym procesie).
+    """
+    digest = hashlib.blake2b(f"zobrist:{size}:{symbol}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def zobrist_key(size, symbol, cell):
+    """
+    Wylicza 64-bitowy klucz Zobrista pola bez tablicy kluczy dla całej planszy.
+
+    Klucz powstaje przez wymieszanie (splitmix64) numeru pola z ziarnem zależnym od rozmiaru
+    planszy i symbolu, więc jest deterministyczny, a pamięć nie zależy od rozmiaru planszy.
+
+    Args:
+        size (int): Rozmiar planszy.
+        symbol (str): Symbol na polu.
+        cell (int): Numer pola (``wiersz * size + kolumna``).
+
+    Returns:
+        int: Klucz Zobrista.
+    """
+    value = (_zobrist_seed(size, symbol) + cell * 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+class SparseBoard:
+    """
+    Plansza przechowująca tylko zajęte pola, z tymi samymi regułami kształtów co ``GameBoard``.
+
+    Udostępnia interfejs ``GameBoard`` używany przez ``ai.minimax`` i ``ai.get_best_move``
+    (``place_symbol``, ``last_move_points``, ``is_full``, ``candidate_cells`` itd.). Metody wymieniające
+    wszystkie wolne pola (``iter_free_cells``, ``get_available_positions``) działają, ale w czasie
+    O(size²) - na dużych planszach ruchy należy wybierać przez ``candidate_cells``.
+
+    Attributes:
+        size (int): Rozmiar planszy.
+        cells (dict): Symbol według numeru zajętego pola (``wiersz * size + kolumna``).
+        occupied_count (int): Liczba zajętych pól.
+        points (dict): Punkty według nazwy kształtu.
+        patterns (tuple): Wzorce kształtów względne wobec stawianego pola (``shapes.compile_patterns``).
+        last_symbol (str): Symbol postawiony w ostatnim ruchu (None przed pierwszym ruchem).
+        last_shapes (tuple): Kształty ułożone ostatnim ruchem, w kolejności priorytetu.
+        hash (int): Hash Zobrista pozycji, aktualizowany przyrostowo przy każdym ruchu.
+        observers (list): Obiekty powiadamiane o każdej zmianie pola (patrz ``GameBoard.add_observer``).
+        undo_stack (list): Ruchy wykonane przez ``make_move`` i jeszcze nie cofnięte (patrz ``GameBoard.undo_stack``).
+    """
+
+    def __init__(self, size):
+        """
+        Inicjalizuje pustą planszę o podanym rozmiarze.
+
+        Args:
+            size (int): Rozmiar planszy.
+        """
+        self.size = size
+        self.cells = {}
+        self.occupied_count = 0
+        self.points = {shape.name: shape.points for shape in registered_shapes()}
+        self.patterns = compile_patterns()
+        self.last_symbol = None
+        self.last_shapes = ()
+        self.hash = 0
+        self.observers = []
+        self.undo_stack = []
+
+    def add_observer(self, observer):
+        """
+        Rejestruje obiekt powiadamiany o zmianach pól (``observer.cell_changed(cell, previous, symbol)``).
+
+        Args:
+            observer (object): Obiekt z metodą ``cell_changed``.
+        """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Wyrejestrowuje obiekt dodany przez ``add_observer``.
+
+        Args:
+            observer (object): Wcześniej zarejestrowany obiekt.
+        """
+        self.observers.remove(observer)
+
+    def copy(self):
+        """
+        Tworzy niezależną kopię planszy.
+
+        Returns:
+            SparseBoard: Nowa plansza o tym samym stanie, łącznie z informacją o ostatnim ruchu.
+        """
+        board = SparseBoard(self.size)
+        board.cells = dict(self.cells)
+        board.occupied_count = self.occupied_count
+        board.last_symbol = self.last_symbol
+        board.last_shapes = self.last_shapes
+        board.hash = self.hash
+        return board
+
+    def display_board(self):
+        """
+        Wyświetla w konsoli fragment planszy obejmujący wszystkie zajęte pola.
+        """
+        if not self.cells:
+            print(f"Empty {self.size}x{self.size} board.")
+            return
+        rows = [cell // self.size for cell in self.cells]
+        cols = [cell % self.size for cell in self.cells]
+        left, right = min(cols), max(cols)
+        width = len(str(max(rows)))
+        print(" " * width + "   " + "   ".join(str(col) for col in range(left, right + 1)))
+        for row in range(min(rows), max(rows) + 1):
+            symbols = (self.cells.get(row * self.size + col, ' ') for col in range(left, right + 1))
+            print(f"{row:>{width}} | " + " | ".join(symbols) + " |")
+
+    def is_spot_available(self, row, col):
+        """
+        Sprawdza, czy dane pole na planszy jest dostępne.
+
+        Args:
+            row (int): Wiersz planszy.
+            col (int): Kolumna planszy.
+
+        Returns:
+            bool: True, jeśli pole jest dostępne, False w przeciwnym wypadku.
+        """
+        return row * self.size + col not in self.cells
+
+    def place_symbol(self, symbol, row, col):
+        """
+        Umieszcza symbol na planszy w podanym miejscu.
+
+        Args:
+            symbol (str): Symbol, który ma zostać umieszczony (np. 'X' lub 'O'; ' ' zwalnia pole).
+            row (int): Wiersz planszy.
+            col (int): Kolumna planszy.
+
+        Returns:
+            tuple: Nazwy kształtów ułożonych tym ruchem, w kolejności priorytetu
+            (pusta krotka, jeśli ruch nie utworzył kształtu lub zwalnia pole).
+
+        Raises:
+            IndexError: Jeśli pole leży poza planszą.
+        """
+        size = self.size
+        if not (0 <= row < size and 0 <= col < size):
+            raise IndexError(f"Cell ({row}, {col}) is outside the {size}x{size} board")
+        cell = row * size + col
+        cells = self.cells
+        previous = cells.get(cell, ' ')
+        if previous != ' ':
+            self.hash ^= zobrist_key(size, previous, cell)
+            self.occupied_count -= 1
+        if symbol != ' ':
+            cells[cell] = symbol
+            self.hash ^= zobrist_key(size, symbol, cell)
+            self.occupied_count += 1
+        elif previous != ' ':
+            del cells[cell]
+        for observer in self.observers:
+            observer.cell_changed(cell, previous, symbol)
+
+        shapes = ()
+        if symbol != ' ':
+            shapes = self._shapes_at(symbol, row, col)
+        self.last_symbol = symbol
+        self.last_shapes = shapes
+        return shapes
+
+    def make_move(self, symbol, row, col):
+        """
+        Stawia symbol na wolnym polu, zapamiętując ruch na stosie ``undo_stack``.
+
+        Args:
+            symbol (str): Symbol, który ma zostać umieszczony (np. 'X' lub 'O').
+            row (int): Wiersz planszy.
+            col (int): Kolumna planszy.
+
+        Returns:
+            tuple: Nazwy kształtów ułożonych tym ruchem (jak ``place_symbol``).
+        """
+        cell = row * self.size + col
+        self.undo_stack.append((cell, self.cells.get(cell, ' '), self.last_symbol, self.last_shapes))
+        return self.place_symbol(symbol, row, col)
+
+    def unmake_move(self):
+        """
+        Cofa ostatni ruch wykonany przez ``make_move``, łącznie z informacją o ostatnim ruchu.
+
+        Raises:
+            IndexError: Jeśli nie ma ruchu do cofnięcia.
+        """
+        cell, previous, last_symbol, last_shapes = self.undo_stack.pop()
+        self.place_symbol(previous, cell // self.size, cell % self.size)
+        self.last_symbol = last_symbol
+        self.last_shapes = last_shapes
+
+    def _shapes_at(self, symbol, row, col, names=None):
+        """
+        Wyszukuje kształty z danego symbolu, które zawierają pole (row, col).
+
+        Args:
+            symbol (str): Symbol, z którego mają być ułożone kształty.
+            row (int): Wiersz pola.
+            col (int): Kolumna pola.
+            names (tuple): Sprawdzane kształty (None - wszystkie zarejestrowane).
+
+        Returns:
+            tuple: Nazwy znalezionych kształtów w kolejności priorytetu.
+        """
+        size = self.size
+        cells = self.cells
+        cell = row * size + col
+        shapes = ()
+        for name, dr, dc, height, width, others in self.patterns:
+            if name in shapes or (names is not None and name not in names):
+                continue
+            top = row - dr
+            left = col - dc
+            if top < 0 or left < 0 or top + height > size or left + width > size:
+                continue  # Ułożenie wystawałoby poza planszę
+            for r, c in others:
+                if cells.get(cell + r * size + c) != symbol:
+                    break
+            else:
+                shapes += (name,)
+        return shapes
+
+    def is_full(self):
+        """
+        Sprawdza w O(1), czy wszystkie pola planszy są zajęte.
+
+        Returns:
+            bool: True, jeśli nie ma wolnych pól.
+        """
+        return self.occupied_count == self.size * self.size
+
+    def iter_free_cells(self):
+        """
+        Zwraca iterator numerów wolnych pól (czas O(size²) - na dużych planszach patrz ``candidate_cells``).
+
+        Returns:
+            iterator: Numery pól (``wiersz * size + kolumna``).
+        """
+        cells = self.cells
+        return (cell for cell in range(self.size * self.size) if cell not in cells)
+
+    def candidate_cells(self, radius):
+        """
+        Zwraca wolne pola w odległości co najwyżej ``radius`` (w wierszach i kolumnach) od zajętych pól.
+
+        Koszt zależy od liczby zajętych pól i promienia, a nie od rozmiaru planszy. Zwracana jest
+        nowa lista, więc w trakcie iteracji wolno wykonywać ruchy.
+
+        Args:
+            radius (int): Promień sąsiedztwa.
+
+        Returns:
+            list: Numery pól (``wiersz * size + kolumna``); na pustej planszy - środek planszy.
+        """
+        size = self.size
+        cells = self.cells
+        if not cells:
+            return [(size // 2) * size + size // 2]
+        candidates = {}  # Słownik zamiast zbioru - kolejność nie zależy od hashowania
+        for cell in cells:
+            row, col = divmod(cell, size)
+            for r in range(max(0, row - radius), min(size, row + radius + 1)):
+                for neighbour in range(r * size + max(0, col - radius), r * size + min(size, col + radius + 1)):
+                    if neighbour not in cells:
+                        candidates[neighbour] = None
+        return list(candidates)
+
+    def last_move_points(self):
+        """
+        Zwraca punkty za kształt ułożony ostatnim ruchem, bez przeszukiwania całej planszy.
+
+        Returns:
+            int: Liczba punktów za kształt o najwyższym priorytecie lub 0, jeśli ruch nie utworzył kształtu.
+        """
+        if self.last_shapes:
+            return self.points[self.last_shapes[0]]
+        return 0
+
+    def get_available_positions(self):
+        """
+        Zwraca listę dostępnych pozycji na planszy (czas i pamięć O(size²)).
+
+        Returns:
+            list: Lista krotek zawierających dostępne współrzędne (wiersz, kolumna).
+        """
+        size = self.size
+        return [divmod(cell, size) for cell in self.iter_free_cells()]
+
+    def _has_shape(self, name, symbol):
+        """
+        Sprawdza, czy kształt o danej nazwie jest ułożony z symbolu, przeglądając tylko pola tego symbolu.
+
+        Args:
+            name (str): Nazwa kształtu z rejestru ``shapes``.
+            symbol (str): Symbol, który ma być sprawdzony.
+
+        Returns:
+            bool: True, jeśli kształt został znaleziony, False w przeciwnym wypadku.
+        """
+        size = self.size
+        for cell, owner in self.cells.items():
+            if owner == symbol and self._shapes_at(symbol, cell // size, cell % size, (name,)):
+                return True
+        return False
+
+    def check_for_win(self, symbol):
+        """
+        Sprawdza, czy któryś z zarejestrowanych kształtów utworzonych z danego symbolu został ułożony.
+
+        Kształty są sprawdzane w kolejności priorytetu, tylko wokół pól zajętych przez symbol.
+
+        Args:
+            symbol (str): Symbol, który ma być sprawdzony.
+
+        Returns:
+            int: Liczba punktów za znaleziony kształt lub 0, jeśli kształt nie został znaleziony.
+        """
+        for name in self.points:
+            if self._has_shape(name, symbol):
+                return self.points[name]
+        return 0  # Brak kształtu
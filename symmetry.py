@@ -0,0 +1,197 @@
+"""
+Moduł symetrii planszy: sprowadzanie pozycji do kanonicznego reprezentanta.
+
+Kwadratowa plansza ma 8 symetrii (obroty i odbicia), ale dozwolone są tylko te, które
+przeprowadzają zbiór ułożeń każdego kształtu z rejestru na siebie - inaczej pozycje
+symetryczne nie byłyby równoważne. Dla domyślnych kształtów (L tylko w jednym ułożeniu)
+zostaje odbicie względem przekątnej; po zarejestrowaniu L ze wszystkimi obrotami i odbiciami
+dozwolone są wszystkie 8.
+
+``SymmetryHasher`` utrzymuje przyrostowo hash Zobrista pozycji po każdym dozwolonym
+przekształceniu, więc hash kanoniczny (najmniejszy z nich) i stabilizator pozycji są dostępne
+w każdym węźle przeszukiwania bez przeglądania planszy.
+"""
+
+from functools import lru_cache
+
+from board import zobrist_keys
+from shapes import ORIENTATIONS
+
+
+@lru_cache(maxsize=None)
+def cell_permutations(size):
+    """
+    Wylicza permutacje pól planszy dla wszystkich przekształceń z ``ORIENTATIONS``.
+
+    Args:
+        size (int): Rozmiar planszy.
+
+    Returns:
+        dict: Nazwa przekształcenia -> krotka, w której pozycja ``cell`` zawiera numer pola,
+        na które przechodzi pole ``cell``.
+    """
+    permutations = {}
+    for name, transform in ORIENTATIONS.items():
+        moved = [transform(cell // size, cell % size) for cell in range(size * size)]
+        top = min(r for r, _ in moved)
+        left = min(c for _, c in moved)
+        permutations[name] = tuple((r - top) * size + c - left for r, c in moved)
+    return permutations
+
+
+def transform_mask(mask, permutation):
+    """
+    Przekształca maskę bitową pól planszy.
+
+    Args:
+        mask (int): Maska bitowa pól.
+        permutation (tuple): Permutacja pól (patrz ``cell_permutations``).
+
+    Returns:
+        int: Maska bitowa przekształconych pól.
+    """
+    result = 0
+    while mask:
+        low = mask & -mask
+        result |= 1 << permutation[low.bit_length() - 1]
+        mask ^= low
+    return result
+
+
+@lru_cache(maxsize=None)
+def symmetry_group(shapes):
+    """
+    Wyznacza przekształcenia planszy, które nie zmieniają zasad gry.
+
+    Przekształcenie jest dozwolone, jeśli każde ułożenie każdego kształtu przechodzi na
+    ułożenie tego samego kształtu. Wynik jest zapamiętywany dla skompilowanej tabeli kształtów.
+
+    Args:
+        shapes (ShapeTable): Skompilowany rejestr kształtów (``GameBoard.shapes``).
+
+    Returns:
+        tuple: Pary (nazwa przekształcenia, permutacja pól); przekształcenie tożsamościowe jest pierwsze.
+    """
+    group = []
+    for name, permutation in cell_permutations(shapes.size).items():
+        if all({transform_mask(mask, permutation) for mask in masks} == set(masks)
+               for masks in shapes.masks.values()):
+            group.append((name, permutation))
+    return tuple(group)
+
+
+@lru_cache(maxsize=None)
+def inverse_permutation(permutation):
+    """
+    Odwraca permutację pól (wynik jest zapamiętywany).
+
+    Args:
+        permutation (tuple): Permutacja pól.
+
+    Returns:
+        tuple: Permutacja odwrotna.
+    """
+    inverse = [0] * len(permutation)
+    for cell, target in enumerate(permutation):
+        inverse[target] = cell
+    return tuple(inverse)
+
+
+class SymmetryHasher:
+    """
+    Przyrostowe hashe pozycji po każdym dozwolonym przekształceniu planszy.
+
+    Attributes:
+        board (GameBoard): Plansza (hasher jest zarejestrowany jako jej obserwator).
+        permutations (tuple): Permutacje pól dozwolonych przekształceń (tożsamość jest pierwsza).
+        inverses (tuple): Permutacje odwrotne w tej samej kolejności.
+        hashes (list): Hash Zobrista pozycji po każdym przekształceniu; ``hashes[0] == board.hash``.
+    """
+
+    def __init__(self, board):
+        """
+        Wylicza hashe bieżącej pozycji i rejestruje się jako obserwator planszy.
+
+        Args:
+            board (GameBoard): Plansza do gry.
+        """
+        self.board = board
+        self.permutations = tuple(permutation for _, permutation in symmetry_group(board.shapes))
+        self.inverses = tuple(inverse_permutation(permutation) for permutation in self.permutations)
+        self.hashes = [0] * len(self.permutations)
+        self._keys = {}
+        size = board.size
+        for cell in range(size * size):
+            symbol = board.board[cell // size][cell % size]
+            if symbol != ' ':
+                self.cell_changed(cell, ' ', symbol)
+        board.add_observer(self)
+
+    def detach(self):
+        """
+        Wyrejestrowuje hasher z planszy.
+        """
+        self.board.remove_observer(self)
+
+    def cell_changed(self, cell, previous, symbol):
+        """
+        Aktualizuje hashe po zmianie pola (wywoływane przez ``GameBoard.place_symbol``).
+
+        Args:
+            cell (int): Numer pola.
+            previous (str): Zawartość pola przed zmianą.
+            symbol (str): Zawartość pola po zmianie.
+        """
+        hashes = self.hashes
+        for content in (previous, symbol):
+            if content == ' ':
+                continue
+            keys = self._keys.get(content)
+            if keys is None:
+                keys = self._keys[content] = zobrist_keys(self.board.size, content)
+            for index, permutation in enumerate(self.permutations):
+                hashes[index] ^= keys[permutation[cell]]
+
+    def canonical(self):
+        """
+        Zwraca hash kanoniczny pozycji i przekształcenie, które do niego prowadzi.
+
+        Returns:
+            tuple: Para (najmniejszy z hashy, indeks przekształcenia w ``permutations``).
+        """
+        hashes = self.hashes
+        index = min(range(len(hashes)), key=hashes.__getitem__)
+        return hashes[index], index
+
+    def stabilizer(self):
+        """
+        Zwraca przekształcenia, które nie zmieniają bieżącej pozycji.
+
+        Returns:
+            list: Permutacje pól (bez tożsamości); pusta lista, jeśli pozycja nie jest symetryczna.
+        """
+        hashes = self.hashes
+        return [self.permutations[index] for index in range(1, len(hashes)) if hashes[index] == hashes[0]]
+
+    def unique_moves(self, moves):
+        """
+        Usuwa ruchy równoważne z innymi ruchami z listy ze względu na symetrię pozycji.
+
+        Z każdej klasy ruchów równoważnych zostaje ruch o najmniejszym numerze pola.
+
+        Args:
+            moves (list): Ruchy jako współrzędne (wiersz, kolumna).
+
+        Returns:
+            list: Ruchy bez powtórzeń, w pierwotnej kolejności.
+        """
+        stabilizer = self.stabilizer()
+        if not stabilizer:
+            return moves
+        size = self.board.size
+        unique = []
+        for row, col in moves:
+            cell = row * size + col
+            if all(permutation[cell] >= cell for permutation in stabilizer):
+                unique.append((row, col))
+        return unique
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from batch import DEFAULT_SYMBOLS, EMPTY, available_moves, check_for_win, random_boards
+from board import GameBoard
+
+SEED = 20240611
+
+
+def to_game_board(cells):
+    size = len(cells)
+    board = GameBoard(size)
+    for row in range(size):
+        for col in range(size):
+            if cells[row, col] != EMPTY:
+                board.place_symbol(DEFAULT_SYMBOLS[cells[row, col] - 1], row, col)
+    return board
+
+
+@pytest.mark.parametrize('size', [5, 10])
+def test_matches_game_board(size):
+    boards = random_boards(300, size, SEED)
+    moves = available_moves(boards)
+    points = {code: check_for_win(boards, code) for code in (1, 2)}
+    for index in range(len(boards)):
+        board = to_game_board(boards[index])
+        for code, symbol in enumerate(DEFAULT_SYMBOLS, start=1):
+            assert points[code][index] == board.check_for_win(symbol), (index, symbol)
+        expected = np.zeros((size, size), dtype=bool)
+        for row, col in board.get_available_positions():
+            expected[row, col] = True
+        assert np.array_equal(moves[index], expected), index
+
+
+def test_random_boards_are_reproducible():
+    assert np.array_equal(random_boards(20, 10, SEED), random_boards(20, 10, SEED))
@@ -0,0 +1,138 @@
+import copy
+import pickle
+import random
+
+import pytest
+
+from board import BoardSnapshot, GameBoard
+from evaluation import ThreatEvaluator
+from game import Game
+from parallel import random_midgame_board
+from player import Player
+
+
+def board_state(board):
+    return (board.to_bytes(), dict(board.masks), board.occupied, board.occupied_count, list(board.free),
+            board.hash, board.last_symbol, board.last_shapes)
+
+
+def test_unmake_restores_board_exactly():
+    board = random_midgame_board(8, 12, 0)
+    before = board_state(board)
+    rng = random.Random(1)
+    for _ in range(6):
+        row, col = divmod(rng.choice(board.free), board.size)
+        board.make_move('XO'[len(board.undo_stack) % 2], row, col)
+    for _ in range(6):
+        board.unmake_move()
+    assert board_state(board) == before
+    assert not board.undo_stack
+
+
+def test_free_list_returns_to_lifo_order():
+    board = GameBoard(5)
+    board.place_symbol('X', 2, 2)
+    orders = [list(board.free)]
+    for cell in (0, 24, 7, 12, 3):
+        board.make_move('O', *divmod(cell, 5))
+        orders.append(list(board.free))
+    while board.undo_stack:
+        orders.pop()
+        board.unmake_move()
+        assert board.free == orders[-1]
+    assert all(board.free[board._free_index[cell]] == cell for cell in board.free)
+
+
+def test_iteration_over_free_survives_make_unmake():
+    board = random_midgame_board(6, 8, 2)
+    seen = []
+    for cell in board.free:
+        board.make_move('X', *divmod(cell, board.size))
+        board.unmake_move()
+        seen.append(cell)
+    assert seen == board.free
+
+
+def test_unmake_restores_zobrist_hash():
+    board = random_midgame_board(8, 10, 3)
+    fresh = GameBoard.from_bytes(board.to_bytes())
+    assert board.hash == fresh.hash
+    start = board.hash
+    board.make_move('X', *divmod(board.free[0], board.size))
+    assert board.hash != start
+    assert board.hash == GameBoard.from_bytes(board.to_bytes()).hash
+    board.unmake_move()
+    assert board.hash == start
+
+
+def test_unmake_restores_observer_state():
+    board = random_midgame_board(8, 10, 4)
+    evaluator = ThreatEvaluator(board)
+    expected = {symbol: evaluator.score(symbol) for symbol in 'XO'}
+    for cell in list(board.free)[:5]:
+        board.make_move('O', *divmod(cell, board.size))
+    assert {symbol: evaluator.score(symbol) for symbol in 'XO'} == {
+        symbol: ThreatEvaluator(GameBoard.from_bytes(board.to_bytes())).score(symbol) for symbol in 'XO'}
+    for _ in range(5):
+        board.unmake_move()
+    assert {symbol: evaluator.score(symbol) for symbol in 'XO'} == expected
+    evaluator.detach()
+    assert not board.observers
+
+
+def test_unmake_restores_last_move():
+    board = GameBoard(5)
+    board.place_symbol('X', 0, 0)
+    board.make_move('O', 1, 1)
+    assert board.last_symbol == 'O'
+    board.unmake_move()
+    assert (board.last_symbol, board.last_shapes) == ('X', ())
+    with pytest.raises(IndexError):
+        board.unmake_move()
+
+
+def test_snapshot_round_trip():
+    board = random_midgame_board(8, 10, 5)
+    board.make_move('X', *divmod(board.free[0], board.size))
+    snapshot = board.snapshot()
+    restored = GameBoard.from_snapshot(snapshot)
+    assert restored.snapshot() == snapshot
+    assert (restored.hash, restored.occupied, restored.masks) == (board.hash, board.occupied, board.masks)
+    assert snapshot.size == 8 and snapshot.occupied_count == board.occupied_count
+
+
+def test_snapshot_equality_and_hash():
+    board = random_midgame_board(6, 6, 6)
+    first, second = board.snapshot(), board.copy().snapshot()
+    assert first == second and hash(first) == hash(second)
+    assert len({first, second}) == 1
+    board.make_move('X', *divmod(board.free[0], board.size))
+    assert board.snapshot() != first
+    assert BoardSnapshot(first.cells, None) != first
+    assert first != first.cells
+
+
+def test_snapshot_is_immutable():
+    snapshot = GameBoard(4).snapshot()
+    with pytest.raises(AttributeError):
+        snapshot.cells = b' ' * 16
+    with pytest.raises(AttributeError):
+        del snapshot.last_symbol
+    with pytest.raises(AttributeError):
+        snapshot.extra = 1
+    assert copy.copy(snapshot) is snapshot and copy.deepcopy(snapshot) is snapshot
+    assert pickle.loads(pickle.dumps(snapshot)) == snapshot
+
+
+def test_game_and_player_slots():
+    game = Game()
+    game.players.extend([Player('X'), Player('O', is_ai=True, strategy='random')])
+    game.current_player = game.players[0]
+    game.record_path = None
+    game.current_player.points += 2
+    assert (game.round_number, game.current_player.symbol, game.players[1].strategy) == (1, 'X', 'random')
+    assert not hasattr(game, '__dict__') and not hasattr(game.players[0], '__dict__')
+    with pytest.raises(AttributeError):
+        game.unknown = 1
+    with pytest.raises(AttributeError):
+        game.players[0].unknown = 1
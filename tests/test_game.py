@@ -0,0 +1,45 @@
+from ai import RandomStrategy
+from game import Game, MOVE_CONTINUE, MOVE_WIN
+from player import Player
+
+
+def new_game(*players):
+    game = Game()
+    game.players.extend(players)
+    game.current_player = players[0]
+    return game
+
+
+def test_console_round_awards_shape_points(capsys):
+    game = new_game(Player('X', is_ai=True, strategy='random'), Player('O', is_ai=True, strategy='random'))
+    game.ai_engines = {'X': RandomStrategy(seed=1), 'O': RandomStrategy(seed=2)}
+    game.play_round()
+    round_record = game.record.rounds[-1]
+    if round_record.winner is None:
+        assert game.board.is_full() and all(player.points == 0 for player in game.players)
+    else:
+        winner = game.players[round_record.winner]
+        assert winner is game.current_player
+        assert winner.points == round_record.points == game.board.shapes.points[round_record.shape] > 1
+        assert f"earns {winner.points} points" in capsys.readouterr().out
+
+
+def test_console_move_goes_through_apply_move(monkeypatch):
+    game = new_game(Player('X'), Player('O'))
+    # Linia pięciu 'X' w pierwszym wierszu; 'O' gra w trzecim
+    moves = iter(["0 0", "2 0", "0 1", "2 1", "0 2", "2 2", "0 3", "2 3", "0 4"])
+    monkeypatch.setattr('builtins.input', lambda prompt: next(moves))
+    outcomes = [game.player_turn() for _ in range(9)]
+    assert outcomes == [MOVE_CONTINUE] * 8 + [MOVE_WIN]
+    assert game.current_player.symbol == 'X'
+    assert game.current_player.points == game.board.last_move_points() > 1
+    assert len(game.record.rounds[0].moves) == 9
+
+
+def test_close_engines_closes_cached_strategies(monkeypatch):
+    game = new_game(Player('X', is_ai=True, strategy='random'), Player('O'))
+    engine = game.ai_engine(game.players[0])
+    closed = []
+    monkeypatch.setattr(engine, 'close', lambda: closed.append(engine))
+    game.close_engines()
+    assert closed == [engine] and game.ai_engines == {}
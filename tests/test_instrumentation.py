@@ -0,0 +1,26 @@
+from ai import AlphaBetaSearch
+from board import GameBoard
+from instrumentation import Instrumentation
+
+
+def test_counts_shape_checks_and_evaluator():
+    board = GameBoard(8)
+    with Instrumentation() as stats:
+        board.place_symbol('X', 3, 3)
+        board.check_for_win('X')
+        AlphaBetaSearch(max_depth=2, time_budget_ms=None, use_book=False).select_move(board, 'O', 'X')
+    snapshot = stats.snapshot()
+    placements = len(board.shapes.placements)
+    assert sum(snapshot['shape_checks'].values()) >= placements + len(board.cell_index[3 * 8 + 3])
+    assert set(snapshot['shape_checks']) == set(board.shapes.order)
+    assert snapshot['counters']['evaluations'] > 0
+    assert snapshot['counters']['evaluator_placements'] > 0
+
+
+def test_disable_restores_originals():
+    original = GameBoard.place_symbol
+    stats = Instrumentation()
+    stats.enable()
+    assert GameBoard.place_symbol is not original
+    stats.disable()
+    assert GameBoard.place_symbol is original
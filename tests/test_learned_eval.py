@@ -0,0 +1,83 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import shapes  # noqa: E402
+from ai import AlphaBetaSearch  # noqa: E402
+from board import GameBoard  # noqa: E402
+from learned_eval import LearnedEvaluator, feature_count, feature_table, save_weights, train  # noqa: E402
+from parallel import random_midgame_board  # noqa: E402
+
+
+def test_feature_table_follows_shape_registry():
+    size = 8
+    before = feature_table(size)
+    assert feature_table(size) is before
+    removed = shapes.registered_shapes()[-1]
+    shapes.unregister_shape(removed.name)
+    try:
+        after = feature_table(size)
+        assert after[0].shape[1] == len(shapes.compile_shapes(size).placements) < before[0].shape[1]
+        assert feature_count(size) == 2 * size * size + 2 * after[0].shape[1]
+    finally:
+        shapes.register_shape(removed)
+    restored = feature_table(size)
+    assert np.array_equal(restored[0], before[0]) and np.array_equal(restored[1], before[1])
+
+
+def write_weights(path, size, seed=0, hidden=8):
+    rng = np.random.default_rng(seed)
+    rows = rng.random((64, feature_count(size)), dtype=np.float32)
+    outcomes = rng.choice([-1.0, 0.0, 1.0], 64).astype(np.float32)
+    save_weights(str(path), size, train(rows, outcomes, hidden=hidden, epochs=1, seed=seed))
+    return str(path)
+
+
+@pytest.fixture
+def evaluator(tmp_path):
+    evaluator = LearnedEvaluator(write_weights(tmp_path / 'weights.bin', 6))
+    yield evaluator
+    evaluator.close()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_evaluate_moves_matches_evaluate_after_each_move(evaluator, seed):
+    board = random_midgame_board(6, 10 + seed, seed)
+    symbol, opponent_symbol = ('X', 'O') if seed % 2 else ('O', 'X')
+    cells = list(board.free)
+    scores, wins = evaluator.evaluate_moves(board, symbol, opponent_symbol, cells)
+    for cell, score, win in zip(cells, scores, wins):
+        board.make_move(symbol, *divmod(cell, board.size))
+        assert score == pytest.approx(evaluator.evaluate(board, symbol, opponent_symbol), abs=1e-5)
+        assert bool(win) == bool(board.last_move_points())
+        board.unmake_move()
+
+
+def test_evaluate_moves_flags_winning_moves(evaluator):
+    board = GameBoard(6)
+    for col in range(4):
+        board.place_symbol('X', 0, col)
+    cells = list(board.free)
+    _, wins = evaluator.evaluate_moves(board, 'X', 'O', cells)
+    assert {cell for cell, win in zip(cells, wins) if win} == {4}
+
+
+def test_search_rejects_weights_for_another_board_size(tmp_path):
+    search = AlphaBetaSearch(max_depth=1, time_budget_ms=None, use_book=False,
+                             weights=write_weights(tmp_path / 'weights.bin', 5))
+    with pytest.raises(ValueError, match='5x5 board, not 6x6'):
+        search.select_move(GameBoard(6), 'X', 'O')
+    assert search.select_move(GameBoard(5), 'X', 'O') is not None
+
+
+def test_weights_for_other_shapes_are_rejected(tmp_path):
+    path = write_weights(tmp_path / 'weights.bin', 6)
+    line = next(shape for shape in shapes.registered_shapes() if shape.name == 'line')
+    # Ten sam wzorzec (i liczba ułożeń), inne punkty
+    shapes.register_shape(shapes.Shape('line', line.pattern, line.points + 1, line.priority, line.orientations))
+    try:
+        with pytest.raises(ValueError, match='different set of registered shapes'):
+            LearnedEvaluator(path)
+    finally:
+        shapes.register_shape(line)
+    LearnedEvaluator(path).close()
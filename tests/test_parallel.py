@@ -0,0 +1,58 @@
+import pytest
+
+import ai
+from ai import AlphaBetaSearch
+from parallel import ParallelSearch, random_midgame_board
+
+POSITIONS = [(8, 10, 0), (8, 16, 1), (10, 20, 2)]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_same_move_as_serial_search(workers):
+    with ParallelSearch(workers, depth=2) as search:
+        for size, moves, seed in POSITIONS:
+            board = random_midgame_board(size, moves, seed)
+            before = board.to_bytes()
+            serial_move, serial_score = AlphaBetaSearch(time_budget_ms=None).search_depth(board, 'X', 'O', 2)
+            assert search.search(board, 'X', 'O') == (serial_move, serial_score)
+            assert board.to_bytes() == before
+
+
+def test_repeated_search_does_not_depend_on_earlier_ones():
+    board = random_midgame_board(8, 10, 0)
+    with ParallelSearch(2, depth=2) as search:
+        first = search.search(board, 'X', 'O')
+        search.search(random_midgame_board(8, 12, 3), 'O', 'X')
+        assert search.search(board, 'X', 'O') == first
+
+
+def test_score_root_move_matches_search_depth():
+    board = random_midgame_board(8, 10, 0)
+    engine = AlphaBetaSearch(time_budget_ms=None)
+    move, score = engine.search_depth(board, 'X', 'O', 2)
+    scores = [AlphaBetaSearch(time_budget_ms=None).score_root_move(board, 'X', 'O', root_move, 2)
+              for root_move in engine.root_moves(board)]
+    assert max(scores) == score
+    assert engine.root_moves(board)[scores.index(score)] == move
+
+
+def test_registered_strategy():
+    assert ai.STRATEGIES['parallel'] is ParallelSearch
+    search = ai.create_strategy('parallel', workers=1, depth=1)
+    assert search.select_move(random_midgame_board(6, 4, 0), 'X', 'O') is not None
+    with pytest.raises(ValueError):
+        ai.create_strategy('parallel', depth=0)
+    with pytest.raises(ValueError):
+        ai.create_strategy('parallel', workers=True)
+
+
+def test_pool_started_lazily_and_closed():
+    search = ai.create_strategy('parallel', workers=2, depth=1)
+    assert search._executor is None
+    search.select_move(random_midgame_board(6, 4, 0), 'X', 'O')
+    assert search._executor is not None
+    search.close()
+    assert search._executor is None
+    search.close()
+    assert search.select_move(random_midgame_board(6, 4, 0), 'X', 'O') is not None
+    search.close()
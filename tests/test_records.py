@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from records import OFFSET, GameRecord, RecordReader, RecordWriter, RoundRecord, index_path, rebuild_index
+
+
+def make_record(number):
+    return GameRecord(rounds=[RoundRecord(number % 2, moves=[number, number + 1, number + 2], winner=0,
+                                          shape='line', points=number)])
+
+
+def write_games(path, count):
+    with RecordWriter(path) as writer:
+        for number in range(count):
+            writer.append(make_record(number))
+
+
+def read_points(path):
+    with RecordReader(path) as reader:
+        return [reader[number].rounds[0].points for number in range(len(reader))]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'games.kgr')
+    write_games(path, 3)
+    return path
+
+
+def test_round_trip(path):
+    write_games(path, 2)
+    assert read_points(path) == [0, 1, 2, 0, 1]
+
+
+def test_missing_index_is_rebuilt(path):
+    os.remove(index_path(path))
+    write_games(path, 1)
+    assert read_points(path) == [0, 1, 2, 0]
+
+
+def test_stale_index_is_rebuilt(path):
+    with open(index_path(path), 'r+b') as index:
+        index.truncate(OFFSET.size)  # Indeks sprzed dopisania dwóch gier
+    write_games(path, 1)
+    assert read_points(path) == [0, 1, 2, 0]
+
+
+def test_truncated_index_is_rebuilt(path):
+    with open(index_path(path), 'r+b') as index:
+        index.truncate(2 * OFFSET.size + 3)
+    assert read_points(path) == [0, 1, 2]
+
+
+def test_index_pointing_past_the_data_is_rebuilt(path):
+    with open(index_path(path), 'ab') as index:
+        index.write(OFFSET.pack(os.path.getsize(path)))  # Wpis gry, której dane nie zostały zapisane
+    assert read_points(path) == [0, 1, 2]
+
+
+def test_unfinished_last_game_is_dropped(path):
+    os.truncate(path, os.path.getsize(path) - 2)
+    assert read_points(path) == [0, 1]
+    with RecordReader(path) as reader:
+        assert [record.rounds[0].points for record in reader] == [0, 1]
+    write_games(path, 1)
+    assert read_points(path) == [0, 1, 0]
+    assert rebuild_index(path) == 3
+
+
+def test_not_a_record_file(tmp_path):
+    path = tmp_path / 'other.kgr'
+    path.write_bytes(b'hello world')
+    with pytest.raises(ValueError):
+        RecordWriter(str(path))
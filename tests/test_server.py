@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import pytest
+
+import server as server_module
+from server import GameClient, GameServer, ProtocolError, check_client_strategy
+
+
+@pytest.fixture(scope='module')
+def server():
+    game_server = GameServer(workers=1, max_matches=2)
+    yield game_server
+    game_server.close()
+
+
+def run_client(game_server, scenario):
+    """
+    Uruchamia serwer na wolnym porcie i wykonuje scenariusz z połączonym klientem.
+    """
+    async def main():
+        listener = await game_server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        client = await GameClient.connect(port=port)
+        try:
+            return await asyncio.wait_for(scenario(client), timeout=60)
+        finally:
+            await client.close()
+            await game_server.wait_disconnected()
+            listener.close()
+            await listener.wait_closed()
+
+    return asyncio.run(main())
+
+
+def test_happy_path(server):
+    async def scenario(client):
+        state = await client.request('new', ai='random', symbol='X')
+        assert state['turn'] == 'X' and not state['finished']
+        state = await client.request('move', match=state['match'], row=0, col=0)
+        assert state['board'][0] == 'X'
+        assert state['board'].count('O') == 1
+        assert state['turn'] == 'X'
+        await client.request('close', match=state['match'])
+        return state
+
+    run_client(server, scenario)
+    assert not server.matches
+
+
+def test_ai_moves_first(server):
+    async def scenario(client):
+        state = await client.request('new', ai='alphabeta:max_depth=1', symbol='O')
+        await client.request('close', match=state['match'])
+        return state
+
+    state = run_client(server, scenario)
+    assert len(state['moves']) == 1 and state['moves'][0]['symbol'] == 'X'
+
+
+def test_malformed_request(server):
+    async def handle(line):
+        return await server.handle_request(line, set())
+
+    assert asyncio.run(handle(b'not json\n'))['ok'] is False
+    assert asyncio.run(handle(b'[1, 2]\n')) == {'ok': False, 'error': "Request must be a JSON object"}
+    response = asyncio.run(handle(json.dumps({'op': 'dance', 'id': 7}).encode()))
+    assert response['ok'] is False and response['id'] == 7
+    response = asyncio.run(handle(json.dumps({'op': 'state', 'match': 99}).encode()))
+    assert response['ok'] is False
+
+
+@pytest.mark.parametrize('ai', ['nope', 'alphabeta:max_depth=abc', 'alphabeta:depth=3', 'mcts:rollout=weird',
+                                'mcts:iterations=0', 'alphabeta:tt_bytes=2000000000', 'alphabeta:max_depth=99',
+                                'mcts:iterations=100000000', 'mcts:time_budget_ms=none',
+                                'alphabeta:time_budget_ms=none', 'alphabeta:weights=/etc/hostname', 'parallel',
+                                'parallel:workers=64'])
+def test_bad_strategy_option(server, ai):
+    async def scenario(client):
+        with pytest.raises(ProtocolError, match='Invalid AI strategy'):
+            await client.request('new', ai=ai, symbol='O')
+
+    run_client(server, scenario)
+    assert not server.matches
+
+
+def test_bool_coordinates_rejected(server):
+    async def scenario(client):
+        state = await client.request('new')
+        with pytest.raises(ProtocolError, match='Move must be'):
+            await client.request('move', match=state['match'], row=True, col=False)
+        state = await client.request('state', match=state['match'])
+        assert state['board'].strip() == ''
+
+    run_client(server, scenario)
+
+
+def test_match_limit(server):
+    async def scenario(client):
+        first = await client.request('new')
+        await client.request('new')
+        with pytest.raises(ProtocolError, match='Too many matches'):
+            await client.request('new')
+        await client.request('close', match=first['match'])
+        await client.request('new')
+
+    run_client(server, scenario)
+    assert not server.matches  # Mecze rozłączonego klienta są usuwane
+
+
+def test_failed_ai_match_is_removed(server, monkeypatch):
+    # Strategia przepuszczona bez sprawdzenia zawodzi dopiero w procesie roboczym
+    monkeypatch.setattr(server, '_check_strategy', lambda ai: None)
+
+    async def scenario(client):
+        with pytest.raises(ProtocolError, match='AI failed'):
+            await client.request('new', ai='mcts:rollout=weird', symbol='O')
+        assert not server.matches
+
+    run_client(server, scenario)
+
+
+def test_strategy_check_builds_no_engine(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("engine built in the server process")
+
+    monkeypatch.setattr(server_module, 'create_strategy', fail)
+    check_client_strategy.cache_clear()
+    for spec in ('random', 'alphabeta', 'alphabeta:max_depth=2,tt_bytes=none,use_book=0', 'mcts:iterations=100'):
+        check_client_strategy(spec)
+    assert check_client_strategy.cache_info().currsize == 4
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from ai import get_best_move
+from board import GameBoard
+from sparse_board import SparseBoard
+
+
+def play_random_game(size, seed):
+    rng = random.Random(seed)
+    dense = GameBoard(size)
+    sparse = SparseBoard(size)
+    cells = list(range(size * size))
+    rng.shuffle(cells)
+    for turn, cell in enumerate(cells):
+        yield dense, sparse, 'XO'[turn % 2], divmod(cell, size)
+
+
+@pytest.mark.parametrize('size, seed', [(5, 0), (6, 1), (7, 2), (8, 3)])
+def test_matches_game_board_on_random_games(size, seed):
+    for dense, sparse, symbol, (row, col) in play_random_game(size, seed):
+        assert sparse.is_spot_available(row, col) == dense.is_spot_available(row, col)
+        assert sparse.place_symbol(symbol, row, col) == dense.place_symbol(symbol, row, col)
+        assert sparse.last_move_points() == dense.last_move_points()
+        for player in 'XO':
+            assert sparse.check_for_win(player) == dense.check_for_win(player)
+        assert sparse.is_full() == dense.is_full()
+        assert sparse.occupied_count == dense.occupied_count
+        assert sorted(sparse.candidate_cells(1)) == sorted(dense.candidate_cells(1))
+        assert sorted(sparse.get_available_positions()) == sorted(dense.get_available_positions())
+
+
+def test_unmake_restores_board():
+    games = play_random_game(7, 4)
+    for _ in range(20):
+        _, sparse, symbol, (row, col) = next(games)
+        sparse.place_symbol(symbol, row, col)
+    before = (dict(sparse.cells), sparse.occupied_count, sparse.hash, sparse.last_symbol, sparse.last_shapes)
+    for _ in range(10):
+        _, _, symbol, (row, col) = next(games)
+        sparse.make_move(symbol, row, col)
+    for _ in range(10):
+        sparse.unmake_move()
+    assert (dict(sparse.cells), sparse.occupied_count, sparse.hash, sparse.last_symbol, sparse.last_shapes) == before
+
+
+@pytest.mark.parametrize('row, col', [(0, 0), (0, 9), (9, 0), (9, 9), (0, 4), (5, 9)])
+@pytest.mark.parametrize('radius', [1, 2, 3])
+def test_candidate_cells_stay_on_board_at_edges(row, col, radius):
+    size = 10
+    board = SparseBoard(size)
+    board.place_symbol('X', row, col)
+    expected = {r * size + c
+                for r in range(max(0, row - radius), min(size, row + radius + 1))
+                for c in range(max(0, col - radius), min(size, col + radius + 1))} - {row * size + col}
+    candidates = board.candidate_cells(radius)
+    assert len(candidates) == len(set(candidates))
+    assert set(candidates) == expected
+
+
+def test_best_move_on_huge_board_avoids_full_board_scans(monkeypatch):
+    board = SparseBoard(1000)
+
+    def full_scan(*args):
+        raise AssertionError("O(size²) path used on a sparse board")
+
+    monkeypatch.setattr(board, 'iter_free_cells', full_scan)
+    monkeypatch.setattr(board, 'get_available_positions', full_scan)
+    for col in range(500, 504):
+        board.place_symbol('X', 500, col)
+    board.place_symbol('O', 501, 500)
+    assert get_best_move(board, 'X', 'O', max_depth=1, radius=1) in ((500, 499), (500, 504))
+    assert board.occupied_count == 5 and not board.undo_stack
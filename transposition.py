@@ -0,0 +1,146 @@
+"""
+Moduł tablicy transpozycji dla przeszukiwania AI.
+
+Tablica ma stały rozmiar w pamięci: wpisy są przechowywane w tablicach ``array`` zaalokowanych
+raz przy tworzeniu, a każdy kubełek ma dwa miejsca - jedno zastępowane tylko przez wpisy
+o większej głębokości i jedno zastępowane zawsze (polityka dwupoziomowa).
+"""
+
+from array import array
+
+# Typy ograniczeń zapisanych w tablicy (0 oznacza puste miejsce).
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+# Rozmiar jednego wpisu w bajtach: klucz (8), wynik (4), głębokość (1), typ (1), ruch (4).
+ENTRY_BYTES = 18
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class TranspositionTable:
+    """
+    Tablica transpozycji indeksowana hashami Zobrista o ograniczonym rozmiarze pamięci.
+
+    Attributes:
+        buckets (int): Liczba kubełków (każdy ma dwa miejsca na wpisy).
+        hits (int): Liczba udanych odczytów.
+        misses (int): Liczba odczytów, które nie znalazły pozycji.
+        collisions (int): Liczba odczytów, w których kubełek był zajęty przez inne pozycje.
+        stores (int): Liczba zapisów.
+        overwrites (int): Liczba zapisów, które usunęły wpis innej pozycji.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Alokuje tablicę mieszczącą się w podanym limicie pamięci.
+
+        Args:
+            max_bytes (int): Maksymalny rozmiar danych tablicy w bajtach.
+        """
+        self.buckets = max(1, max_bytes // (2 * ENTRY_BYTES))
+        slots = 2 * self.buckets
+        self._keys = array('Q', bytes(8 * slots))
+        self._scores = array('i', bytes(4 * slots))
+        self._depths = array('b', bytes(slots))
+        self._flags = array('b', bytes(slots))
+        self._moves = array('i', bytes(4 * slots))
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def probe(self, key):
+        """
+        Odczytuje wpis dla danej pozycji.
+
+        Args:
+            key (int): 64-bitowy hash pozycji.
+
+        Returns:
+            tuple: Krotka (głębokość, typ ograniczenia, wynik, ruch) lub None, jeśli pozycji nie ma w tablicy.
+        """
+        slot = 2 * (key % self.buckets)
+        keys = self._keys
+        for index in (slot, slot + 1):
+            if keys[index] == key and self._flags[index]:
+                self.hits += 1
+                return self._depths[index], self._flags[index], self._scores[index], self._moves[index]
+        self.misses += 1
+        if self._flags[slot] or self._flags[slot + 1]:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        """
+        Zapisuje wynik przeszukiwania pozycji.
+
+        Pierwsze miejsce kubełka przyjmuje wpis, jeśli dotyczy tej samej pozycji lub jest co najmniej
+        tak głęboki jak obecny (poprzedni wpis przechodzi wtedy na drugie miejsce). W przeciwnym razie
+        wpis trafia na drugie miejsce, zastępowane zawsze.
+
+        Args:
+            key (int): 64-bitowy hash pozycji.
+            depth (int): Głębokość, na jaką pozycja została przeszukana.
+            flag (int): Typ ograniczenia (EXACT, LOWER lub UPPER).
+            score (int): Wynik przeszukiwania.
+            move (int): Numer pola najlepszego ruchu lub -1.
+        """
+        self.stores += 1
+        slot = 2 * (key % self.buckets)
+        keys = self._keys
+        if keys[slot] == key or not self._flags[slot] or depth >= self._depths[slot]:
+            if self._flags[slot] and keys[slot] != key:
+                self._write(slot + 1, keys[slot], self._depths[slot], self._flags[slot],
+                            self._scores[slot], self._moves[slot])
+            self._write(slot, key, depth, flag, score, move)
+        else:
+            self._write(slot + 1, key, depth, flag, score, move)
+
+    def _write(self, index, key, depth, flag, score, move):
+        """
+        Zapisuje wpis pod wskazanym indeksem, licząc nadpisania wpisów innych pozycji.
+        """
+        if self._flags[index] and self._keys[index] != key:
+            self.overwrites += 1
+        self._keys[index] = key
+        self._depths[index] = depth
+        self._flags[index] = flag
+        self._scores[index] = score
+        self._moves[index] = move
+
+    def clear(self):
+        """
+        Usuwa wszystkie wpisy i zeruje statystyki, nie zmieniając rozmiaru tablicy.
+        """
+        slots = 2 * self.buckets
+        self._flags = array('b', bytes(slots))
+        self.hits = self.misses = self.collisions = self.stores = self.overwrites = 0
+
+    def memory_bytes(self):
+        """
+        Zwraca rozmiar danych tablicy w bajtach.
+
+        Returns:
+            int: Liczba bajtów zajmowanych przez tablice wpisów.
+        """
+        return sum(a.itemsize * len(a) for a in (self._keys, self._scores, self._depths, self._flags, self._moves))
+
+    def stats(self):
+        """
+        Zwraca statystyki użycia tablicy.
+
+        Returns:
+            dict: Liczniki trafień, chybień, kolizji, zapisów i nadpisań oraz współczynnik trafień.
+        """
+        probes = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'memory_bytes': self.memory_bytes(),
+        }